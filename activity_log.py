@@ -0,0 +1,241 @@
+# activity_log.py - Append-only account activity log in rotated SQLite segments, written behind
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import time
+
+ACTIVITY_DIR = os.environ.get('ACTIVITY_LOG_DIR', 'activity')
+
+FIELDS = ('time', 'username', 'action', 'status', 'client', 'detail')
+
+SEGMENT_NAME = re.compile(r'^activity-(\d{6})\.db$')
+
+# Sealed segments are skipped by time-window queries when they end this long before the
+# window starts; writes from several processes can land slightly out of time order
+CLOCK_SLACK = 60.0
+
+
+class ActivityLog:
+    """Logins, logouts, registrations and account changes, never updated in place
+
+    `record()` only appends to an in-memory buffer, so it never waits on disk;
+    a background thread writes the buffer in one transaction after
+    `flush_delay` seconds. Events go to numbered SQLite segment files that
+    hold up to `segment_rows` events each; once the next segment starts a
+    segment is never written again, and the oldest are deleted whole beyond
+    `max_segments`. Each segment is indexed on (username, time) and
+    (action, status, time), and queries walk segments newest first, so
+    "last N events for a user" and "failures in the last day" touch a few
+    index pages however many events are stored.
+    """
+
+    def __init__(self, directory=ACTIVITY_DIR, segment_rows=1000000, max_segments=None,
+                 flush_delay=0.5, scan_interval=5.0):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.max_segments = max_segments
+        self.flush_delay = flush_delay
+        self.scan_interval = scan_interval
+        self.flushes = 0
+        self._segments = []           # [seq, path, first_time, last_time, rows], oldest first
+        self._pending = []            # events recorded but not written yet
+        self._lock = threading.Lock()        # guards the buffer and the segment list
+        self._flush_lock = threading.Lock()  # held while a batch moves from the buffer to disk
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._worker = None
+        self._last_scan = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+        atexit.register(self.flush)
+
+    def record(self, username, action, status='success', client=None, detail=None):
+        """Append one event; written to disk in the background"""
+        # Anything that can't be stored would fail the whole batch, so it is stringified here
+        event = (time.time(), username, action, status,
+                 None if client is None else str(client), None if detail is None else str(detail))
+        with self._lock:
+            self._pending.append(event)
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered event now"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                self._write(pending)
+            except sqlite3.Error:
+                with self._lock:
+                    self._pending[:0] = pending  # keep them, in order, for the next attempt
+                raise
+            self.flushes += 1
+
+    def recent(self, username, limit=10):
+        """The user's last `limit` events as dicts, newest first"""
+        with self._flush_lock:
+            with self._lock:
+                events = [event for event in reversed(self._pending) if event[1] == username][:limit]
+            for segment in reversed(self._segment_list()):
+                if len(events) >= limit:
+                    break
+                events += self._connect(segment[1]).execute(
+                    'SELECT time, username, action, status, client, detail FROM events '
+                    'WHERE username = ? ORDER BY time DESC LIMIT ?', (username, limit - len(events))).fetchall()
+        return [dict(zip(FIELDS, event)) for event in events]
+
+    def count(self, action, status=None, since=0.0):
+        """Number of `action` events (with `status`, if given) at or after `since`"""
+        clause, params = ('action = ? AND status = ?', (action, status)) if status else ('action = ?', (action,))
+        with self._flush_lock:
+            with self._lock:
+                total = sum(1 for event in self._pending
+                            if event[2] == action and (not status or event[3] == status) and event[0] >= since)
+            segments = self._segment_list()
+            for segment in segments:
+                if segment is not segments[-1] and segment[3] is not None and segment[3] < since - CLOCK_SLACK:
+                    continue  # sealed and over before the window starts
+                total += self._connect(segment[1]).execute(
+                    f'SELECT COUNT(*) FROM events WHERE {clause} AND time >= ?', (*params, since)).fetchone()[0]
+        return total
+
+    def user_events(self, username):
+        """Every stored event of username as dicts, oldest first (for data exports)"""
+        self.flush()
+        events = []
+        for segment in self._segment_list():
+            events += self._connect(segment[1]).execute(
+                'SELECT time, username, action, status, client, detail FROM events '
+                'WHERE username = ? ORDER BY time', (username,)).fetchall()
+        return [dict(zip(FIELDS, event)) for event in events]
+
+    def _connect(self, path):
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conns[path] = conn
+        return conn
+
+    def _create_segment(self, seq):
+        path = self._path(seq)
+        conn = self._connect(path)
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY,
+                    time REAL NOT NULL,
+                    username TEXT,
+                    action TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    client TEXT,
+                    detail TEXT
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_events_username_time ON events(username, time)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_events_action_time ON events(action, status, time)')
+        return self._read_segment(seq, path)
+
+    def _read_segment(self, seq, path):
+        """[seq, path, first_time, last_time, rows] - ids only grow, so the first and last rows bound it"""
+        conn = self._connect(path)
+        first = conn.execute('SELECT time FROM events ORDER BY id LIMIT 1').fetchone()
+        last = conn.execute('SELECT id, time FROM events ORDER BY id DESC LIMIT 1').fetchone()
+        return [seq, path, first[0] if first else None, last[1] if last else None, last[0] if last else 0]
+
+    def _scan(self):
+        """Pick up segments started by other processes and forget deleted ones"""
+        seqs = sorted(int(match.group(1)) for match in map(SEGMENT_NAME.match, os.listdir(self.directory)) if match)
+        if not seqs:
+            segments = [self._create_segment(1)]
+        else:
+            known = {segment[0]: segment for segment in self._segments}
+            # Sealed segments never change; the newest may have been written by another process.
+            # Unknown ones go through CREATE IF NOT EXISTS in case their creator hasn't got that far
+            segments = [known.get(seq) or self._create_segment(seq) for seq in seqs[:-1]]
+            newest = seqs[-1]
+            segments.append(self._read_segment(newest, self._path(newest)) if newest in known
+                            else self._create_segment(newest))
+        with self._lock:
+            self._segments = segments
+            self._last_scan = time.time()
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f'activity-{seq:06d}.db')
+
+    def _segment_list(self):
+        if time.time() - self._last_scan >= self.scan_interval:
+            self._scan()
+        with self._lock:
+            return list(self._segments)
+
+    def _write(self, events):
+        while events:
+            current = self._segment_list()[-1]
+            if current[4] >= self.segment_rows:
+                self._rotate(current[0] + 1)
+                continue
+            batch, events = events[:self.segment_rows - current[4]], events[self.segment_rows - current[4]:]
+            conn = self._connect(current[1])
+            with conn:
+                conn.executemany('INSERT INTO events (time, username, action, status, client, detail) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)', batch)
+            with self._lock:
+                current[2] = current[2] if current[2] is not None else batch[0][0]
+                current[3] = batch[-1][0]
+                current[4] += len(batch)
+
+    def _rotate(self, seq):
+        segment = self._create_segment(seq)
+        with self._lock:
+            self._segments.append(segment)
+            expired = self._segments[:-self.max_segments] if self.max_segments else []
+            del self._segments[:len(expired)]
+        for old in expired:
+            conn = self._local.conns.pop(old[1], None)
+            if conn is not None:
+                conn.close()
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(old[1] + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let more events pile on before committing
+            time.sleep(self.flush_delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                self._wakeup.set()
+
+
+_activity_log = None
+_activity_log_lock = threading.Lock()
+
+
+def get_activity_log():
+    """Return the process-wide activity log"""
+    global _activity_log
+    with _activity_log_lock:
+        if _activity_log is None:
+            _activity_log = ActivityLog()
+        return _activity_log
@@ -0,0 +1,195 @@
+# auth_registry.py - Process-wide credentials shared by every session's authenticator
+import ipaddress
+import os
+import threading
+import time
+
+import streamlit as st
+import streamlit_authenticator as stauth
+
+from activity_log import get_activity_log
+from config_cache import thaw
+from cookie_tokens import VerifiedTokenCache, load_revocations
+from credential_index import CredentialIndex
+from credential_store import user_key
+from hashing import hash_password, is_hash, load_policy
+from login_service import LoginVerifier, VerificationPool, load_pool_settings
+from rate_limiter import load_rate_limiter
+from session_registry import load_session_registry
+
+
+# Reverse proxies whose X-Forwarded-For is believed, e.g. "10.0.0.0/8,127.0.0.1"; unset means none
+TRUSTED_PROXIES = [ipaddress.ip_network(proxy.strip(), strict=False)
+                   for proxy in os.environ.get('TRUSTED_PROXIES', '').split(',') if proxy.strip()]
+
+
+def is_trusted_proxy(address, trusted=None):
+    """True if address is one of the configured reverse proxies"""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in (TRUSTED_PROXIES if trusted is None else trusted))
+
+
+def client_address(peer, forwarded=None, trusted=None):
+    """The client's address given the socket peer and its X-Forwarded-For header
+
+    The header is only believed when the peer is a trusted proxy, and then
+    read from the right: each trusted proxy appends the address it got the
+    request from, so the right-most hop that isn't a trusted proxy is the
+    client - anything left of it was written by the client and can be forged.
+    """
+    if not peer or not forwarded or not is_trusted_proxy(peer, trusted):
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+def current_client():
+    """Best-effort client address for the current session (see client_address), or None"""
+    try:
+        forwarded = st.context.headers.get('X-Forwarded-For')
+        ip_address = getattr(st.context, 'ip_address', None)
+        if isinstance(ip_address, str):
+            return client_address(ip_address, forwarded)
+        # Streamlit reports connections from localhost - such as a proxy on the same host - as None
+        client = client_address('127.0.0.1', forwarded)
+        return None if client == '127.0.0.1' else client
+    except Exception:
+        return None
+
+
+class AuthRegistry:
+    """Hold one live credentials dict per process and hot-swap it when the store changes
+
+    Every session's `stauth.Authenticate` is built on the same credentials dict,
+    so a registration or password change made in one session is visible to the
+    others immediately, and external edits are swapped in place on the next
+    rerun. When only some users changed, just their records are replaced,
+    so a write costs the same however many users there are. The Authenticate
+    object itself is kept per session (it carries per-request cookie state),
+    but is only rebuilt when the cookie settings change.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.credentials = {'usernames': {}}
+        self.index = CredentialIndex()
+        self.tokens = VerifiedTokenCache(self.user)
+        self.cookie = {}
+        self.verifier = None
+        self.limiter = None
+        self.sessions = None
+        self.version = None
+        self.cookie_version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Swap in the latest credentials if the config changed; returns the config version"""
+        version, snapshot = self.cache.current()
+        if version == self.version:
+            return self.version
+        with self._lock:
+            # Another session may have swapped in a newer version meanwhile; never go back
+            if self.version is None or version > self.version:
+                changed = self.cache.changed_users(self.version, version)
+                if changed is None:
+                    self._load(snapshot)
+                else:
+                    self._update(snapshot, changed)
+                self.version = version
+        return self.version
+
+    def _load(self, snapshot):
+        """Rebuild everything from a snapshot whose settings (or too much) changed"""
+        scheme, rounds = load_policy(snapshot)
+        live = self.credentials['usernames']
+        usernames = {user_key(username): details for username, details
+                     in thaw(snapshot['credentials']['usernames']).items()}
+        for username, details in usernames.items():
+            # Hash any plain text passwords once per change rather than per Authenticate
+            if 'password' in details and not is_hash(details['password']):
+                details['password'] = hash_password(details['password'], rounds, scheme)
+            # Keep unchanged records identical, so a dict a session holds is still the live one
+            if live.get(username) == details:
+                usernames[username] = live[username]
+        self.index.rebuild(usernames)
+        self.credentials['usernames'] = usernames
+        if self.verifier is None:
+            pool = VerificationPool(**load_pool_settings(snapshot))
+            self.limiter = load_rate_limiter(snapshot)
+            self.sessions = load_session_registry(snapshot)
+            self.tokens.revocations = load_revocations(snapshot)
+            self.verifier = LoginVerifier(self.cache.store, scheme, rounds, pool,
+                                          self.limiter, current_client, get_activity_log())
+        self.verifier.scheme, self.verifier.rounds = scheme, rounds
+        cookie = thaw(snapshot['cookie'])
+        if cookie != self.cookie:
+            self.cookie = cookie
+            self.cookie_version += 1
+
+    def _update(self, snapshot, changed):
+        """Apply the records of only the users that changed"""
+        stored = snapshot['credentials']['usernames']
+        live = self.credentials['usernames']
+        for username in changed:
+            key = user_key(username)
+            if username not in stored:
+                # Removed - unless it was only another spelling of a record that is still there
+                if key not in stored:
+                    self.index.remove_user(live, key)
+                continue
+            details = thaw(stored[username])
+            if 'password' in details and not is_hash(details['password']):
+                details['password'] = hash_password(details['password'], self.verifier.rounds, self.verifier.scheme)
+            # A write made in this process already changed the live record in place
+            if live.get(key) != details:
+                self.index.replace_user(live, key, details)
+
+    def user(self, username):
+        """Return the live details dict for username, or None"""
+        return self.credentials['usernames'].get(username)
+
+    def save_user(self, username, details=None):
+        """Write a user's record to the credential store: details, else their live record"""
+        if details is None:
+            details = self.user(username)
+        if details is None:
+            raise KeyError(f"No account {username!r} to save")
+        self.cache.store.upsert_user(username, details)
+
+    def revoke_tokens(self, username):
+        """Invalidate every reauthentication cookie issued to username so far; returns the record to save"""
+        details = self.user(username)
+        details['tokens_valid_after'] = time.time()
+        return details
+
+    def add_user(self, username, details):
+        """Add a new account to the live credentials; raises DuplicateAccountError if taken"""
+        self.index.add_user(self.credentials['usernames'], username, details)
+
+    def build_authenticator(self):
+        """Construct an Authenticate bound to the shared credentials and password policy"""
+        authenticator = stauth.Authenticate(
+            self.credentials,
+            self.cookie['name'],
+            self.cookie['key'],
+            self.cookie['expiry_days'],
+            # The 5th positional parameter is the field validator in stauth 0.4, not pre_authorized
+            auto_hash=False
+        )
+        self.tokens.install(authenticator, self.cookie['key'], self.cookie['expiry_days'])
+        return self.index.install(self.verifier.install(authenticator))
+
+    def get_authenticator(self):
+        """Return this session's authenticator, building it at most once per cookie change"""
+        self.refresh()
+        cached = st.session_state.get('_authenticator')
+        if cached is None or cached[0] != self.cookie_version:
+            cached = (self.cookie_version, self.build_authenticator())
+            st.session_state['_authenticator'] = cached
+        return cached[1]
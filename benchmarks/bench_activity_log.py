@@ -0,0 +1,80 @@
+# bench_activity_log.py - Activity log append cost and query latency at millions of events
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_log import ActivityLog  # noqa: E402
+
+ACTIONS = [('login', 'success')] * 6 + [('login', 'failure'), ('logout', 'success'),
+                                        ('profile_update', 'success'), ('password_change', 'success')]
+
+
+def populate(log, events, users, days, batch=100000):
+    """Write `events` events spread evenly over the last `days` days, oldest first"""
+    rng = random.Random(0)
+    now = time.time()
+    step = days * 86400 / events
+    for start in range(0, events, batch):
+        rows = []
+        for i in range(start, min(start + batch, events)):
+            action, status = rng.choice(ACTIONS)
+            rows.append((now - days * 86400 + i * step, f'user{rng.randrange(users)}', action, status,
+                         f'10.0.{rng.randrange(256)}.{rng.randrange(256)}', None))
+        log._write(rows)
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Activity log benchmark")
+    parser.add_argument('--events', type=int, default=3000000)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--segment-rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        log = ActivityLog(workdir, segment_rows=args.segment_rows)
+        started = time.perf_counter()
+        populate(log, args.events, args.users, args.days)
+        print(f"🗂️ {args.events:,} events, {args.users:,} users over {args.days} days in "
+              f"{len(log._segments)} segments (written in {time.perf_counter() - started:.1f} s)")
+
+        record_us = per_call_us(lambda i: log.record(f'user{i % args.users}', 'login', 'success', '10.0.0.1'),
+                                100000)
+        started = time.perf_counter()
+        log.flush()
+        print(f"  record()                          {record_us:8.2f} µs   (flush of 100k: "
+              f"{time.perf_counter() - started:.2f} s, off the request path)")
+
+        rng = random.Random(1)
+        users = [f'user{rng.randrange(args.users)}' for _ in range(args.queries)]
+        print(f"  recent(user, 10)                  {per_call_us(lambda i: log.recent(users[i], 10), args.queries):8.1f} µs")
+        day_ago = time.time() - 86400
+        print(f"  count(login failures, last 24h)   "
+              f"{per_call_us(lambda i: log.count('login', 'failure', since=day_ago), 200):8.1f} µs   "
+              f"= {log.count('login', 'failure', since=day_ago):,}")
+        hour_ago = time.time() - 3600
+        print(f"  count(login failures, last hour)  "
+              f"{per_call_us(lambda i: log.count('login', 'failure', since=hour_ago), 200):8.1f} µs   "
+              f"= {log.count('login', 'failure', since=hour_ago):,}")
+        print(f"  user_events(user) (data export)   "
+              f"{per_call_us(lambda i: log.user_events(users[i]), 200):8.1f} µs")
+        started = time.perf_counter()
+        ActivityLog(workdir, segment_rows=args.segment_rows)
+        print(f"  open existing log                 {(time.perf_counter() - started) * 1e6:8.1f} µs")
+    finally:
+        shutil.rmtree(workdir)
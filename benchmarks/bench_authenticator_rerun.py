@@ -0,0 +1,86 @@
+# bench_authenticator_rerun.py - Per-rerun cost of obtaining the authenticator, before and after the registry
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+import streamlit.logger  # noqa: E402
+import streamlit_authenticator as stauth  # noqa: E402
+import yaml  # noqa: E402
+from yaml.loader import SafeLoader  # noqa: E402
+
+from auth_registry import AuthRegistry  # noqa: E402
+from bench_concurrent_registrations import make_config  # noqa: E402
+from config_cache import ConfigCache  # noqa: E402
+from credential_store import SqliteCredentialStore, YamlCredentialStore, migrate_yaml_to_sqlite  # noqa: E402
+
+
+def old_rerun(path):
+    """What the module-level block in app.py used to do on every rerun"""
+    with open(path) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+    # Authenticate prints an "auto hashing in progress" banner for large user lists
+    with contextlib.redirect_stdout(io.StringIO()):
+        return stauth.Authenticate(
+            config['credentials'],
+            config['cookie']['name'],
+            config['cookie']['key'],
+            config['cookie']['expiry_days'],
+            config.get('pre_authorized', [])
+        )
+
+
+def save_and_refresh(registry, username):
+    """One session's profile update, and the next rerun picking it up"""
+    details = registry.user(username)
+    details['name'] = f"{details['name']}."
+    registry.save_user(username, details)
+    registry.refresh()
+
+
+def timeit(fn, reruns):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(reruns):
+        fn()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Authenticator per-rerun overhead benchmark")
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    # Silence "missing ScriptRunContext" warnings from running outside `streamlit run`
+    streamlit.logger.set_log_level('error')
+
+    workdir = tempfile.mkdtemp()
+    try:
+        print("⏱️ Per-rerun authenticator overhead (ms)")
+        for users in args.users:
+            path = os.path.join(workdir, f'config_{users}.yaml')
+            make_config(path, users)
+            registry = AuthRegistry(ConfigCache(YamlCredentialStore(path)))
+            before = timeit(lambda: old_rerun(path), args.reruns)
+            after = timeit(registry.get_authenticator, args.reruns)
+            print(f"  {users:>6} users: before {before:8.2f}  after {after:6.3f}  ({before / after:,.0f}x)")
+            st.session_state.clear()
+
+        print("✏️ One user's write, then the next rerun's refresh (ms, SQLite store)")
+        for users in args.users:
+            db = os.path.join(workdir, f'credentials_{users}.db')
+            migrate_yaml_to_sqlite(os.path.join(workdir, f'config_{users}.yaml'), db)
+            registry = AuthRegistry(ConfigCache(SqliteCredentialStore(db)))
+            registry.refresh()
+            username = next(iter(registry.credentials['usernames']))
+            print(f"  {users:>6} users: {timeit(lambda: save_and_refresh(registry, username), args.reruns):6.2f}")
+    finally:
+        shutil.rmtree(workdir)
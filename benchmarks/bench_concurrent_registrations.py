@@ -0,0 +1,110 @@
+# bench_concurrent_registrations.py - Throughput and lost-write check for concurrent config writes
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml  # noqa: E402
+from yaml.loader import SafeLoader  # noqa: E402
+
+from credential_store import YamlCredentialStore  # noqa: E402
+
+FAKE_HASH = '$2b$12$st9YJgIfPSm3IBgt7p62n.8S6l.GdRkl4D4P0HMvGoQhPj6tci.3u'
+
+
+def make_config(path, base_users):
+    """Write a config.yaml with base_users existing accounts"""
+    config = {
+        'credentials': {'usernames': {
+            f'user{i}': {'email': f'user{i}@example.com', 'name': f'User {i}', 'password': FAKE_HASH}
+            for i in range(base_users)
+        }},
+        'cookie': {'expiry_days': 30, 'key': 'bench', 'name': 'bench'},
+    }
+    with open(path, 'w') as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+
+def naive_register(path, username):
+    """The old app.py write path: load, modify, dump in place with no lock"""
+    with open(path) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+    config['credentials']['usernames'][username] = {'email': f'{username}@example.com',
+                                                    'name': username, 'password': FAKE_HASH}
+    with open(path, 'w') as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+
+def store_register(store, username):
+    store.upsert_user(username, {'email': f'{username}@example.com', 'name': username, 'password': FAKE_HASH})
+
+
+def _process_worker(path, prefix, count):
+    store = YamlCredentialStore(path)
+    threads = [threading.Thread(target=store_register, args=(store, f'{prefix}_{i}')) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run(mode, path, sessions, processes):
+    store = YamlCredentialStore(path)
+    start = time.perf_counter()
+    if mode == 'naive':
+        def safe_naive(name):
+            try:
+                naive_register(path, name)
+            except Exception:
+                pass  # A torn file read is itself a lost registration
+        threads = [threading.Thread(target=safe_naive, args=(f'new_{i}',)) for i in range(sessions)]
+    elif mode == 'threads':
+        threads = [threading.Thread(target=store_register, args=(store, f'new_{i}')) for i in range(sessions)]
+    else:
+        per_process = sessions // processes
+        threads = [multiprocessing.Process(target=_process_worker, args=(path, f'p{p}', per_process))
+                   for p in range(processes)]
+        sessions = per_process * processes
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    try:
+        registered = sum(1 for u in store.load_config()['credentials']['usernames']
+                         if not u.startswith('user'))
+    except Exception:
+        registered = None  # The final file is torn and no longer parses
+    return sessions, registered, elapsed, store.writer.flushes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent registration benchmark")
+    parser.add_argument('--base-users', type=int, default=1000)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"🏁 {args.sessions} concurrent registrations against {args.base_users} existing users")
+        for mode in ('naive', 'threads', 'processes'):
+            path = os.path.join(workdir, f'{mode}.yaml')
+            make_config(path, args.base_users)
+            sessions, registered, elapsed, flushes = run(mode, path, args.sessions, args.processes)
+            flush_note = f", {flushes} flushes" if mode == 'threads' else ""
+            if registered is None:
+                print(f"  {mode:>9}: config file corrupted after {elapsed:.2f}s")
+                continue
+            print(f"  {mode:>9}: {registered}/{sessions} persisted "
+                  f"({sessions - registered} lost) in {elapsed:.2f}s "
+                  f"= {sessions / elapsed:.0f} registrations/s{flush_note}")
+    finally:
+        shutil.rmtree(workdir)
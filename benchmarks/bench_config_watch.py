@@ -0,0 +1,105 @@
+# bench_config_watch.py - Config lookup cost and edit-to-reload latency, stat() per rerun vs a watcher
+import argparse
+import io
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml  # noqa: E402
+
+# Importing streamlit outside `streamlit run` warns about a missing ScriptRunContext
+sys.stderr = io.StringIO()
+from bench_concurrent_registrations import make_config  # noqa: E402
+from config_cache import ConfigCache, Observer  # noqa: E402
+from credential_store import YamlCredentialStore, atomic_write_yaml  # noqa: E402
+sys.stderr = sys.__stderr__
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def edit(path, config, expiry_days):
+    """An external edit, written the way an editor or deploy tool replaces the file"""
+    config['cookie']['expiry_days'] = expiry_days
+    atomic_write_yaml(path, config)
+
+
+def wait_for(cache, version, timeout):
+    deadline = time.perf_counter() + timeout
+    while cache.version < version and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    return cache.version >= version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Config watcher benchmark")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--edits', type=int, default=20)
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'config.yaml')
+        make_config(path, args.users)
+        with open(path) as file:
+            config = yaml.safe_load(file)
+
+        print(f"👀 Config reload, {args.users:,} users")
+        unwatched = ConfigCache(YamlCredentialStore(path))
+        unwatched.snapshot()
+        print(f"  snapshot(), stat() per call    {per_call_us(unwatched.snapshot, args.calls):7.2f} µs")
+        watched = ConfigCache(YamlCredentialStore(path))
+        watched.snapshot()
+        watched.watch('poll', 3600)
+        print(f"  snapshot(), watched            {per_call_us(watched.snapshot, args.calls):7.2f} µs")
+
+        modes = (['auto'] if Observer is not None else []) + ['poll']
+        with open(path, 'rb') as file:
+            raw = file.read()
+        store = YamlCredentialStore(path)
+        print(f"  parse one version              {per_call_us(lambda: store.parse_raw(raw), 3) / 1000:7.1f} ms")
+        for mode in modes:
+            # A file per mode, so the previous mode's watcher doesn't reload alongside this one
+            path = os.path.join(workdir, f'config_{mode}.yaml')
+            shutil.copy(os.path.join(workdir, 'config.yaml'), path)
+            cache = ConfigCache(YamlCredentialStore(path))
+            cache.snapshot()
+            watcher = cache.watch(mode, args.poll_interval)
+            latencies = []
+            for i in range(args.edits):
+                version = cache.version + 1
+                edit(path, config, 100 + i)
+                started = time.perf_counter()  # the rename that publishes the edit just happened
+                if wait_for(cache, version, args.poll_interval * 3 + 1):
+                    latencies.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.1)  # let the debounce window close before the next edit
+            print(f"  edit -> reload, {watcher.mode:<8}       p50 {statistics.median(latencies):7.1f} ms  "
+                  f"max {max(latencies):7.1f} ms  ({len(latencies)}/{args.edits} edits, "
+                  f"{watcher.reloads} reloads)")
+
+        # A broken edit is rejected and the previous snapshot kept; the next good edit is accepted
+        before = cache.version
+        logging.disable(logging.WARNING)  # the rejection is logged
+        with open(path, 'w') as file:
+            file.write("credentials: [this is: not valid\n")
+        time.sleep(args.poll_interval * 2 + 0.2)
+        logging.disable(logging.NOTSET)
+        kept = cache.version == before and cache.snapshot()['cookie']['expiry_days'] == config['cookie']['expiry_days']
+        print(f"  malformed edit: rejected={cache.rejected} kept version {before}: {kept}  ({cache.error})")
+        edit(path, config, 7)
+        accepted = wait_for(cache, before + 1, args.poll_interval * 3 + 1)
+        print(f"  fixed edit accepted: {accepted}, error cleared: {cache.error is None}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
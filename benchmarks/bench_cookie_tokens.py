@@ -0,0 +1,51 @@
+# bench_cookie_tokens.py - Cost of restoring a session from the reauthentication cookie, cached vs decoded
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt  # noqa: E402
+
+from cookie_tokens import VerifiedTokenCache  # noqa: E402
+
+KEY = 'bench_cookie_key'
+EXPIRY_DAYS = 30
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verified cookie token cache benchmark")
+    parser.add_argument('--users', type=int, default=10000, help="Distinct users, one cookie each")
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')  # PyJWT warns about short HMAC keys
+    users = {f'user{i}': {'password': 'x'} for i in range(args.users)}
+    exp_date = time.time() + EXPIRY_DAYS * 86400
+    tokens = [jwt.encode({'username': f'user{i}', 'exp_date': exp_date}, KEY, algorithm='HS256')
+              for i in range(args.users)]
+
+    def decode(token):
+        """What stauth does for every cookie: verify and decode the JWT, then look the user up"""
+        payload = jwt.decode(token, KEY, algorithms=['HS256'])
+        return payload if payload['exp_date'] > time.time() and payload['username'] in users else False
+
+    cache = VerifiedTokenCache(users.get, max_entries=args.users)
+    cached = lambda i: cache.verify(tokens[i % args.users], KEY, EXPIRY_DAYS,  # noqa: E731
+                                    lambda: decode(tokens[i % args.users]))
+
+    print(f"🍪 Restoring a session from its cookie, {args.users:,} users (µs per call)")
+    print(f"  JWT decode + user lookup         {per_call_us(lambda i: decode(tokens[i % args.users]), args.calls):7.2f}")
+    first = per_call_us(cached, args.users)
+    print(f"  cache miss (decode, then store)  {first:7.2f}")
+    print(f"  cache hit                        {per_call_us(cached, args.calls):7.2f}   "
+          f"({cache.hits:,} hits, {cache.misses:,} misses)")
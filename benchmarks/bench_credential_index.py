@@ -0,0 +1,52 @@
+# bench_credential_index.py - Account lookups by email: stauth's linear scans vs the credential index
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credential_index import CredentialIndex  # noqa: E402
+
+
+def linear_get_username(users, email):
+    """What stauth's _get_username('email', ...) does"""
+    for username, values in users.items():
+        if values['email'] == email:
+            return username
+    return False
+
+
+def linear_contains_value(users, value):
+    """What stauth's _credentials_contains_value does before a registration or email change"""
+    return any(value in d.values() for d in users.values())
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Credential index lookup benchmark")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'rebuild ms':>11} {'scan by email':>14} {'index':>8} {'scan taken?':>12} {'index':>8}  (µs)")
+    for n in args.users:
+        users = {f'user{i}': {'email': f'user{i}@example.com', 'name': f'User {i}', 'password': 'x'}
+                 for i in range(n)}
+        index = CredentialIndex()
+        started = time.perf_counter()
+        index.rebuild(users)
+        rebuild_ms = (time.perf_counter() - started) * 1000
+        # Look up users spread over the dict, so the scans average half of it
+        emails = [f'user{i * n // args.calls}@example.com' for i in range(args.calls)]
+        print(f"{n:>8,} {rebuild_ms:11.1f} "
+              f"{per_call_us(lambda i: linear_get_username(users, emails[i]), args.calls):14.1f} "
+              f"{per_call_us(lambda i: index.find_by_email(emails[i].upper()), args.calls):8.2f} "
+              f"{per_call_us(lambda i: linear_contains_value(users, 'new@example.com'), args.calls):12.1f} "
+              f"{per_call_us(lambda i: index.find_by_email('New@example.com') is not None, args.calls):8.2f}")
@@ -0,0 +1,64 @@
+# bench_dashboard_pipeline.py - Dashboard aggregation cost over a large synthetic event log
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from data_pipeline import EventPipeline, compute_daily_metrics, generate_events  # noqa: E402
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<40} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def groupby_daily_metrics(events, start, end):
+    """Straightforward pandas groupby version, for comparison"""
+    window = events[(events['timestamp'] >= start) & (events['timestamp'] < end + pd.Timedelta(days=1))]
+    day = window['timestamp'].dt.floor('D')
+    grouped = window.groupby(day)
+    sessions = window.groupby('session_id').agg(first=('timestamp', 'min'), events=('timestamp', 'size'))
+    session_day = sessions['first'].dt.floor('D')
+    return pd.DataFrame({
+        'Users': grouped['user_id'].nunique(),
+        'Revenue': grouped['revenue'].sum(),
+        'Sessions': session_day.value_counts().sort_index(),
+        'Bounce_Rate': (sessions['events'] == 1).groupby(session_day).mean(),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard pipeline benchmark")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'events.parquet')
+        print(f"📊 Dashboard pipeline over {args.rows:,} synthetic events")
+        events = timed("generate events", lambda: generate_events(args.rows))
+        timed("write parquet", lambda: events.to_parquet(path))
+        del events
+
+        pipeline = EventPipeline(path)
+        timed("load parquet (first rerun)", pipeline.events)
+        start, end = pipeline.window(30)
+        timed("groupby daily metrics (30d)", lambda: groupby_daily_metrics(pipeline.events(), start, end))
+        timed("vectorized daily metrics (30d)", lambda: compute_daily_metrics(pipeline.events(), start, end))
+        timed("pipeline daily metrics, cold (30d)", lambda: pipeline.daily_metrics(start, end))
+        timed("pipeline summary, cold (30d)", lambda: pipeline.summary(start, end))
+        timed("rerun: daily metrics + summary, cached", lambda: (pipeline.daily_metrics(start, end),
+                                                                 pipeline.summary(start, end)))
+        start, end = pipeline.window(90)
+        timed("widget change: 90d window, cold", lambda: pipeline.daily_metrics(start, end))
+        print(f"  cache: {pipeline.hits} hits / {pipeline.misses} misses")
+    finally:
+        shutil.rmtree(workdir)
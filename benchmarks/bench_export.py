@@ -0,0 +1,78 @@
+# bench_export.py - Peak memory and time of large exports, chunked vs in-memory, and of handing one to the browser
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_pipeline import EventPipeline, generate_events  # noqa: E402
+from exporter import Exporter, resolve_format  # noqa: E402
+
+
+def _status_kb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+
+
+def _run_child(fn, queue):
+    # Reset the RSS high-water mark so the peak only covers fn
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    baseline = _status_kb('VmRSS:')
+    start = time.perf_counter()
+    result = fn()
+    queue.put((result, time.perf_counter() - start, (_status_kb('VmHWM:') - baseline) / 1024))
+
+
+def measured(label, fn):
+    """Run fn in a forked child (sharing the loaded events) and report its extra peak RSS"""
+    ctx = get_context('fork')
+    queue = ctx.Queue()
+    child = ctx.Process(target=_run_child, args=(fn, queue))
+    child.start()
+    result, elapsed, peak = queue.get()
+    child.join()
+    print(f"  {label:<34} {elapsed:8.2f} s   peak +{peak:9.1f} MiB")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export memory benchmark")
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'events.parquet')
+        generate_events(args.rows).to_parquet(path)
+        pipeline = EventPipeline(path)
+        first, last = pipeline.date_bounds()
+        events = pipeline.events()
+        print(f"📤 Exporting {args.rows:,} events (frame itself: {events.memory_usage(deep=True).sum() / 2**20:.0f} MiB)")
+
+        measured("in-memory to_csv (old download)", lambda: len(events.to_csv(index=False).encode()))
+        exporter = Exporter(os.path.join(workdir, 'exports'))
+        chunks = lambda: pipeline.iter_events(first, last, chunk_size=args.chunk_size)  # noqa: E731
+        for fmt in ('CSV', 'Parquet', 'JSON'):
+            fmt = resolve_format(fmt)
+            out = measured(f"chunked {fmt}, cold", lambda: exporter.export(('all', fmt), chunks, fmt))
+            print(f"    -> {os.path.getsize(out) / 2**20:.0f} MiB on disk")
+        measured("chunked CSV, cached", lambda: exporter.export(('all', 'CSV'), chunks, 'CSV'))
+
+        # What export_button's deferred download does on click: Streamlit turns the callable's
+        # result into bytes held by its media file manager, so the whole file is in memory
+        def download(fmt):
+            with open(exporter.export(('all', fmt), chunks, fmt), 'rb') as file:
+                return len(file.read())
+        for fmt in ('CSV', 'Parquet'):
+            fmt = resolve_format(fmt)
+            measured(f"cached {fmt} + download hand-off", lambda: download(fmt))
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,222 @@
+# bench_load.py - Simulated concurrent users driven through the app with AppTest (no browser, no network)
+import argparse
+import io
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Passwords of the demo accounts listed on the login page; only those present in config.yaml are used
+DEMO_PASSWORDS = {'admin': 'admin123', 'jsmith': 'password456', 'mjones': 'securepass789'}
+
+# Pages visited after login, by st.navigation url path ('' is the default page, the dashboard)
+PAGES = ['analytics', 'settings', 'profile', '']
+
+STEPS = ('login page', 'login', 'page', 'report', 'failed login', 'registration')
+
+_app = None
+
+
+class SimulatedUser:
+    """One browser session: every rerun it triggers is timed under the step that caused it"""
+
+    def __init__(self, app):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(app, default_timeout=120)
+        self.timings = {step: [] for step in STEPS}
+        self.errors = []
+
+    def step(self, name):
+        started = time.perf_counter()
+        self.at.run()
+        self.timings[name].append(time.perf_counter() - started)
+        if self.at.exception:
+            self.errors.append(f"{name}: {self.at.exception[0].value}")
+        return self.at
+
+    def login(self, username, password):
+        self.step('login page')
+        self.at.text_input[0].input(username)
+        self.at.text_input[1].input(password)
+        self.at.button[0].click()
+        if password != DEMO_PASSWORDS.get(username):
+            return self.step('failed login')
+        self.step('login')
+        if not self.at.session_state['authentication_status']:
+            shown = [element.value for element in list(self.at.warning) + list(self.at.error)]
+            raise RuntimeError(f"{username} was not logged in: {shown}")
+        return self.at
+
+    def browse(self):
+        """Visit every page, then ask for a report from the sidebar"""
+        for url_path in PAGES:
+            pages = {info.get('url_pathname'): page_hash for page_hash, info in self.at._registered_pages.items()}
+            self.at._page_hash = pages[url_path]
+            self.step('page')
+        [button for button in self.at.sidebar.button if 'Generate Report' in button.label][0].click()
+        self.step('report')
+
+    def register(self, username):
+        """Fail a login, then sign up from the "New Account" tab"""
+        self.login(username, 'wrong-password')
+        inputs = list(self.at.text_input)
+        i = [text_input.label for text_input in inputs].index('Full Name')
+        inputs[i - 1].input(username)
+        inputs[i].input(f"Load Test {username}")
+        inputs[i + 1].input(f"{username}@example.com")
+        inputs[i + 2].input('Load!Test123')
+        inputs[i + 3].input('Load!Test123')
+        [button for button in self.at.button if button.label == 'Register'][0].click()
+        self.step('registration')
+        if not any('Registration successful' in success.value for success in self.at.success):
+            self.errors.append(f"registration: {username} was not registered")
+
+
+def _init_worker(env, app, account):
+    """Point the app at the scratch files, then warm imports and caches with one login"""
+    global _app
+    os.environ.update(env)
+    sys.stdout = io.StringIO()  # streamlit_authenticator prints
+    warnings.simplefilter('ignore')  # PyJWT warns about the demo cookie key on every login
+    import streamlit.config
+    import streamlit.logger
+    from streamlit.testing.v1 import AppTest  # noqa: F401 - creates the loggers silenced below
+    # Runs re-apply the logger.level option, so set it as well as the current levels
+    streamlit.config.set_option('logger.level', 'error')
+    streamlit.logger.set_log_level('error')
+    _app = app
+    SimulatedUser(app).login(*account)
+
+
+def simulate(task):
+    """Run one session in a worker; returns its timings, errors, work counters, pid and peak RSS"""
+    from instrumentation import get_perf_registry
+
+    kind, who = task
+    registry = get_perf_registry()
+    before = dict(registry.counters)
+    user = SimulatedUser(_app)
+    try:
+        if kind == 'register':
+            user.register(who)
+        else:
+            user.login(*who)
+            user.browse()
+    except Exception as e:  # an element the scenario expected was not rendered
+        user.errors.append(f"{kind}: {type(e).__name__}: {e}")
+    counters = {}
+    for (route, event), n in registry.counters.items():
+        counters[event] = counters.get(event, 0) + n - before.get((route, event), 0)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return user.timings, user.errors, counters, os.getpid(), peak_rss
+
+
+def _started(_):
+    time.sleep(0.1)  # long enough that every worker gets one
+    return os.getpid()
+
+
+def run_level(concurrency, plan, env, app, account):
+    """Drive plan through `concurrency` worker processes and merge what they measured"""
+    timings = {step: [] for step in STEPS}
+    errors, counters, peak_rss = [], {}, {}
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=get_context('spawn'),
+                             initializer=_init_worker, initargs=(env, app, account)) as pool:
+        # Start every worker (and its warm-up login) before the clock starts
+        list(pool.map(_started, range(concurrency)))
+        started = time.perf_counter()
+        for session_timings, session_errors, session_counters, pid, rss in pool.map(simulate, plan):
+            for step, values in session_timings.items():
+                timings[step] += values
+            errors += session_errors
+            for event, n in session_counters.items():
+                counters[event] = counters.get(event, 0) + n
+            peak_rss[pid] = max(peak_rss.get(pid, 0), rss)
+        wall = time.perf_counter() - started
+    return {'concurrency': concurrency, 'sessions': len(plan), 'wall': wall, 'timings': timings,
+            'errors': errors, 'counters': counters, 'peak_rss': peak_rss}
+
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else float('nan')
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def report(result):
+    all_reruns = [t for values in result['timings'].values() for t in values]
+    peaks = list(result['peak_rss'].values())
+    print(f"👥 {result['concurrency']} concurrent, {result['sessions']} sessions: "
+          f"{result['wall']:.1f} s, {len(all_reruns) / result['wall']:.1f} reruns/s, "
+          f"{result['sessions'] / result['wall']:.2f} sessions/s")
+    print(f"  peak RSS {max(peaks):.0f} MiB per worker, {sum(peaks):.0f} MiB across {len(peaks)} workers")
+    print(f"  {'step':<14} {'reruns':>6} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for step, values in list(result['timings'].items()) + [('all', all_reruns)]:
+        if values:
+            ms = [v * 1000 for v in values]
+            print(f"  {step:<14} {len(ms):>6} {percentile(ms, 50):8.1f} {percentile(ms, 95):8.1f} "
+                  f"{percentile(ms, 99):8.1f}")
+    print("  work: " + ', '.join(f"{event} {n}" for event, n in sorted(result['counters'].items())))
+    if result['errors']:
+        print(f"  ❌ {len(result['errors'])} errors, first: {result['errors'][0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-user load test through AppTest")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--sessions', type=int, default=24, help="Simulated sessions per concurrency level")
+    parser.add_argument('--register-every', type=int, default=8,
+                        help="Every Nth session registers a new account instead of browsing (0 = never)")
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--config', default='config.yaml', help="Config to copy for the run (never modified)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    import yaml
+
+    # AppTest runs app.py as __main__ inside the workers, so the pool functions have to be
+    # pickled from the importable module rather than from this script
+    from activity_log import ActivityLog
+    from bench_load import report, run_level
+    from preferences import PreferenceStore
+
+    with open(os.path.join(ROOT, args.config)) as file:
+        usernames = yaml.safe_load(file)['credentials']['usernames']
+    accounts = [(username, password) for username, password in DEMO_PASSWORDS.items() if username in usernames]
+    if not accounts:
+        raise SystemExit("config has none of the demo accounts " + ', '.join(DEMO_PASSWORDS))
+    rng = random.Random(args.seed)
+
+    # AppTest swaps process-global state (the Runtime instance, config options) on every run,
+    # so concurrent AppTests can't share a process: each concurrent user gets a worker process.
+    # The config file is shared between workers as in a multi-worker deployment; in-memory
+    # caches and registries are per worker.
+    print(f"ℹ️ {os.cpu_count()} CPU(s); one worker process per concurrent user")
+    for concurrency in args.concurrency:
+        workdir = tempfile.mkdtemp()
+        try:
+            # Registrations go to a scratch copy of the config, preferences and activity to scratch databases
+            config_path = os.path.join(workdir, 'config.yaml')
+            shutil.copy(os.path.join(ROOT, args.config), config_path)
+            env = {'CONFIG_PATH': config_path,
+                   'PREFERENCES_DB': os.path.join(workdir, 'preferences.db'),
+                   'EXPORT_DIR': os.path.join(workdir, 'exports'),
+                   'ACTIVITY_LOG_DIR': os.path.join(workdir, 'activity')}
+            # Create them up front: workers racing to switch a brand-new file to WAL get "database is locked"
+            PreferenceStore(env['PREFERENCES_DB'])
+            ActivityLog(env['ACTIVITY_LOG_DIR'])
+            plan = [('register', f'load{concurrency}x{i}') if args.register_every and i % args.register_every == 0
+                    else ('browse', rng.choice(accounts)) for i in range(1, args.sessions + 1)]
+            report(run_level(concurrency, plan, env, os.path.join(ROOT, args.app), accounts[0]))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
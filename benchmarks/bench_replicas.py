@@ -0,0 +1,170 @@
+# bench_replicas.py - How long a change made in one replica takes to show up in the others
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ('registration', 'password change', 'preferences', 'session login')
+
+
+def check(registry, scenario, key):
+    """What this replica currently sees for key, read the way a rerun reads it"""
+    from preferences import get_preferences
+
+    if scenario == 'preferences':
+        return get_preferences().get(key)['theme']
+    if scenario == 'session login':
+        return registry.sessions.user_sessions(key)
+    registry.refresh()
+    user = registry.user(key)
+    return user and user['password']
+
+
+def replica(env, tasks, results, poll_interval):
+    """A watching replica: for each (scenario, key, timeout) read the value, then poll until it changes"""
+    import io
+    import warnings
+    os.environ.update(env)
+    sys.stdout = io.StringIO()
+    warnings.simplefilter('ignore')
+    # Importing streamlit_authenticator outside `streamlit run` warns about a missing ScriptRunContext
+    sys.stderr = io.StringIO()
+    from auth_registry import AuthRegistry
+    from config_cache import get_config_cache
+    sys.stderr = sys.__stderr__
+
+    registry = AuthRegistry(get_config_cache())
+    registry.refresh()
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        scenario, key, timeout = task
+        old = check(registry, scenario, key)  # also warms this replica's caches with the old value
+        results.put('ready')
+        deadline = time.time() + timeout
+        value = old
+        while value == old and time.time() < deadline:
+            time.sleep(poll_interval)
+            value = check(registry, scenario, key)
+        results.put((time.time() if value != old else None, value))
+
+
+def write(registry, scenario, key, round_no):
+    """Make the change in this (the writing) replica; returns the value the others should see"""
+    from credential_store import get_store
+    from hashing import hash_password
+    from preferences import get_preferences
+
+    if scenario == 'registration':
+        details = {'name': f'Replica {key}', 'email': f'{key}@example.com',
+                   'password': hash_password('Replica!123', 4, 'bcrypt')}
+        registry.add_user(key, details)
+        get_store().upsert_user(key, details)
+        return details['password']
+    if scenario == 'password change':
+        user = registry.user(key)
+        user['password'] = hash_password(f'Changed!{round_no}', 4, 'bcrypt')
+        get_store().upsert_user(key, user)
+        return user['password']
+    if scenario == 'preferences':
+        theme = f'Theme {round_no}'
+        get_preferences().save(key, {'theme': theme})
+        return theme
+    registry.sessions.login(f'replica-bench-{round_no}', key)
+    return registry.sessions.user_sessions(key)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-replica convergence check")
+    parser.add_argument('--replicas', type=int, default=4, help="Watching replicas (plus the writer)")
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=10.0, help="Give up on a round after this many seconds")
+    parser.add_argument('--poll-interval', type=float, default=0.005,
+                        help="How often a watching replica re-reads its state (stands in for reruns)")
+    parser.add_argument('--no-bus', action='store_true', help="Run without the change bus, for comparison")
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+
+    import yaml
+
+    workdir = tempfile.mkdtemp()
+    try:
+        # One shared copy of every backend, as on a shared disk
+        with open(os.path.join(ROOT, args.config)) as file:
+            config = yaml.safe_load(file)
+        config['login'] = dict(config.get('login') or {}, session_backend='sqlite',
+                               session_db=os.path.join(workdir, 'sessions.db'),
+                               rate_limit_backend='sqlite', rate_limit_db=os.path.join(workdir, 'attempts.db'))
+        with open(os.path.join(workdir, 'config.yaml'), 'w') as file:
+            yaml.dump(config, file)
+        env = {'CONFIG_PATH': os.path.join(workdir, 'config.yaml'),
+               'PREFERENCES_DB': os.path.join(workdir, 'preferences.db'),
+               'ACTIVITY_LOG_DIR': os.path.join(workdir, 'activity')}
+        if not args.no_bus:
+            env['CHANGE_BUS_DB'] = os.path.join(workdir, 'bus.db')
+        os.environ.update(env)
+
+        import io
+        import warnings
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        sys.stderr = io.StringIO()
+        warnings.simplefilter('ignore')
+        from auth_registry import AuthRegistry
+        from config_cache import get_config_cache
+        from preferences import get_preferences
+        from session_registry import load_session_registry
+        sys.stderr = sys.__stderr__
+
+        writer = AuthRegistry(get_config_cache())
+        writer.refresh()
+        load_session_registry(config)  # create the shared tables before the replicas race to
+        get_preferences()
+        sys.stdout = stdout
+
+        ctx = get_context('spawn')
+        tasks = [ctx.Queue() for _ in range(args.replicas)]
+        results = ctx.Queue()
+        processes = [ctx.Process(target=replica, args=(env, queue, results, args.poll_interval), daemon=True)
+                     for queue in tasks]
+        for process in processes:
+            process.start()
+
+        from change_bus import POLL_INTERVAL
+        mode = "without a change bus" if args.no_bus else f"change bus polled every {POLL_INTERVAL:g} s"
+        print(f"🔁 1 writer + {args.replicas} replicas, {mode}, {args.rounds} rounds")
+        print(f"  {'change':<16} {'converged':>9} {'p50':>8} {'max':>8}  (ms until every replica sees it)")
+        for scenario in SCENARIOS:
+            latencies = []
+            for round_no in range(args.rounds):
+                key = {'registration': f'replica{round_no}', 'password change': 'jsmith',
+                       'preferences': 'jsmith', 'session login': 'mjones'}[scenario]
+                for queue in tasks:
+                    queue.put((scenario, key, args.timeout))
+                for _ in tasks:
+                    results.get()  # every replica holds the old value
+                sys.stdout = io.StringIO()
+                started = time.time()
+                expected = write(writer, scenario, key, round_no)
+                sys.stdout = stdout
+                seen = [results.get() for _ in tasks]
+                if all(at is not None and value == expected for at, value in seen):
+                    latencies.append((max(at for at, _ in seen) - started) * 1000)
+            if latencies:
+                print(f"  {scenario:<16} {len(latencies):>4}/{args.rounds:<4} "
+                      f"{statistics.median(latencies):8.1f} {max(latencies):8.1f}")
+            else:
+                print(f"  {scenario:<16} {0:>4}/{args.rounds:<4} {'-':>8} {'-':>8}  (not within {args.timeout:g} s)")
+        for queue in tasks:
+            queue.put(None)
+        for process in processes:
+            process.join(10)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
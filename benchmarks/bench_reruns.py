@@ -0,0 +1,115 @@
+# bench_reruns.py - Script time per widget interaction: full-app reruns vs fragment reruns
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Every rerun's section timings land here (read by instrumentation at import)
+PERF_LOG = tempfile.mktemp(suffix='.jsonl')
+os.environ['PERF_LOG'] = PERF_LOG
+os.environ.setdefault('PREFERENCES_DB', tempfile.mktemp(suffix='.db'))
+
+import streamlit.logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+# (name, st.navigation url path, sidebar radio label before st.navigation, interaction, fragment section)
+INTERACTIONS = [
+    ("Dashboard window", '', "📊 Dashboard",
+     lambda at, i: at.selectbox(key='dashboard_window').set_value([7, 30][i % 2]), 'Dashboard overview'),
+    ("Settings checkbox", 'settings', "⚙️ Settings",
+     lambda at, i: at.checkbox(key='pref_push_notifications').set_value(i % 2 == 0), 'Settings form'),
+    # Before st.navigation the admin panel was rendered under every page
+    ("Admin user search", 'admin', "📊 Dashboard",
+     lambda at, i: at.text_input(key='admin_user_search').input('ab'[i % 2]), 'User directory'),
+]
+
+
+def last_rerun():
+    with open(PERF_LOG) as log:
+        return json.loads(log.readlines()[-1])
+
+
+def run(at):
+    with contextlib.redirect_stdout(io.StringIO()):
+        at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+
+def open_page(at, url_path, radio_label):
+    """Switch page with st.navigation when the app registers pages, else with the old sidebar radio"""
+    pages = {info.get('url_pathname'): page_hash for page_hash, info in at._registered_pages.items()}
+    if url_path in pages:
+        at._page_hash = pages[url_path]
+    else:
+        at.sidebar.radio(key='navigation').set_value(radio_label)
+    return run(at)
+
+
+def measure(app, username, password, reruns):
+    """{interaction: (median full rerun ms, median fragment body ms)}"""
+    at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=120)
+    run(at)
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    at.button[0].click()
+    run(at)
+    results = {}
+    for name, url_path, radio_label, interact, fragment in INTERACTIONS:
+        open_page(at, url_path, radio_label)
+        interact(at, 1)
+        run(at)  # warm up
+        full, body = [], []
+        for i in range(reruns):
+            interact(at, i)
+            run(at)
+            sections = last_rerun()['sections_ms']
+            full.append(sections['rerun'])
+            body.append(sections.get(fragment, 0.0))
+        results[name] = statistics.median(full), statistics.median(body)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-interaction script time benchmark")
+    parser.add_argument('--app', default='app.py', help="Entry script to measure (relative to the repo)")
+    parser.add_argument('--baseline', help="Git revision whose app.py to measure alongside, e.g. HEAD~1")
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--reruns', type=int, default=10)
+    args = parser.parse_args()
+
+    # Silence "missing ScriptRunContext" warnings from the AppTest script threads
+    streamlit.logger.set_log_level('error')
+
+    tmp = None
+    try:
+        baseline = None
+        if args.baseline:
+            source = subprocess.run(['git', 'show', f'{args.baseline}:app.py'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout
+            fd, tmp = tempfile.mkstemp(dir=ROOT, prefix='.baseline_app_', suffix='.py')
+            with os.fdopen(fd, 'w') as file:
+                file.write(source)
+            baseline = measure(os.path.basename(tmp), args.user, args.password, args.reruns)
+        current = measure(args.app, args.user, args.password, args.reruns)
+
+        # AppTest always reruns the whole script; in a browser an interaction inside an
+        # st.fragment reruns only the fragment body, so that is the per-interaction cost
+        print(f"🖱️ Script time per interaction as '{args.user}' (median of {args.reruns}, ms)")
+        for name, (full, body) in current.items():
+            before = f"before {baseline[name][0]:7.1f}   " if baseline else ""
+            print(f"  {name:<20} {before}full rerun {full:7.1f}   fragment rerun {body:6.1f}")
+    finally:
+        if tmp:
+            os.unlink(tmp)
+        if os.path.exists(PERF_LOG):
+            os.unlink(PERF_LOG)
@@ -0,0 +1,67 @@
+# bench_session_registry.py - Memory and per-call cost of the session registry under many sessions
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_registry import MemorySessionLog, SessionRegistry, SqliteSessionLog  # noqa: E402
+
+
+def run(registry, sessions, rounds, churn):
+    """Log in `sessions` sessions, then heartbeat them all `rounds` times with some logout/login churn"""
+    for i in range(sessions):
+        registry.login(f's{i}', f'user{i % (sessions // 3)}')
+    next_id = sessions
+    live = [f's{i}' for i in range(sessions)]
+    for round_no in range(rounds):
+        start = time.perf_counter()
+        for sid in live:
+            registry.heartbeat(sid, 'user', last_beat=0.0)
+        for _ in range(int(sessions * churn)):
+            gone = live.pop(random.randrange(len(live)))
+            registry.logout(gone)
+            live.append(f's{next_id}')
+            registry.login(live[-1], f'user{next_id % (sessions // 3)}')
+            next_id += 1
+        beat_us = (time.perf_counter() - start) / sessions * 1e6
+        start = time.perf_counter()
+        for _ in range(1000):
+            registry.active_sessions()
+        count_us = (time.perf_counter() - start) / 1000 * 1e6
+        start = time.perf_counter()
+        for _ in range(1000):
+            registry.active_users()
+        users_us = (time.perf_counter() - start) / 1000 * 1e6
+        current, _ = tracemalloc.get_traced_memory()
+        print(f"  round {round_no + 1:>2}: {registry.active_sessions():>6,} live   "
+              f"heartbeat {beat_us:6.1f} µs   count {count_us:6.2f} µs   users {users_us:6.2f} µs   "
+              f"traced {current / 2**20:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session registry benchmark")
+    parser.add_argument('--sessions', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=8)
+    parser.add_argument('--churn', type=float, default=0.1, help="Fraction of sessions replaced per round")
+    args = parser.parse_args()
+
+    print(f"🧭 Memory backend, {args.sessions:,} concurrent sessions")
+    tracemalloc.start()
+    run(SessionRegistry(MemorySessionLog(), heartbeat_interval=0), args.sessions, args.rounds, args.churn)
+    tracemalloc.stop()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"🧭 SQLite backend, {args.sessions:,} concurrent sessions")
+        tracemalloc.start()
+        log = SqliteSessionLog(os.path.join(workdir, 'sessions.db'))
+        run(SessionRegistry(log, heartbeat_interval=0), args.sessions, 3, args.churn)
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(workdir)
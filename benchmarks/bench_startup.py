@@ -0,0 +1,120 @@
+# bench_startup.py - Cold start and first login-page render, with an import-time breakdown
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter under -X importtime: import streamlit, then render the login page once
+CHILD = r'''
+import contextlib, io, os, sys, time
+started = time.perf_counter()
+import streamlit.logger
+streamlit.logger.set_log_level('error')
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(os.path.abspath(sys.argv[1]), default_timeout=120)
+with contextlib.redirect_stdout(io.StringIO()):
+    at.run()
+rendered = time.perf_counter()
+assert not at.exception, [e.value for e in at.exception]
+heavy = [m for m in ('pandas', 'numpy', 'pyarrow') if m in sys.modules]
+print(f"RESULT {imported - started:.3f} {rendered - imported:.3f} {','.join(heavy) or '-'}")
+'''
+
+# Imports only the entry script's own top-level imports, after streamlit is already loaded
+IMPORTS_CHILD = r'''
+import sys, time
+import streamlit, streamlit_authenticator
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - started
+heavy = [m for m in ('pandas', 'numpy', 'pyarrow') if m in sys.modules]
+print(f"RESULT {elapsed:.3f} {','.join(heavy) or '-'}")
+'''
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_once(app):
+    """Return (streamlit import s, first render s, heavy modules, {top-level module: cumulative µs})"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, app],
+                          cwd=ROOT, capture_output=True, text=True)
+    result = [line for line in proc.stdout.splitlines() if line.startswith('RESULT')]
+    if not result:
+        raise RuntimeError(proc.stderr[-2000:])
+    _, import_s, render_s, heavy = result[-1].split()
+    top_level = {}
+    for match in LINE.finditer(proc.stderr):
+        _, cumulative, indent, name = match.groups()
+        if len(indent) == 1:  # a module imported directly, not as a dependency of another
+            top_level[name] = top_level.get(name, 0) + int(cumulative)
+    return float(import_s), float(render_s), heavy, top_level
+
+
+def top_level_imports(app):
+    """Modules the entry script imports at module level (imports inside functions are skipped)"""
+    with open(os.path.join(ROOT, app)) as file:
+        tree = ast.parse(file.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return names
+
+
+def import_cost(app):
+    """Return (seconds, heavy modules) to import app's top-level imports on top of streamlit"""
+    proc = subprocess.run([sys.executable, '-c', IMPORTS_CHILD, *top_level_imports(app)],
+                          cwd=ROOT, capture_output=True, text=True)
+    result = [line for line in proc.stdout.splitlines() if line.startswith('RESULT')]
+    if not result:
+        raise RuntimeError(proc.stderr[-2000:])
+    _, seconds, heavy = result[-1].split()
+    return float(seconds), heavy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start / first login render benchmark")
+    parser.add_argument('--app', default='app.py', help="Entry script to measure (relative to the repo)")
+    parser.add_argument('--baseline', help="Git revision whose app.py to measure alongside, e.g. HEAD~1")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args()
+
+    apps = [('current', args.app)]
+    tmp = None
+    if args.baseline:
+        source = subprocess.run(['git', 'show', f'{args.baseline}:app.py'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        fd, tmp = tempfile.mkstemp(dir=ROOT, prefix='.baseline_app_', suffix='.py')
+        with os.fdopen(fd, 'w') as file:
+            file.write(source)
+        apps.insert(0, (args.baseline, os.path.basename(tmp)))
+
+    try:
+        for label, app in apps:
+            runs = [run_once(app) for _ in range(args.runs)]
+            best = min(runs, key=lambda r: r[1])
+            imports = min((import_cost(app) for _ in range(args.runs)), key=lambda r: r[0])
+            print(f"🚀 {label}: login page cold start (best of {args.runs})")
+            print(f"  import streamlit        {best[0] * 1000:8.0f} ms")
+            print(f"  first login render      {best[1] * 1000:8.0f} ms")
+            print(f"  heavy modules loaded    {best[2]}")
+            print(f"  app imports on top      {imports[0] * 1000:8.0f} ms  (loads {imports[1]})")
+            print(f"  slowest imports during the run:")
+            for name, micros in sorted(best[3].items(), key=lambda kv: -kv[1])[:args.top]:
+                print(f"    {name:<36} {micros / 1000:8.1f} ms")
+        # streamlit_authenticator's cookie manager is a custom component, and Streamlit
+        # imports pyarrow/pandas to marshal component args, so they show up on every page
+        print("ℹ️ pandas/pyarrow on the login page come from Streamlit's custom-component call")
+    finally:
+        if tmp:
+            os.unlink(tmp)
@@ -0,0 +1,67 @@
+# bench_user_directory.py - Admin user table cost per rerun with a large user base
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from bench_concurrent_registrations import make_config  # noqa: E402
+from credential_store import SqliteCredentialStore, YamlCredentialStore  # noqa: E402
+
+
+def timed(label, fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    print(f"  {label:<44} {(time.perf_counter() - start) / repeat * 1000:10.2f} ms")
+    return result
+
+
+def full_table(config):
+    """The old admin_panel: a dict per user, then one DataFrame of everyone"""
+    users_data = []
+    for username, details in config['credentials']['usernames'].items():
+        users_data.append({'Username': username, 'Name': details['name'],
+                           'Email': details['email'], 'Status': '🟢 Active'})
+    return pd.DataFrame(users_data)
+
+
+def page_table(store, query, offset=0):
+    count = store.count_users(query)
+    users = store.search_users(query, 'name', False, offset, 25)
+    return count, pd.DataFrame({'Username': [u for u, _ in users], 'Name': [d['name'] for _, d in users],
+                                'Email': [d['email'] for _, d in users]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Admin user directory benchmark")
+    parser.add_argument('--users', type=int, default=50_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        yaml_path = os.path.join(workdir, 'config.yaml')
+        make_config(yaml_path, args.users)
+        yaml_store = YamlCredentialStore(yaml_path)
+        config = yaml_store.load_config()
+        sqlite_store = SqliteCredentialStore(os.path.join(workdir, 'credentials.db'))
+        sqlite_store.save_config(config)
+
+        print(f"👥 Admin user table with {args.users:,} users (per rerun)")
+        timed("old: DataFrame of every user (parsed config)", lambda: full_table(config))
+        timed("yaml: page 1, cold (parse + sort)", lambda: (yaml_store.__setattr__('_last_search', (None, None, {})),
+                                                           page_table(yaml_store, ''))[1], repeat=1)
+        timed("yaml: page 200, same search", lambda: page_table(yaml_store, '', 200 * 25))
+        timed("sqlite: page 1, no search", lambda: page_table(sqlite_store, ''))
+        timed("sqlite: page 1000, no search", lambda: page_table(sqlite_store, '', 1000 * 25))
+        count, _ = timed("sqlite: search 'user 12'", lambda: page_table(sqlite_store, 'user 12'))
+        print(f"    -> {count} matches")
+        count, _ = timed("sqlite: search 'user4999'", lambda: page_table(sqlite_store, 'user4999'))
+        print(f"    -> {count} matches")
+    finally:
+        shutil.rmtree(workdir)
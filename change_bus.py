@@ -0,0 +1,137 @@
+# change_bus.py - Change notifications between app replicas through a shared SQLite file
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Shared by every replica; unset means a single process and no bus
+CHANGE_BUS_DB = os.environ.get('CHANGE_BUS_DB')
+POLL_INTERVAL = float(os.environ.get('CHANGE_BUS_POLL_INTERVAL', '0.1'))
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeBus:
+    """Publish/subscribe between processes, a local stand-in for Redis pub/sub
+
+    `publish()` appends a message to a table in a SQLite file that all
+    replicas can reach (WAL mode, so publishers never block readers). Each
+    process runs one listener thread that checks `PRAGMA data_version`
+    every `poll_interval` seconds - a read of the file header that only
+    changes when another connection commits - and only then fetches the
+    new rows and hands them to the channel's subscribers. A process never
+    receives its own messages, since it has already applied the change
+    locally. Messages older than `retention` seconds are pruned; like
+    Redis pub/sub, a replica only sees messages published after it started.
+    """
+
+    def __init__(self, path, poll_interval=POLL_INTERVAL, retention=3600.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.origin = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.published = 0
+        self.received = 0
+        self._subscribers = {}        # channel -> [callback]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._worker = None
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    channel TEXT NOT NULL,
+                    message TEXT,
+                    origin TEXT NOT NULL,
+                    time REAL NOT NULL
+                )
+            """)
+        self._last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0]
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def publish(self, channel, message=None):
+        """Send a JSON-serializable message to every other process subscribed to channel"""
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT INTO messages (channel, message, origin, time) VALUES (?, ?, ?, ?)',
+                         (channel, json.dumps(message), self.origin, time.time()))
+        self.published += 1
+
+    def subscribe(self, channel, callback):
+        """Call callback(message) in the listener thread for each message on channel"""
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='change-bus', daemon=True)
+                self._worker.start()
+
+    def poll(self):
+        """Deliver messages published since the last poll; returns how many were delivered"""
+        conn = self._connect()
+        rows = conn.execute('SELECT id, channel, message, origin FROM messages WHERE id > ? ORDER BY id',
+                            (self._last_id,)).fetchall()
+        delivered = 0
+        for message_id, channel, message, origin in rows:
+            self._last_id = message_id
+            if origin == self.origin:
+                continue
+            with self._lock:
+                callbacks = list(self._subscribers.get(channel, ()))
+            for callback in callbacks:
+                try:
+                    callback(json.loads(message))
+                except Exception as e:  # one broken subscriber must not stop the others
+                    logger.warning("%s subscriber failed: %s", channel, e, exc_info=e)
+            delivered += 1
+        self.received += delivered
+        return delivered
+
+    def _prune(self):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM messages WHERE time < ?', (time.time() - self.retention,))
+
+    def _run(self):
+        conn = self._connect()
+        version = None
+        last_prune = time.time()
+        while True:
+            try:
+                current = conn.execute('PRAGMA data_version').fetchone()[0]
+                if current != version:
+                    version = current
+                    self.poll()
+                if time.time() - last_prune > self.retention / 10:
+                    self._prune()
+                    last_prune = time.time()
+            except sqlite3.Error as e:
+                logger.warning("Polling %s failed: %s", self.path, e)
+            time.sleep(self.poll_interval)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_change_bus():
+    """Return the process-wide change bus, or None when CHANGE_BUS_DB is not set"""
+    global _bus
+    if not CHANGE_BUS_DB:
+        return None
+    with _bus_lock:
+        if _bus is None:
+            _bus = ChangeBus(CHANGE_BUS_DB)
+        return _bus
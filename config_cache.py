@@ -0,0 +1,398 @@
+# config_cache.py - Shared, change-aware cache of the parsed configuration
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from change_bus import get_change_bus
+from credential_store import get_store
+from hashing import load_policy
+from instrumentation import count
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # in requirements.txt; without it the watcher polls
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# auto (inotify when watchdog is installed, else poll), poll, or off (stat() on every rerun)
+CONFIG_WATCH = os.environ.get('CONFIG_WATCH', 'auto')
+CONFIG_POLL_INTERVAL = float(os.environ.get('CONFIG_POLL_INTERVAL', '1.0'))
+
+# Editors and atomic writers touch the file several times per save; wait for them to settle
+DEBOUNCE = 0.05
+
+# Versions whose changed usernames are remembered for changed_users()
+DELTA_HISTORY = 1000
+
+
+class ConfigError(ValueError):
+    """The configuration parsed, but is not something the app can run with"""
+
+
+def validate_config(config):
+    """Raise ConfigError if config is missing anything the authenticator needs"""
+    if not isinstance(config, Mapping):
+        raise ConfigError("the configuration must be a mapping")
+    credentials = config.get('credentials')
+    usernames = credentials.get('usernames') if isinstance(credentials, Mapping) else None
+    if not isinstance(usernames, Mapping):
+        raise ConfigError("credentials.usernames must be a mapping of username to details")
+    for username, details in usernames.items():
+        validate_user(username, details)
+
+    cookie = config.get('cookie')
+    if not isinstance(cookie, Mapping):
+        raise ConfigError("cookie must be a mapping with name, key and expiry_days")
+    for field in ('name', 'key'):
+        if not isinstance(cookie.get(field), str) or not cookie[field]:
+            raise ConfigError(f"cookie.{field} must be a non-empty string")
+    expiry_days = cookie.get('expiry_days')
+    if isinstance(expiry_days, bool) or not isinstance(expiry_days, (int, float)) or expiry_days < 0:
+        raise ConfigError("cookie.expiry_days must be a number of days")
+
+    for section in ('login', 'password_hashing'):
+        if config.get(section) is not None and not isinstance(config[section], Mapping):
+            raise ConfigError(f"{section} must be a mapping")
+    try:
+        load_policy(config)
+    except (ValueError, TypeError, RuntimeError) as e:
+        raise ConfigError(f"password_hashing: {e}") from e
+
+
+def validate_user(username, details):
+    """Raise ConfigError if one credentials.usernames entry is malformed"""
+    if not isinstance(username, str) or not isinstance(details, Mapping):
+        raise ConfigError(f"credentials.usernames.{username} must be a mapping")
+    password = details.get('password')
+    if not isinstance(password, str) or not password:
+        raise ConfigError(f"credentials.usernames.{username}.password must be a non-empty string")
+    for field in ('name', 'email'):
+        if details.get(field) is not None and not isinstance(details[field], str):
+            raise ConfigError(f"credentials.usernames.{username}.{field} must be a string")
+
+
+def changed_usernames(old, new):
+    """Usernames whose records differ between two snapshots, or None if anything else differs"""
+    if any(old.get(key) != new.get(key) for key in old.keys() | new.keys() if key != 'credentials'):
+        return None
+    old_credentials, new_credentials = old['credentials'], new['credentials']
+    if any(old_credentials.get(key) != new_credentials.get(key)
+           for key in old_credentials.keys() | new_credentials.keys() if key != 'usernames'):
+        return None
+    old_users, new_users = old_credentials['usernames'], new_credentials['usernames']
+    return frozenset(u for u in old_users.keys() | new_users.keys() if old_users.get(u) != new_users.get(u))
+
+
+def freeze(value):
+    """Return a read-only view of a parsed config (dicts -> mappingproxy, lists -> tuple)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Return a private mutable deep copy of a frozen snapshot"""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class ConfigCache:
+    """Serve parsed config snapshots, re-parsing only when the underlying file changes
+
+    Unwatched, each lookup costs one stat(). When the (mtime, size, inode)
+    fingerprint moved the raw bytes are hashed, and the file is only parsed
+    again if the content hash differs too (e.g. a `touch` or an identical
+    rewrite is still a hit). Once `watch()` has started a ConfigWatcher that
+    check runs in the watcher thread, once per change to the file, and a
+    lookup is just a read of the current snapshot.
+
+    Every parse is validated before it replaces the snapshot. A malformed
+    edit is rejected - the previous snapshot keeps being served and the
+    error is kept in `error` for the admin panel - until the file changes
+    again. Writes made through the store mark the cache stale and wake the
+    watcher; whichever comes first, the watcher or the next lookup, reloads.
+    So a write never reloads on the writer's thread, yet the writer's next
+    rerun already sees it. With a change bus writes are announced to the
+    other replicas, which then re-check the content even if their stat()
+    can't tell (e.g. a shared disk with cached attributes).
+
+    A write that only changed some users is patched into a copy of the
+    current snapshot instead of re-reading everything: from the store's
+    change log when it has one (SQLite, covering every process's writes),
+    else from the records this process just wrote (the file is still
+    re-read by the watcher later, to catch other writers). Every version
+    remembers which usernames it changed, so `changed_users()` lets the
+    registry update only those records.
+    """
+
+    def __init__(self, store, bus=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self.rejected = 0
+        self.error = None
+        # Names the served content the same way in every process and across restarts (unlike version)
+        self.content_id = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._key = None
+        self._digest = None
+        self._stale = False
+        self._pending = []   # users written through the store since the last reload (None: unknown)
+        self._deltas = OrderedDict()   # version -> frozenset of changed usernames, None if not only users
+        self._snapshot = None
+        self._watcher = None
+        store.on_change(self.invalidate)
+        store.serve_reads_from(self.snapshot)
+        if bus is not None:
+            store.on_change(lambda users: bus.publish('credentials'))
+            bus.subscribe('credentials', lambda message: self.invalidate())
+
+    def snapshot(self):
+        """Return the current read-only config snapshot"""
+        return self.current()[1]
+
+    def current(self):
+        """Return (version, snapshot), read together so the version is the one the snapshot was loaded as"""
+        # Unwatched, nothing loaded yet (a failed first load raises here, as before), or written
+        # through the store since: a session sees its own writes on its next rerun
+        reloaded = (self._watcher is None or self._snapshot is None or self._stale) and self.reload()
+        with self._lock:
+            if not reloaded:
+                self.hits += 1
+            return self.version, self._snapshot
+
+    def reload(self):
+        """Re-check the store and swap in a new snapshot if its content changed
+
+        Returns True if the content was parsed (accepted or not). Raises if
+        there is no snapshot to fall back on yet.
+        """
+        with self._reload_lock:
+            stale, self._stale = self._stale, False
+            pending, self._pending = self._pending, []
+            key = self.store.fingerprint()
+            if self._snapshot is not None and key == self._key and not stale:
+                return False
+            if self._snapshot is not None and self._patch(pending):
+                return True
+            raw = self.store.read_raw()
+            digest = hashlib.sha256(raw).hexdigest()
+            if self._snapshot is not None and digest == self._digest:
+                self._key = key
+                return False
+
+            count('config_loads')
+            try:
+                config = self.store.parse_raw(raw)
+                validate_config(config)
+            except Exception as e:
+                # Remember the bad content so it isn't parsed again until the file changes
+                self._key, self._digest = key, digest
+                with self._lock:
+                    self.rejected += 1
+                    self.misses += 1
+                    self.error = f"{type(e).__name__}: {' '.join(str(e).split())}"
+                count('config_rejections')
+                if self._snapshot is None:
+                    raise
+                logger.warning("Rejected edit to %s, still serving version %d: %s",
+                               self.store.path, self.version, self.error)
+                return True
+
+            snapshot = freeze(config)
+            changed = changed_usernames(self._snapshot, snapshot) if self._snapshot is not None else None
+            with self._lock:
+                self._key, self._digest = key, digest
+                self.content_id = digest
+                self.misses += 1
+                self.error = None
+                if changed != frozenset():  # else only re-read what is already served
+                    self._publish(snapshot, changed)
+            return True
+
+    def _patch(self, pending):
+        """Apply a users-only change to a copy of the snapshot; False if the whole config must be re-read"""
+        changes = self.store.changes_since(self._key)
+        if changes is not None:
+            key, users = changes
+            # The digest read_raw() gives for this version, as if it had been re-read
+            content_id = hashlib.sha256(str(key).encode()).hexdigest()
+        elif pending and None not in pending:
+            # Only this process's writes are known: keep the key so the file is still re-checked
+            key, users = self._key, {}
+            for written in pending:
+                users.update(written)
+            content_id = hashlib.sha256(
+                f'{self.content_id}\0{json.dumps(users, sort_keys=True, default=str)}'.encode()).hexdigest()
+        else:
+            return False
+        if not users:  # nothing written since the snapshot was loaded
+            with self._lock:
+                self._key = key
+            return True
+        try:
+            for username, details in users.items():
+                if details is not None:
+                    validate_user(username, details)
+        except ConfigError:
+            return False
+        count('config_patches')
+        usernames = dict(self._snapshot['credentials']['usernames'])
+        for username, details in users.items():
+            if details is None:
+                usernames.pop(username, None)
+            else:
+                usernames[username] = freeze(details)
+        credentials = dict(self._snapshot['credentials'], usernames=MappingProxyType(usernames))
+        snapshot = MappingProxyType(dict(self._snapshot, credentials=MappingProxyType(credentials)))
+        with self._lock:
+            self._key, self.content_id = key, content_id
+            self.misses += 1
+            self._publish(snapshot, frozenset(users))
+        return True
+
+    def _publish(self, snapshot, changed):
+        # Called with _lock held
+        self._snapshot = snapshot
+        self.version += 1
+        self._deltas[self.version] = changed
+        if len(self._deltas) > DELTA_HISTORY:
+            self._deltas.popitem(last=False)
+
+    def changed_users(self, since, version):
+        """Usernames changed after version `since` up to `version`, or None if other settings changed too"""
+        with self._lock:
+            if since is None:
+                return None
+            changed = set()
+            for v in range(since + 1, version + 1):
+                delta = self._deltas.get(v)
+                if delta is None:  # a settings change, or too long ago to remember
+                    return None
+                changed |= delta
+            return changed
+
+    def invalidate(self, users=None):
+        """Have the content re-checked by the watcher thread or the next snapshot(), whichever is first"""
+        # Never reload here - this runs on the writer's thread, right after its write
+        self._pending.append(users)
+        self._stale = True
+        if self._watcher is not None:
+            self._watcher.wake()
+
+    def watch(self, mode=CONFIG_WATCH, poll_interval=CONFIG_POLL_INTERVAL):
+        """Reload the config in the background whenever the store's file changes"""
+        if self._watcher is None:
+            self._watcher = ConfigWatcher(self, mode, poll_interval)
+            self._watcher.start()
+        return self._watcher
+
+    def stats(self):
+        """Return hit/miss counters for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'version': self.version,
+                'rejected': self.rejected,
+                'error': self.error,
+                'watch': self._watcher.mode if self._watcher else 'off',
+            }
+
+
+class ConfigWatcher:
+    """Background thread that reloads a ConfigCache once per change to the store's file
+
+    With watchdog installed (and mode 'auto') the store's directory is watched
+    through inotify - or the platform's equivalent - and only events on the
+    store file itself, or its `-wal` sidecar, trigger a reload; since the
+    YAML store replaces the file by renaming a temp file over it, the
+    directory is watched rather than the file's inode. Otherwise, or with
+    mode 'poll', the fingerprint is checked every `poll_interval` seconds.
+    Writes made through the store wake the thread early in either mode.
+    """
+
+    def __init__(self, cache, mode=CONFIG_WATCH, poll_interval=CONFIG_POLL_INTERVAL):
+        if mode not in ('auto', 'poll'):
+            raise ValueError(f"Unknown CONFIG_WATCH mode '{mode}', expected auto, poll or off")
+        self.cache = cache
+        self.mode = 'inotify' if mode == 'auto' and Observer is not None else 'poll'
+        if mode == 'auto' and Observer is None:
+            logger.warning("watchdog is not installed, polling %s every %g s for changes",
+                           cache.store.path, poll_interval)
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self._path = os.path.abspath(cache.store.path)
+        self._changed = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def start(self):
+        """Start watching; falls back to polling if the OS refuses the watch"""
+        if self.mode == 'inotify':
+            try:
+                self._observer = Observer()
+                self._observer.schedule(self, os.path.dirname(self._path))
+                self._observer.daemon = True
+                self._observer.start()
+            except OSError as e:  # e.g. out of inotify watches
+                logger.warning("Can't watch %s (%s), polling every %g s instead", self._path, e, self.poll_interval)
+                self.mode = 'poll'
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def dispatch(self, event):
+        """watchdog event handler: flag a change when the event touches the store's file"""
+        if event.event_type in ('opened', 'closed_no_write') or event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and os.path.abspath(path) in (self._path, self._path + '-wal'):
+                self._changed.set()
+                return
+
+    def wake(self):
+        """Re-check the store now (after the debounce) instead of at the next event or poll"""
+        self._changed.set()
+
+    def _run(self):
+        while True:
+            if self._changed.wait(None if self.mode == 'inotify' else self.poll_interval):
+                time.sleep(DEBOUNCE)
+                self._changed.clear()
+            try:
+                if self.cache.reload():
+                    self.reloads += 1
+            except Exception as e:  # e.g. the file is briefly missing; keep serving the old snapshot
+                self.cache.error = f"{type(e).__name__}: {' '.join(str(e).split())}"
+                logger.warning("Reloading %s failed: %s", self._path, self.cache.error)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_config_cache():
+    """Return the process-wide config cache for the configured credential store"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConfigCache(get_store(), get_change_bus())
+            if CONFIG_WATCH != 'off':
+                _cache.watch()
+        return _cache
@@ -0,0 +1,170 @@
+# cookie_tokens.py - Cache of verified reauthentication cookies, with revocation
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+import streamlit as st
+
+DAY_SECONDS = 24 * 60 * 60
+
+# Replicas' clocks may disagree this much about when a cookie was issued (its `iat`)
+CLOCK_SKEW = 300
+
+def token_digest(token, key):
+    """Cache key for a cookie token; includes the signing key so a key change invalidates it"""
+    return hashlib.sha256(f'{key}\0{token}'.encode()).hexdigest()
+
+
+def decode_token(token, key):
+    """Verify and decode a cookie token, or return False like the cookie model does"""
+    try:
+        return jwt.decode(token, key, algorithms=['HS256'], leeway=CLOCK_SKEW)
+    except jwt.InvalidTokenError:
+        return False
+
+
+class MemoryRevocations:
+    """Per-process set of revoked token digests, each kept until the token would have expired"""
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def add(self, digest, until, now):
+        with self._lock:
+            self._until = {d: u for d, u in self._until.items() if u > now}
+            self._until[digest] = until
+
+    def __contains__(self, digest):
+        return digest in self._until
+
+
+class SqliteRevocations:
+    """Revoked token digests in SQLite, so every worker process and restart sees a logout"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS revoked_tokens (digest TEXT PRIMARY KEY, until REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_revoked_tokens_until ON revoked_tokens(until)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def add(self, digest, until, now):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO revoked_tokens VALUES (?, ?)', (digest, until))
+            conn.execute('DELETE FROM revoked_tokens WHERE until <= ?', (now,))
+
+    def __contains__(self, digest):
+        return self._connect().execute(
+            'SELECT 1 FROM revoked_tokens WHERE digest = ?', (digest,)).fetchone() is not None
+
+
+def load_revocations(config):
+    """Revoked-token storage beside the session table: shared SQLite with the sqlite session backend"""
+    settings = config.get('login') or {}
+    if settings.get('session_backend', 'memory') == 'sqlite':
+        return SqliteRevocations(settings.get('session_db', os.environ.get('SESSION_DB', 'sessions.db')))
+    return MemoryRevocations()
+
+
+class VerifiedTokenCache:
+    """LRU of reauthentication cookie tokens that already passed JWT verification
+
+    Installed in place of the cookie model's `_token_decode`, so a browser
+    session restored from an already-verified cookie costs a digest and a
+    dict lookup instead of an HMAC check and JSON decode. An entry lives no
+    longer than the token's own expiry nor `expiry_days` after it was
+    verified. Tokens are rejected, cached or not, when they were revoked on
+    logout, or issued before the user's `tokens_valid_after` (set in the
+    user record on a password change or reset). The issue time is the
+    token's `iat`, added to every cookie made through the installed encoder;
+    older cookies without one count as issued at 0. Revocations are kept in
+    `revocations` (see load_revocations), not in the credentials, so a
+    logout is one small insert rather than a credential write.
+    """
+
+    def __init__(self, user_fn, revocations=None, max_entries=10000):
+        self.user_fn = user_fn
+        self.revocations = revocations if revocations is not None else MemoryRevocations()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # digest -> (payload, cached_until)
+        self._lock = threading.Lock()
+
+    def verify(self, token, key, expiry_days, decode):
+        """Return the token's payload like the cookie model's _token_decode, or False if rejected"""
+        digest = token_digest(token, key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                payload = entry[0]
+                return dict(payload) if self._valid(payload, digest) else False
+        self.misses += 1
+        payload = decode()
+        if not payload or 'username' not in payload or not self._valid(payload, digest):
+            return False
+        with self._lock:
+            self._entries[digest] = (payload, min(payload['exp_date'], now + expiry_days * DAY_SECONDS))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dict(payload)
+
+    def revoke(self, token, key):
+        """Reject this token from now on (logout)"""
+        payload = decode_token(token, key)
+        if not payload or 'exp_date' not in payload:
+            return
+        digest = token_digest(token, key)
+        # Kept until the token would have expired anyway
+        self.revocations.add(digest, payload['exp_date'], time.time())
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def _valid(self, payload, digest):
+        if payload['exp_date'] <= time.time():
+            return False
+        user = self.user_fn(payload['username'])
+        if user is None or digest in self.revocations:
+            return False
+        return payload.get('iat', 0) >= user.get('tokens_valid_after', 0)
+
+    def install(self, authenticator, key, expiry_days):
+        """Route the authenticator's cookie verification through the cache, stamp `iat`, and revoke on logout"""
+        model = authenticator.cookie_controller.cookie_model
+        delete_cookie = model.delete_cookie
+
+        def token_decode():
+            return self.verify(model.token, key, expiry_days, lambda: decode_token(model.token, key))
+
+        def token_encode():
+            return jwt.encode({'username': st.session_state['username'], 'exp_date': model.exp_date,
+                               'iat': time.time()}, key, algorithm='HS256')
+
+        def delete_and_revoke():
+            # Only called on logout; a copy of the cookie must not log anyone back in
+            token = st.context.cookies.get(model.cookie_name)
+            if token:
+                self.revoke(token, key)
+            delete_cookie()
+
+        model._token_decode = token_decode
+        model._token_encode = token_encode
+        model.delete_cookie = delete_and_revoke
+        return authenticator
@@ -0,0 +1,148 @@
+# credential_index.py - Case-normalized unique lookups of accounts by username and email
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateAccountError(Exception):
+    """Raised when a username or email is already registered to another account"""
+
+
+def normalize(value):
+    """Key used by the indexes: trimmed and lower-cased, None for blanks"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower()
+    return value or None
+
+
+class CredentialIndex:
+    """Username and email indexes over the live credentials dict
+
+    Rebuilt whenever the registry swaps in new credentials, and updated
+    in the same step as every write made through the authenticator or
+    `add_user()` and every stored record the registry applies, so resolving an account by email and checking that a
+    username or email is free are dict lookups however many users there
+    are. Emails are unique case-insensitively; if the stored config
+    already has duplicates, the first username (in sorted order) keeps
+    the email and the rest are listed in `conflicts` (and logged).
+    """
+
+    def __init__(self):
+        self.usernames = {}     # normalized username -> stored username
+        self.emails = {}        # normalized email -> stored username
+        self.conflicts = {}     # username -> email it lost to an earlier owner
+        self._lock = threading.RLock()
+
+    def rebuild(self, users):
+        """Index a whole {username: details} dict"""
+        usernames, emails, conflicts = {}, {}, {}
+        for username in sorted(users):
+            usernames[normalize(username)] = username
+            email = normalize(users[username].get('email'))
+            if email is None:
+                continue
+            if email in emails:
+                conflicts[username] = email
+            else:
+                emails[email] = username
+        with self._lock:
+            self.usernames, self.emails, self.conflicts = usernames, emails, conflicts
+        if conflicts:
+            logger.warning("%d accounts share an email with an earlier account and can't be found by it: %s",
+                           len(conflicts), ", ".join(sorted(conflicts)))
+
+    def find_username(self, username):
+        """Stored spelling of username, or None if there is no such account"""
+        return self.usernames.get(normalize(username))
+
+    def find_by_email(self, email):
+        """Username registered with email, or None"""
+        return self.emails.get(normalize(email))
+
+    def check_available(self, username=None, email=None, owner=None):
+        """Raise DuplicateAccountError unless username and email are free (or already owner's)"""
+        if username is not None and self.find_username(username) not in (None, owner):
+            raise DuplicateAccountError("Username already taken")
+        if email is not None and self.find_by_email(email) not in (None, owner):
+            raise DuplicateAccountError("Email already taken")
+
+    def add_user(self, users, username, details):
+        """Check both keys are free, then insert details into users and the indexes together"""
+        with self._lock:
+            self.check_available(username, details.get('email'))
+            users[username] = details
+            self._index(username, details.get('email'))
+
+    def set_email(self, users, username, email):
+        """Change a user's email in users and the email index together"""
+        with self._lock:
+            self.check_available(email=email, owner=username)
+            old = normalize(users[username].get('email'))
+            if old and self.emails.get(old) == username:
+                del self.emails[old]
+            users[username]['email'] = email
+            self._index(username, email)
+
+    def replace_user(self, users, username, details):
+        """Put a stored record into users and the indexes; the store is authoritative, so nothing is refused"""
+        with self._lock:
+            self._unindex(username, users.get(username))
+            users[username] = details
+            email = normalize(details.get('email'))
+            self.usernames[normalize(username)] = username
+            if email and self.emails.setdefault(email, username) != username:
+                self.conflicts[username] = email
+                logger.warning("%s shares an email with %s and can't be found by it", username, self.emails[email])
+
+    def remove_user(self, users, username):
+        """Drop a user deleted from the store from users and the indexes"""
+        with self._lock:
+            self._unindex(username, users.pop(username, None))
+
+    def install(self, authenticator):
+        """Route the authenticator's account lookups and writes through the indexes"""
+        model = authenticator.authentication_controller.authentication_model
+        original_get_username = model._get_username
+        original_register = model._register_credentials
+        original_update = model._update_entry
+
+        def get_username(key, value):
+            if key == 'email':
+                return self.find_by_email(value) or False
+            return original_get_username(key, value)
+
+        def register_credentials(username, first_name, last_name, password, email, password_hint, roles=None):
+            # stauth checks availability and registers in separate steps; re-check under the lock
+            with self._lock:
+                self.check_available(username, email)
+                original_register(username, first_name, last_name, password, email, password_hint, roles)
+                self._index(username, email)
+
+        def update_entry(username, key, value):
+            if key == 'email':
+                self.set_email(model.credentials['usernames'], username, value)
+            else:
+                original_update(username, key, value)
+
+        # stauth checks a new email against every value of every user; only emails matter here
+        model._credentials_contains_value = lambda value: self.find_by_email(value) is not None
+        model._get_username = get_username
+        model._register_credentials = register_credentials
+        model._update_entry = update_entry
+        return authenticator
+
+    def _index(self, username, email):
+        self.usernames[normalize(username)] = username
+        if normalize(email):
+            self.emails[normalize(email)] = username
+
+    def _unindex(self, username, details):
+        self.conflicts.pop(username, None)
+        if details is None:
+            return
+        self.usernames.pop(normalize(username), None)
+        email = normalize(details.get('email'))
+        if email and self.emails.get(email) == username:
+            del self.emails[email]
@@ -0,0 +1,549 @@
+# credential_store.py - Pluggable storage for the authentication configuration
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import yaml
+from yaml.loader import SafeLoader
+
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to the in-process lock only
+    fcntl = None
+
+CONFIG_PATH = os.environ.get('CONFIG_PATH', 'config.yaml')
+DB_PATH = os.environ.get('CREDENTIAL_DB', 'credentials.db')
+BACKEND = os.environ.get('CREDENTIAL_BACKEND', 'yaml')
+
+# Columns stored directly on the users table, everything else goes to `extra`
+USER_COLUMNS = ('name', 'email', 'password')
+
+# Columns the admin user directory can search and sort on
+SEARCH_COLUMNS = ('username', 'name', 'email')
+
+# How long the coalescer waits for more writes before flushing a batch
+COALESCE_DELAY = float(os.environ.get('CONFIG_COALESCE_DELAY', '0.02'))
+
+# Versions of per-user changes the SQLite store keeps for caches catching up
+CHANGE_LOG_SIZE = 10000
+
+_thread_lock = threading.Lock()
+
+
+class UnreadableConfigError(ValueError):
+    """The YAML file on disk doesn't parse, so it can't be updated without losing the edit"""
+
+
+def match_users(users, query='', sort='username', descending=False):
+    """Filter a {username: details} dict by case-insensitive prefix and sort it, as (username, details) pairs"""
+    query = query.strip().lower()
+
+    def field(username, details, column):
+        return (username if column == 'username' else details.get(column) or '').lower()
+
+    matches = [(u, d) for u, d in users.items()
+               if not query or any(field(u, d, col).startswith(query) for col in SEARCH_COLUMNS)]
+    matches.sort(key=lambda item: (field(*item, sort), item[0]), reverse=descending)
+    return matches
+
+
+def user_key(username):
+    """Stored form of a username: trimmed and lower-cased, like the live credentials and registration"""
+    return username.strip().lower()
+
+
+def drop_other_spellings(users, keys):
+    """Remove records whose username differs from one of keys only by case (pre-normalization leftovers)
+
+    Returns the usernames removed.
+    """
+    removed = [u for u in users if u not in keys and user_key(u) in keys]
+    for username in removed:
+        del users[username]
+    return removed
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive inter-process lock on `<path>.lock` for the duration of the block"""
+    with _thread_lock, open(path + '.lock', 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write_yaml(path, data):
+    """Write YAML to a temp file in the same directory and rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            yaml.dump(data, file, default_flow_style=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class WriteCoalescer:
+    """Batch pending mutations from many sessions into a single locked load-modify-save"""
+
+    def __init__(self, path, delay=COALESCE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.flushes = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, mutation):
+        """Queue mutation(config) for the next flush and return a Future for its result"""
+        future = Future()
+        self._queue.put((mutation, future))
+        self._ensure_worker()
+        return future
+
+    def apply(self, mutation):
+        """Queue a mutation and block until it has been written to disk"""
+        return self.submit(mutation).result()
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='config-writer', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Give concurrent sessions a moment to pile on, then drain everything pending
+            if self.delay:
+                time.sleep(self.delay)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            with file_lock(self.path):
+                with open(self.path) as file:
+                    try:
+                        config = yaml.load(file, Loader=SafeLoader)
+                    except yaml.YAMLError as e:
+                        raise UnreadableConfigError(f"{self.path} can't be parsed: {e}") from e
+                if not isinstance(config, dict) or not isinstance(config.get('credentials'), dict):
+                    raise UnreadableConfigError(f"{self.path} has no credentials section")
+                results = []
+                for mutation, future in batch:
+                    try:
+                        results.append((future, mutation(config), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+                atomic_write_yaml(self.path, config)
+                self.flushes += 1
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class ChangeNotifier:
+    """Mixin that lets caches subscribe to writes made through a store"""
+
+    _snapshot = None
+
+    def on_change(self, callback):
+        """Call callback(users) after every write made through this store
+
+        `users` is {username: details or None if removed} when the write
+        only touched those users, or None for any other write.
+        """
+        self._listeners.append(callback)
+
+    def serve_reads_from(self, snapshot):
+        """Answer read-only lookups from snapshot() (a cached, validated config) instead of the file"""
+        self._snapshot = snapshot
+
+    def _notify(self, users=None):
+        for callback in list(self._listeners):
+            callback(users)
+
+
+class YamlCredentialStore(ChangeNotifier):
+    """Credential store backed by a single YAML file - fine for small deployments"""
+
+    def __init__(self, path=CONFIG_PATH):
+        self.path = path
+        self.writer = WriteCoalescer(path)
+        self._listeners = []
+        self._last_search = (None, None, {})
+
+    def fingerprint(self):
+        """Cheap change detector: (mtime, size, inode) of the YAML file"""
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def read_raw(self):
+        """Return the raw file bytes, used for content hashing"""
+        with open(self.path, 'rb') as file:
+            return file.read()
+
+    def parse_raw(self, raw):
+        """Parse bytes returned by read_raw into a config dict"""
+        return yaml.load(raw, Loader=SafeLoader)
+
+    def changes_since(self, key):
+        """A file keeps no change log: always None, so the whole file is re-read"""
+        return None
+
+    def load_config(self):
+        """Load the whole configuration from the YAML file"""
+        with open(self.path) as file:
+            config = yaml.load(file, Loader=SafeLoader)
+        return config
+
+    def save_config(self, config):
+        """Atomically replace the whole YAML file under the inter-process lock"""
+        with file_lock(self.path):
+            atomic_write_yaml(self.path, config)
+        self._notify()
+
+    def _users(self):
+        if self._snapshot is not None:
+            return self._snapshot()['credentials']['usernames']
+        return self.load_config()['credentials']['usernames']
+
+    def get_user(self, username):
+        """Return the stored details for one user, or None"""
+        details = self._users().get(username)
+        return dict(details) if details is not None else None
+
+    def upsert_user(self, username, details):
+        """Insert or replace one user; concurrent upserts are coalesced into one rewrite"""
+        username, details = user_key(username), dict(details)
+
+        def mutation(config):
+            removed = drop_other_spellings(config['credentials']['usernames'], {username})
+            config['credentials']['usernames'][username] = details
+            return removed
+        removed = self.writer.apply(mutation)
+        self._notify(dict.fromkeys(removed, None) | {username: details})
+
+    def upsert_users(self, users):
+        """Insert or replace many users ({username: details}) in a single rewrite"""
+        users = {user_key(username): dict(details) for username, details in users.items()}
+
+        def mutation(config):
+            removed = drop_other_spellings(config['credentials']['usernames'], users)
+            config['credentials']['usernames'].update(users)
+            return removed
+        removed = self.writer.apply(mutation)
+        self._notify(dict.fromkeys(removed, None) | users)
+
+    def save_section(self, key, value):
+        """Replace one top-level section such as 'cookie'"""
+        def mutation(config):
+            config[key] = value
+        self.writer.apply(mutation)
+        self._notify()
+
+    def _search(self, query, sort='username', descending=False):
+        # The file has to be parsed whole, so keep the last search (and its sort orders)
+        # until it changes; paging through results then costs a list slice per rerun.
+        # A snapshot is replaced, never modified, so it can stand in for the fingerprint
+        users = self._snapshot()['credentials']['usernames'] if self._snapshot is not None else None
+        key = (users if users is not None else self.fingerprint(), query.strip().lower())
+        last_key, matches, orders = self._last_search
+        if last_key != key:
+            matches = match_users(users if users is not None else self._users(), query)
+            orders = {}
+            self._last_search = (key, matches, orders)
+        if (sort, descending) == ('username', False):
+            return matches
+        if (sort, descending) not in orders:
+            orders[(sort, descending)] = match_users(dict(matches), '', sort, descending)
+        return orders[(sort, descending)]
+
+    def count_users(self, query=''):
+        """Return the number of registered users, optionally only those matching a search prefix"""
+        return len(self._search(query))
+
+    def search_users(self, query='', sort='username', descending=False, offset=0, limit=25):
+        """Return one page of (username, details) matching a prefix on username/name/email"""
+        if sort not in SEARCH_COLUMNS:
+            raise ValueError(f"Can't sort users by {sort!r}")
+        return self._search(query, sort, descending)[offset:offset + limit]
+
+    def iter_users(self, batch_size=1000):
+        """Yield lists of (username, details) in username order"""
+        users = sorted(self._users().items())
+        for offset in range(0, len(users), batch_size):
+            yield users[offset:offset + batch_size]
+
+
+class SqliteCredentialStore(ChangeNotifier):
+    """Credential store backed by SQLite, indexed by username and email"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._listeners = []
+        self._create_schema()
+
+    def _connect(self):
+        """Return a connection for the current thread (Streamlit runs sessions in threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    name TEXT,
+                    email TEXT,
+                    password TEXT,
+                    extra TEXT NOT NULL DEFAULT '{}'
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
+            # Case-insensitive prefix search and sort for the admin user directory
+            for column in SEARCH_COLUMNS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_users_{column}_lower ON users(lower({column}))')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            # Change counter, bumped in the same transaction as every write made through the store
+            conn.execute('CREATE TABLE IF NOT EXISTS data_version (version INTEGER NOT NULL)')
+            conn.execute('INSERT INTO data_version SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM data_version)')
+            # The users each version changed; a NULL username means anything else changed too
+            conn.execute('CREATE TABLE IF NOT EXISTS changes (version INTEGER NOT NULL, username TEXT)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_changes_version ON changes(version)')
+
+    @staticmethod
+    def _bump(conn, usernames=(None,)):
+        conn.execute('UPDATE data_version SET version = version + 1')
+        version = conn.execute('SELECT version FROM data_version').fetchone()[0]
+        conn.executemany('INSERT INTO changes VALUES (?, ?)', [(version, u) for u in usernames])
+        conn.execute('DELETE FROM changes WHERE version <= ?', (version - CHANGE_LOG_SIZE,))
+
+    def data_version(self):
+        """Return the change counter; it moves on every write committed through a store"""
+        return self._connect().execute('SELECT version FROM data_version').fetchone()[0]
+
+    def fingerprint(self):
+        """Cheap change detector: the change counter"""
+        return self.data_version()
+
+    def read_raw(self):
+        """Return the change counter as bytes; it identifies the content as exactly as a hash would"""
+        return str(self.data_version()).encode()
+
+    def parse_raw(self, raw):
+        """Load the config for bytes returned by read_raw (the current content, at that version or later)"""
+        return self.load_config()
+
+    def changes_since(self, key):
+        """Return (version, {username: details or None}) for the users changed after version `key`
+
+        None if anything other than users changed meanwhile, or the change
+        log no longer reaches back that far; the whole config has to be
+        re-read then.
+        """
+        conn = self._connect()
+        with conn:  # one read transaction, so the rows match the version
+            conn.execute('BEGIN')
+            version = self.data_version()
+            rows = conn.execute('SELECT version, username FROM changes WHERE version > ?', (key,)).fetchall()
+            if len({v for v, _ in rows}) != version - key or any(u is None for _, u in rows):
+                return None
+            users = dict.fromkeys({u for _, u in rows})
+            for username in users:
+                users[username] = self.get_user(username)
+        return version, users
+
+    @staticmethod
+    def _to_row(username, details):
+        extra = {k: v for k, v in details.items() if k not in USER_COLUMNS}
+        return (username, details.get('name'), details.get('email'),
+                details.get('password'), json.dumps(extra))
+
+    @staticmethod
+    def _from_row(row):
+        _, name, email, password, extra = row
+        details = {'email': email, 'name': name, 'password': password}
+        details.update(json.loads(extra))
+        return details
+
+    def load_config(self):
+        """Rebuild the config dict in the same layout as config.yaml"""
+        conn = self._connect()
+        config = {key: json.loads(value)
+                  for key, value in conn.execute('SELECT key, value FROM settings')}
+        rows = conn.execute('SELECT username, name, email, password, extra FROM users ORDER BY username')
+        config['credentials'] = {'usernames': {row[0]: self._from_row(row) for row in rows}}
+        return config
+
+    def save_config(self, config):
+        """Replace all users and settings with the contents of config"""
+        users = config['credentials']['usernames']
+        conn = self._connect()
+        with conn:
+            existing = {row[0] for row in conn.execute('SELECT username FROM users')}
+            conn.executemany('DELETE FROM users WHERE username = ?',
+                             [(u,) for u in existing - set(users)])
+            conn.executemany('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)',
+                             [self._to_row(u, d) for u, d in users.items()])
+            conn.execute('DELETE FROM settings')
+            conn.executemany('INSERT INTO settings VALUES (?, ?)',
+                             [(k, json.dumps(v)) for k, v in config.items() if k != 'credentials'])
+            self._bump(conn)
+        self._notify()
+
+    def get_user(self, username):
+        """Return the stored details for one user, or None"""
+        row = self._connect().execute(
+            'SELECT username, name, email, password, extra FROM users WHERE username = ?',
+            (username,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def upsert_user(self, username, details):
+        """Insert or replace a single user row"""
+        username = user_key(username)
+        conn = self._connect()
+        with conn:
+            removed = self._drop_other_spellings(conn, [username])
+            conn.execute('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)',
+                         self._to_row(username, details))
+            self._bump(conn, removed + [username])
+        self._notify(dict.fromkeys(removed, None) | {username: details})
+
+    def upsert_users(self, users):
+        """Insert or replace many users ({username: details}) in one transaction"""
+        users = {user_key(username): details for username, details in users.items()}
+        conn = self._connect()
+        with conn:
+            removed = self._drop_other_spellings(conn, users)
+            conn.executemany('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)',
+                             [self._to_row(u, d) for u, d in users.items()])
+            self._bump(conn, removed + list(users))
+        self._notify(dict.fromkeys(removed, None) | users)
+
+    def save_section(self, key, value):
+        """Replace one top-level section such as 'cookie'"""
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO settings VALUES (?, ?)', (key, json.dumps(value)))
+            self._bump(conn)
+        self._notify()
+
+    @staticmethod
+    def _drop_other_spellings(conn, keys):
+        # Found through the lower(username) index, so this costs a lookup per key
+        removed = [row[0] for key in keys for row in conn.execute(
+            'SELECT username FROM users WHERE lower(username) = ? AND username != ?', (key, key))]
+        conn.executemany('DELETE FROM users WHERE username = ?', [(u,) for u in removed])
+        return removed
+
+    @staticmethod
+    def _search_clause(query):
+        # Prefix match as an index range on lower(column): q <= value < q + U+10FFFF
+        query = query.strip().lower()
+        if not query:
+            return '', ()
+        clause = ' OR '.join(f'(lower({col}) >= ? AND lower({col}) < ?)' for col in SEARCH_COLUMNS)
+        return f'WHERE {clause}', (query, query + '\U0010ffff') * len(SEARCH_COLUMNS)
+
+    def count_users(self, query=''):
+        """Return the number of registered users, optionally only those matching a search prefix"""
+        where, params = self._search_clause(query)
+        return self._connect().execute(f'SELECT COUNT(*) FROM users {where}', params).fetchone()[0]
+
+    def search_users(self, query='', sort='username', descending=False, offset=0, limit=25):
+        """Return one page of (username, details) matching a prefix on username/name/email"""
+        if sort not in SEARCH_COLUMNS:
+            raise ValueError(f"Can't sort users by {sort!r}")
+        where, params = self._search_clause(query)
+        order = 'DESC' if descending else 'ASC'
+        rows = self._connect().execute(
+            f'SELECT username, name, email, password, extra FROM users {where} '
+            f'ORDER BY lower({sort}) {order}, username {order} LIMIT ? OFFSET ?',
+            params + (limit, offset)).fetchall()
+        return [(row[0], self._from_row(row)) for row in rows]
+
+    def iter_users(self, batch_size=1000):
+        """Yield lists of (username, details) in username order, one indexed page at a time"""
+        conn = self._connect()
+        last = ''
+        while True:
+            rows = conn.execute(
+                'SELECT username, name, email, password, extra FROM users WHERE username > ? '
+                'ORDER BY username LIMIT ?', (last, batch_size)).fetchall()
+            if not rows:
+                break
+            yield [(row[0], self._from_row(row)) for row in rows]
+            last = rows[-1][0]
+
+
+def migrate_yaml_to_sqlite(yaml_path=CONFIG_PATH, db_path=DB_PATH):
+    """One-shot copy of an existing config.yaml into a SQLite credential store"""
+    config = YamlCredentialStore(yaml_path).load_config()
+    SqliteCredentialStore(db_path).save_config(config)
+    return len(config['credentials']['usernames'])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide credential store selected by CREDENTIAL_BACKEND"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if BACKEND == 'sqlite':
+                _store = SqliteCredentialStore(DB_PATH)
+            else:
+                _store = YamlCredentialStore(CONFIG_PATH)
+        return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate config.yaml into a SQLite credential store")
+    parser.add_argument('--yaml', default=CONFIG_PATH, help="Source YAML config")
+    parser.add_argument('--db', default=DB_PATH, help="Target SQLite database")
+    args = parser.parse_args()
+
+    print(f"📦 Migrating {args.yaml} -> {args.db}...")
+    count = migrate_yaml_to_sqlite(args.yaml, args.db)
+    print(f"✅ Migrated {count} users. Set CREDENTIAL_BACKEND=sqlite to use it.")
@@ -0,0 +1,231 @@
+# data_pipeline.py - Event log loading and cached dashboard aggregations
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import count
+
+EVENTS_PATH = os.environ.get('EVENTS_PATH', 'data/events.parquet')
+
+EVENT_TYPES = ['page_view', 'signup', 'purchase']
+USER_SEGMENTS = ['New Users', 'Returning Users', 'Premium Users', 'Free Users']
+TRAFFIC_SOURCES = ['Direct', 'Organic Search', 'Social Media', 'Email', 'Paid Ads']
+DEVICE_TYPES = ['Desktop', 'Mobile', 'Tablet']
+REGIONS = ['North America', 'Europe', 'Asia', 'Other']
+
+# Columns whose values come from the lists above and are stored as categoricals
+CATEGORIES = {
+    'event_type': EVENT_TYPES,
+    'user_segment': USER_SEGMENTS,
+    'traffic_source': TRAFFIC_SOURCES,
+    'device_type': DEVICE_TYPES,
+    'region': REGIONS,
+}
+
+DAY = np.timedelta64(1, 'D')
+
+
+def generate_events(n_rows, days=90, end='2024-08-31', seed=0):
+    """Build a synthetic event log with the same schema as a real one"""
+    rng = np.random.default_rng(seed)
+    n_sessions = max(1, n_rows // 6)
+    n_users = max(1, n_sessions // 4)
+
+    # Session-level attributes, so every event in a session agrees
+    session_user = rng.integers(0, n_users, n_sessions)
+    session_start = (np.datetime64(end) + DAY - np.timedelta64(days, 'D')
+                     + rng.integers(0, days * 86400, n_sessions).astype('timedelta64[s]'))
+    session_attrs = {col: rng.integers(0, len(values), n_sessions) for col, values in CATEGORIES.items()
+                     if col != 'event_type'}
+
+    session_id = rng.integers(0, n_sessions, n_rows)
+    event_code = rng.choice(len(EVENT_TYPES), n_rows, p=[0.9, 0.04, 0.06])
+    revenue = np.where(event_code == EVENT_TYPES.index('purchase'),
+                       rng.lognormal(3.5, 0.8, n_rows).round(2), 0.0)
+    events = pd.DataFrame({
+        'timestamp': session_start[session_id] + rng.integers(0, 1800, n_rows).astype('timedelta64[s]'),
+        'user_id': session_user[session_id].astype(np.int32),
+        'session_id': session_id.astype(np.int32),
+        'event_type': pd.Categorical.from_codes(event_code, EVENT_TYPES),
+        'revenue': revenue.astype(np.float32),
+    })
+    for col, codes in session_attrs.items():
+        events[col] = pd.Categorical.from_codes(codes[session_id], CATEGORIES[col])
+    return events.sort_values('timestamp', ignore_index=True)
+
+
+def load_events(path):
+    """Read a Parquet or CSV event log and normalise its dtypes"""
+    if path.endswith('.parquet'):
+        events = pd.read_parquet(path)
+    else:
+        events = pd.read_csv(path, parse_dates=['timestamp'])
+    return normalize_events(events)
+
+
+def normalize_events(events):
+    """Compact dtypes: integer ids, categoricals for low-cardinality columns"""
+    events['timestamp'] = pd.to_datetime(events['timestamp'])
+    for col in ('user_id', 'session_id'):
+        if not pd.api.types.is_integer_dtype(events[col]):
+            events[col] = pd.factorize(events[col])[0].astype(np.int32)
+    for col, values in CATEGORIES.items():
+        if col in events:
+            events[col] = pd.Categorical(events[col], categories=values)
+    if 'revenue' not in events:
+        events['revenue'] = 0.0
+    return events.sort_values('timestamp', ignore_index=True)
+
+
+def _distinct_per_day(day_codes, ids, n_days):
+    """Count distinct ids per day without a Python-level groupby"""
+    stride = np.int64(ids.max()) + 1 if len(ids) else 1
+    pairs = pd.unique(day_codes.astype(np.int64) * stride + ids)
+    return np.bincount(pairs // stride, minlength=n_days)
+
+
+def compute_daily_metrics(events, start, end):
+    """Daily Users/Revenue/Sessions/Bounce_Rate for start..end inclusive"""
+    dates = pd.date_range(start, end, freq='D')
+    timestamps = events['timestamp'].to_numpy()
+    lo, hi = np.searchsorted(timestamps, [np.datetime64(start), np.datetime64(end) + DAY])
+    window = events.iloc[lo:hi]
+
+    day_codes = ((window['timestamp'].to_numpy() - np.datetime64(start)) // DAY).astype(np.int64)
+    user_ids = window['user_id'].to_numpy()
+    session_ids = window['session_id'].to_numpy()
+    n_days = len(dates)
+
+    # A session belongs to the day of its first event and bounces if it has a single event
+    session_codes, session_index = pd.factorize(session_ids)
+    session_events = np.bincount(session_codes)
+    session_first_day = np.full(len(session_index), n_days, dtype=np.int64)
+    np.minimum.at(session_first_day, session_codes, day_codes)
+    sessions = np.bincount(session_first_day, minlength=n_days)[:n_days]
+    bounces = np.bincount(session_first_day, weights=session_events == 1, minlength=n_days)[:n_days]
+
+    return pd.DataFrame({
+        'Date': dates,
+        'Users': _distinct_per_day(day_codes, user_ids, n_days)[:n_days],
+        'Revenue': np.bincount(day_codes, weights=window['revenue'].to_numpy(), minlength=n_days)[:n_days],
+        'Sessions': sessions,
+        'Bounce_Rate': np.divide(bounces, sessions, out=np.zeros(n_days), where=sessions > 0),
+    })
+
+
+def compute_summary(events, start, end):
+    """Headline metrics for the dashboard over start..end inclusive"""
+    timestamps = events['timestamp'].to_numpy()
+    lo, hi = np.searchsorted(timestamps, [np.datetime64(start), np.datetime64(end) + DAY])
+    window = events.iloc[lo:hi]
+    event_type = window['event_type'].cat.codes.to_numpy()
+    sessions = pd.unique(window['session_id'].to_numpy())
+    purchase_sessions = pd.unique(window['session_id'].to_numpy()[event_type == EVENT_TYPES.index('purchase')])
+    return {
+        'users': len(pd.unique(window['user_id'].to_numpy())),
+        'revenue': float(window['revenue'].sum()),
+        'conversion_rate': len(purchase_sessions) / len(sessions) if len(sessions) else 0.0,
+        'page_views': int((event_type == EVENT_TYPES.index('page_view')).sum()),
+    }
+
+
+class EventPipeline:
+    """Load the event log once per file version and cache aggregations per date window"""
+
+    def __init__(self, path=EVENTS_PATH, max_entries=64, demo_rows=200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.demo_rows = demo_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._events = (None, None)
+        self._results = OrderedDict()
+
+    @property
+    def is_demo(self):
+        """True when no event log exists and synthetic demo data is served"""
+        return not os.path.exists(self.path)
+
+    def version(self):
+        """Data version of the event log: (mtime, size), or 'demo' when it is missing"""
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return 'demo'
+
+    def events(self):
+        """Return the event DataFrame, re-reading it only when the file changes"""
+        version = self.version()
+        with self._lock:
+            if self._events[0] == version:
+                return self._events[1]
+            count('dataframe_builds')
+            events = generate_events(self.demo_rows, seed=42) if version == 'demo' else load_events(self.path)
+            self._events = (version, events)
+            self._results.clear()
+            return events
+
+    def date_bounds(self):
+        """(first day, last day) covered by the event log"""
+        return self._cached('bounds', lambda events: (
+            events['timestamp'].iloc[0].normalize(), events['timestamp'].iloc[-1].normalize()))
+
+    def window(self, days):
+        """(start, end) of the last `days` days of data"""
+        _, last = self.date_bounds()
+        return last - pd.Timedelta(days=days - 1), last
+
+    def daily_metrics(self, start, end):
+        """Cached daily series for start..end"""
+        return self._cached(('daily', start, end), lambda events: compute_daily_metrics(events, start, end))
+
+    def summary(self, start, end):
+        """Cached headline metrics for start..end"""
+        return self._cached(('summary', start, end), lambda events: compute_summary(events, start, end))
+
+    def iter_events(self, start, end, filters=None, chunk_size=100000):
+        """Yield raw events in start..end matching filters ({column: values}) in DataFrame chunks"""
+        events = self.events()
+        lo, hi = np.searchsorted(events['timestamp'].to_numpy(),
+                                 [np.datetime64(start), np.datetime64(end) + DAY])
+        for offset in range(lo, hi, chunk_size):
+            chunk = events.iloc[offset:min(offset + chunk_size, hi)]
+            for col, values in (filters or {}).items():
+                if values:
+                    chunk = chunk[chunk[col].isin(values)]
+            yield chunk
+
+    def _cached(self, key, compute):
+        events = self.events()
+        key = (self._events[0], key)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+        count('dataframe_builds')
+        result = compute(events)
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_event_pipeline():
+    """Return the process-wide event pipeline"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = EventPipeline()
+        return _pipeline
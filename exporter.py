@@ -0,0 +1,128 @@
+# exporter.py - Chunked CSV/Parquet/JSON Lines exports cached on disk
+import hashlib
+import os
+import tempfile
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, Parquet exports fall back to CSV
+    pa = pq = None
+
+EXPORT_DIR = os.environ.get('EXPORT_DIR', '.exports')
+
+# Export format -> (file extension, MIME type)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'JSON': ('jsonl', 'application/x-ndjson'),
+}
+
+
+def resolve_format(choice):
+    """Map a settings 'Default export format' choice onto a streamable format"""
+    if choice == 'Parquet' and pq is None:
+        return 'CSV'
+    # Excel and PDF can't be written incrementally, CSV opens in Excel anyway
+    return choice if choice in FORMATS else 'CSV'
+
+
+def write_chunks(chunks, file, fmt):
+    """Write an iterable of DataFrames to an open binary file without concatenating them"""
+    rows = 0
+    if fmt == 'Parquet':
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(file, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+    header = True
+    for chunk in chunks:
+        if fmt == 'JSON':
+            text = chunk.to_json(orient='records', lines=True, date_format='iso')
+            if text and not text.endswith('\n'):
+                text += '\n'
+        else:
+            text = chunk.to_csv(index=False, header=header)
+            header = False
+        file.write(text.encode())
+        rows += len(chunk)
+    return rows
+
+
+class Exporter:
+    """Produce export files once per query and serve them from a disk cache
+
+    Exports are written chunk by chunk to a temp file and renamed into place,
+    so peak memory is one chunk regardless of row count, and the artifact is
+    reused by every session asking for the same query in the same format.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, max_files=50):
+        self.directory = directory
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key, fmt):
+        """Cache path for a query key in a format"""
+        digest = hashlib.sha256(repr((key, fmt)).encode()).hexdigest()[:24]
+        return os.path.join(self.directory, f"{digest}.{FORMATS[fmt][0]}")
+
+    def export(self, key, chunks_fn, fmt):
+        """Return the path of the export for key, generating it from chunks_fn() if needed"""
+        path = self.path_for(key, fmt)
+        with self._lock:
+            key_lock = self._locks.setdefault(path, threading.Lock())
+        with key_lock:
+            if os.path.exists(path):
+                self.hits += 1
+                os.utime(path)
+                return path
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    write_chunks(chunks_fn(), file, fmt)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.misses += 1
+        self._prune()
+        return path
+
+    def _prune(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if not name.endswith('.tmp')]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_files]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Return the process-wide exporter"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = Exporter()
+        return _exporter
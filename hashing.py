@@ -0,0 +1,136 @@
+# hashing.py - Password hashing helpers shared by the setup scripts and the app
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+
+import bcrypt
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi is optional, only needed for scheme: argon2id
+    PasswordHasher = None
+
+DEFAULT_SCHEME = 'bcrypt'
+DEFAULT_ROUNDS = 12
+SCHEMES = ('bcrypt', 'argon2id')
+
+
+def load_policy(config):
+    """Return (scheme, rounds) from the optional `password_hashing` config section
+
+    For bcrypt `rounds` is the cost factor; for argon2id it is the time cost.
+    """
+    settings = config.get('password_hashing') or {}
+    scheme = settings.get('scheme', DEFAULT_SCHEME)
+    rounds = int(settings.get('rounds', DEFAULT_ROUNDS))
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown password hashing scheme '{scheme}', expected one of {SCHEMES}")
+    if scheme == 'argon2id' and PasswordHasher is None:
+        raise RuntimeError("password_hashing.scheme 'argon2id' requires: pip install argon2-cffi")
+    return scheme, rounds
+
+
+def hash_password(password, rounds=DEFAULT_ROUNDS, scheme=DEFAULT_SCHEME):
+    """Hash a single plain text password"""
+    if scheme == 'argon2id':
+        return PasswordHasher(time_cost=rounds).hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def verify_password(password, hashed):
+    """Check a plain text password against a bcrypt or argon2id hash"""
+    if hashed.startswith('$argon2'):
+        if PasswordHasher is None:
+            raise RuntimeError("argon2id hash found but argon2-cffi is not installed")
+        try:
+            return PasswordHasher().verify(hashed, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+def is_hash(value):
+    """Return True if value looks like a bcrypt or argon2id hash rather than plain text"""
+    if not isinstance(value, str):
+        return False
+    if value.startswith('$argon2id$'):
+        return True
+    return len(value) == 60 and value[:4] in ('$2a$', '$2b$', '$2y$')
+
+
+def needs_rehash(hashed, rounds=DEFAULT_ROUNDS, scheme=DEFAULT_SCHEME):
+    """Return True if hashed was made with a different scheme or cost than the target"""
+    if scheme == 'argon2id':
+        if not hashed.startswith('$argon2id$'):
+            return True
+        return PasswordHasher(time_cost=rounds).check_needs_rehash(hashed)
+    if not hashed.startswith('$2'):
+        return True
+    return int(hashed.split('$')[2]) != rounds
+
+
+def hash_passwords(passwords, workers=None, executor='process', rounds=DEFAULT_ROUNDS, window=1000,
+                   scheme=DEFAULT_SCHEME):
+    """Hash passwords across a worker pool, yielding hashes in input order
+
+    The input is consumed `window` passwords at a time so arbitrarily large
+    imports stream through with bounded memory. bcrypt releases the GIL while
+    hashing, so executor='thread' scales across cores too and avoids process
+    start-up cost for small batches.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    passwords = iter(passwords)
+    with pool_class(max_workers=workers) as pool:
+        while True:
+            chunk = list(islice(passwords, window))
+            if not chunk:
+                break
+            chunksize = max(1, len(chunk) // (workers * 4)) if executor == 'process' else 1
+            yield from pool.map(hash_password, chunk, repeat(rounds), repeat(scheme), chunksize=chunksize)
+
+
+def hash_list(passwords, workers=None, executor='thread', rounds=DEFAULT_ROUNDS):
+    """Parallel drop-in for stauth.Hasher.hash_list"""
+    return list(hash_passwords(passwords, workers, executor, rounds))
+
+
+def time_hash(rounds, scheme=DEFAULT_SCHEME, samples=3):
+    """Return the median time in ms to verify a password hashed at rounds"""
+    hashed = hash_password('calibration-password', rounds, scheme)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        verify_password('calibration-password', hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(target_ms, scheme=DEFAULT_SCHEME, min_rounds=4, max_rounds=16):
+    """Return (rounds, timings) for the highest cost whose login check stays within target_ms"""
+    best = min_rounds
+    timings = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = time_hash(rounds, scheme)
+        if timings[rounds] > target_ms:
+            break
+        best = rounds
+    return best, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick the password hashing cost for a target login latency")
+    parser.add_argument('--target-ms', type=float, default=250, help="Acceptable verify time per login")
+    parser.add_argument('--scheme', choices=SCHEMES, default=DEFAULT_SCHEME)
+    args = parser.parse_args()
+
+    print(f"⏱️ Calibrating {args.scheme} for a {args.target_ms:.0f} ms login on this machine...")
+    rounds, timings = calibrate(args.target_ms, args.scheme)
+    for r, ms in timings.items():
+        marker = "✅" if r == rounds else "  "
+        print(f"{marker} rounds {r:>2}: {ms:8.1f} ms")
+    print("\nAdd this to config.yaml:")
+    print(f"password_hashing:\n  scheme: {args.scheme}\n  rounds: {rounds}")
@@ -0,0 +1,198 @@
+# health.py - Background sampler of process/host health for the admin panel
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, /proc is read directly on Linux
+    psutil = None
+
+SAMPLE_INTERVAL = float(os.environ.get('HEALTH_SAMPLE_INTERVAL', '5'))
+SAMPLE_CAPACITY = int(os.environ.get('HEALTH_SAMPLE_CAPACITY', '720'))  # 1h at 5s
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+logger = logging.getLogger(__name__)
+
+
+def _host_cpu_times():
+    """(busy, total) CPU jiffies since boot, or None when unavailable"""
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(x) for x in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return sum(fields) - idle, sum(fields)
+
+
+def _process_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _host_memory_percent():
+    try:
+        with open('/proc/meminfo') as f:
+            info = {line.split(':')[0]: int(line.split()[1]) for line in f}
+        return 100.0 * (1 - info['MemAvailable'] / info['MemTotal'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def streamlit_sessions():
+    """Number of browser sessions connected to this Streamlit server, or None outside `streamlit run`"""
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return None
+    return Runtime.instance()._session_mgr.num_active_sessions()
+
+
+class HealthSampler:
+    """Sample system health on a daemon thread into a fixed-size ring buffer
+
+    Reruns never collect anything: pages only append their render time to a
+    bounded deque, and the sampler thread turns those into percentiles once
+    per interval. The sampler's own CPU time is tracked so its overhead can
+    be shown next to the numbers it produces. Failed samples are counted
+    and the latest error kept for stats(); a failure is logged when it
+    differs from the previous one, so a persistent fault logs once.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, capacity=SAMPLE_CAPACITY, disk_path='.'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.samples = deque(maxlen=capacity)
+        self.sample_seconds = 0.0
+        self.errors = 0
+        self.last_error = None
+        self.started = time.time()
+        self._renders = deque(maxlen=10000)
+        self._process = psutil.Process() if psutil else None
+        self._cpus = os.cpu_count() or 1
+        self._last = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the sampling thread once"""
+        with self._lock:
+            if self._thread is None:
+                self._last = self._cpu_counters()
+                self._thread = threading.Thread(target=self._loop, name='health-sampler', daemon=True)
+                self._thread.start()
+        return self
+
+    def record_render(self, page, elapsed_ms):
+        """Note one page render; called on every rerun, so it only appends"""
+        self._renders.append((page, elapsed_ms))
+
+    def history(self, field):
+        """Values of one sample field, oldest first"""
+        return [sample[field] for sample in list(self.samples)]
+
+    def latest(self):
+        """Most recent sample, or None before the first one"""
+        return self.samples[-1] if self.samples else None
+
+    def overhead(self):
+        """Fraction of one core spent sampling since start"""
+        return self.sample_seconds / max(time.time() - self.started, 1e-9)
+
+    def stats(self):
+        """Return sampling counters for monitoring"""
+        return {
+            'samples': len(self.samples),
+            'interval': self.interval,
+            'overhead': self.overhead(),
+            'errors': self.errors,
+            'last_error': self.last_error,
+        }
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:  # a failed sample must never take the thread down
+                self._failed('Health sample', e)
+
+    def _failed(self, what, error):
+        message = f"{what} failed: {type(error).__name__}: {error}"
+        if message != self.last_error:
+            logger.warning(message, exc_info=error)
+        self.errors += 1
+        self.last_error = message
+
+    def _sessions(self):
+        try:
+            return streamlit_sessions()
+        except Exception as e:  # a private Streamlit API; keep the rest of the sample
+            self._failed('Session count', e)
+            return None
+
+    def _cpu_counters(self):
+        times = os.times()
+        return time.monotonic(), times.user + times.system, _host_cpu_times()
+
+    def sample(self):
+        """Take one sample now and append it to the ring buffer"""
+        started = time.thread_time()
+        now, process_cpu, host_cpu = self._cpu_counters()
+        last_now, last_process_cpu, last_host_cpu = self._last
+        self._last = (now, process_cpu, host_cpu)
+        wall = max(now - last_now, 1e-9)
+
+        if psutil:
+            host_cpu_percent = psutil.cpu_percent(None)
+            rss = self._process.memory_info().rss
+            memory_percent = psutil.virtual_memory().percent
+        else:
+            host_cpu_percent = None
+            if host_cpu and last_host_cpu and host_cpu[1] > last_host_cpu[1]:
+                host_cpu_percent = 100.0 * (host_cpu[0] - last_host_cpu[0]) / (host_cpu[1] - last_host_cpu[1])
+            rss = _process_rss()
+            memory_percent = _host_memory_percent()
+        disk = shutil.disk_usage(self.disk_path)
+
+        renders = {}
+        for _ in range(len(self._renders)):
+            page, elapsed_ms = self._renders.popleft()
+            renders.setdefault(page, []).append(elapsed_ms)
+        all_renders = [ms for values in renders.values() for ms in values]
+
+        self.samples.append({
+            'time': time.time(),
+            'process_cpu': 100.0 * (process_cpu - last_process_cpu) / wall / self._cpus,
+            'host_cpu': host_cpu_percent,
+            'rss_mb': rss / 2**20 if rss is not None else None,
+            'memory': memory_percent,
+            'disk': 100.0 * disk.used / disk.total,
+            'sessions': self._sessions(),
+            'renders': len(all_renders),
+            'render_p95': float(np.percentile(all_renders, 95)) if all_renders else None,
+            'page_p95': {page: float(np.percentile(values, 95)) for page, values in renders.items()},
+        })
+        self.sample_seconds += time.thread_time() - started
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_health_sampler():
+    """Return the process-wide health sampler, started on first use"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = HealthSampler().start()
+        return _sampler
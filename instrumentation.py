@@ -0,0 +1,196 @@
+# instrumentation.py - Per-rerun timing, work counters and opt-in profiling
+import cProfile
+import io
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument is optional, cProfile is used instead
+    Profiler = None
+
+PROMETHEUS_FILE = os.environ.get('PERF_METRICS_FILE')  # textfile-collector output, off by default
+JSON_LOG = os.environ.get('PERF_LOG')                   # one JSON line per rerun, off by default
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Work counted per rerun by the modules that do it
+EVENTS = ('config_loads', 'password_verifications', 'dataframe_builds')
+
+_current = threading.local()
+
+
+class RerunStats:
+    """Timings and counters for one script run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.route = 'login'
+        self.sections = {}
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self.profile = None
+
+
+def count(event, n=1):
+    """Count work done during the current rerun; a no-op outside an instrumented rerun"""
+    stats = getattr(_current, 'stats', None)
+    if stats is not None:
+        stats.counts[event] = stats.counts.get(event, 0) + n
+
+
+def _start_profiler():
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    if Profiler is not None and isinstance(profiler, Profiler):
+        profiler.stop()
+        return profiler.output_text(unicode=True)
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(30)
+    return out.getvalue()
+
+
+@contextmanager
+def timed(section, page=False, profile=False, fragment=False):
+    """Time a block; the outermost block is the rerun and is recorded when it exits
+
+    `page=True` marks the block as the page being rendered, so counters are
+    labelled with it and its render time goes to the health sampler.
+    `fragment=True` marks the body of an st.fragment: when the fragment
+    reruns on its own it is the outermost block, and the rerun is labelled
+    with the fragment's name.
+    `profile=True` on the outermost block runs it under pyinstrument or
+    cProfile and leaves the text report on the yielded stats.
+    """
+    outer = getattr(_current, 'stats', None) is None
+    if outer:
+        _current.stats = RerunStats()
+    stats = _current.stats
+    if page or (fragment and outer):
+        stats.route = section
+    profiler = None
+    if outer and profile:
+        try:
+            profiler = _start_profiler()
+        except (RuntimeError, ValueError):  # another profiler is already active
+            profiler = None
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.sections[section] = stats.sections.get(section, 0.0) + elapsed
+        if page:
+            from health import get_health_sampler  # numpy, only needed once a page renders
+            get_health_sampler().record_render(section, elapsed * 1000)
+        if outer:
+            if profiler is not None:
+                stats.profile = _stop_profiler(profiler)
+            _current.stats = None
+            get_perf_registry().record(stats)
+
+
+def instrumented(section, page=False, fragment=False):
+    """Decorator form of timed()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(section, page=page, fragment=fragment):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PerfRegistry:
+    """Aggregate rerun stats into Prometheus-style histograms and counters"""
+
+    def __init__(self, prometheus_file=PROMETHEUS_FILE, json_log=JSON_LOG, write_interval=15.0):
+        self.prometheus_file = prometheus_file
+        self.json_log = json_log
+        self.write_interval = write_interval
+        self.histograms = {}   # section -> [bucket counts..., +Inf count, sum]
+        self.counters = {}     # (route, event) -> total
+        self.reruns = {}       # route -> total
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, stats):
+        """Fold one finished rerun into the totals and write the exports if due"""
+        with self._lock:
+            for section, seconds in stats.sections.items():
+                histogram = self.histograms.setdefault(section, [0] * (len(BUCKETS) + 2))
+                for i, bound in enumerate(BUCKETS):
+                    if seconds <= bound:
+                        histogram[i] += 1
+                histogram[-2] += 1
+                histogram[-1] += seconds
+            self.reruns[stats.route] = self.reruns.get(stats.route, 0) + 1
+            for event, n in stats.counts.items():
+                self.counters[(stats.route, event)] = self.counters.get((stats.route, event), 0) + n
+            write_due = self.prometheus_file and time.time() - self._last_write >= self.write_interval
+            if write_due:
+                self._last_write = time.time()
+        if self.json_log:
+            with open(self.json_log, 'a') as log:
+                log.write(json.dumps({
+                    'time': stats.started, 'route': stats.route,
+                    'sections_ms': {k: round(v * 1000, 3) for k, v in stats.sections.items()},
+                    **stats.counts}) + '\n')
+        if write_due:
+            self.write_prometheus()
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = ['# HELP streamlit_app_section_seconds Wall time of instrumented sections per rerun',
+                 '# TYPE streamlit_app_section_seconds histogram']
+        with self._lock:
+            for section, histogram in sorted(self.histograms.items()):
+                for bound, n in zip(BUCKETS, histogram):
+                    lines.append(f'streamlit_app_section_seconds_bucket{{section="{section}",le="{bound}"}} {n}')
+                lines.append(f'streamlit_app_section_seconds_bucket{{section="{section}",le="+Inf"}} {histogram[-2]}')
+                lines.append(f'streamlit_app_section_seconds_sum{{section="{section}"}} {histogram[-1]:.6f}')
+                lines.append(f'streamlit_app_section_seconds_count{{section="{section}"}} {histogram[-2]}')
+            lines += ['# HELP streamlit_app_reruns_total Script reruns by page',
+                      '# TYPE streamlit_app_reruns_total counter']
+            lines += [f'streamlit_app_reruns_total{{route="{route}"}} {n}' for route, n in sorted(self.reruns.items())]
+            lines += ['# HELP streamlit_app_rerun_events_total Work done during reruns by page',
+                      '# TYPE streamlit_app_rerun_events_total counter']
+            lines += [f'streamlit_app_rerun_events_total{{route="{route}",event="{event}"}} {n}'
+                      for (route, event), n in sorted(self.counters.items())]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self):
+        """Atomically replace the textfile-collector file"""
+        directory = os.path.dirname(os.path.abspath(self.prometheus_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            file.write(self.prometheus_text())
+        os.replace(tmp_path, self.prometheus_file)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_perf_registry():
+    """Return the process-wide rerun metrics registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PerfRegistry()
+        return _registry
@@ -0,0 +1,148 @@
+# login_service.py - Password verification used by the authenticator's login form
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+
+from hashing import hash_password, needs_rehash, verify_password
+from instrumentation import count
+
+logger = logging.getLogger(__name__)
+
+
+class ServerBusyError(Exception):
+    """Raised when the login verification queue is full or a check doesn't finish in time"""
+
+
+def load_pool_settings(config):
+    """Return keyword arguments for VerificationPool from the optional `login` config section"""
+    settings = config.get('login') or {}
+    return {
+        'max_concurrency': settings.get('max_concurrency'),
+        'max_queue': settings.get('max_queue'),
+        'timeout': float(settings.get('timeout_seconds', 30)),
+        'executor': settings.get('executor', 'thread'),
+    }
+
+
+class VerificationPool:
+    """Run password hashing on a bounded worker pool and reject work when the queue is full
+
+    At most `max_concurrency` hashes run at once, so a burst of logins cannot
+    take every core away from dashboard reruns, and at most `max_queue` more
+    wait behind them. Anything beyond that fails fast with ServerBusyError
+    instead of piling up blocked script threads, as does work that hasn't
+    finished within `timeout` seconds.
+    """
+
+    def __init__(self, max_concurrency=None, max_queue=None, timeout=30, executor='thread'):
+        self.max_concurrency = max_concurrency or max(1, (os.cpu_count() or 2) - 1)
+        self.max_queue = self.max_concurrency * 4 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.max_queue)
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        self._executor = pool_class(max_workers=self.max_concurrency)
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for the result, or raise ServerBusyError"""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise ServerBusyError("Server busy, please retry in a few seconds")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Free the slot when the work actually finishes, even if we stop waiting on it
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Drop it if it is still queued; a hash already running holds its slot until it ends
+            future.cancel()
+            self.timed_out += 1
+            raise ServerBusyError("Server busy, please retry in a few seconds") from None
+        self.completed += 1
+        return result
+
+    def verify(self, password, hashed):
+        """Check a password against a stored hash on the pool"""
+        count('password_verifications')
+        return self.run(verify_password, password, hashed)
+
+    def hash(self, password, rounds, scheme):
+        """Hash a password on the pool"""
+        return self.run(hash_password, password, rounds, scheme)
+
+
+class LoginVerifier:
+    """Verify login passwords and upgrade outdated hashes to the configured policy
+
+    Installed in place of the authentication model's `check_credentials`, so it
+    runs inside `authenticator.login()` (and the current-password check of
+    `reset_password`) while the plain text password is still available.
+    """
+
+    def __init__(self, store, scheme, rounds, pool, limiter, client_fn=lambda: None, activity=None):
+        self.store = store
+        self.scheme = scheme
+        self.rounds = rounds
+        self.pool = pool
+        self.limiter = limiter
+        self.client_fn = client_fn
+        self.activity = activity
+        self.rehashed = 0
+
+    def install(self, authenticator):
+        """Route the authenticator's password checks through this verifier"""
+        model = authenticator.authentication_controller.authentication_model
+        model.check_credentials = partial(self.check_credentials, model)
+        return authenticator
+
+    def check_credentials(self, model, username, password):
+        """Same contract as stauth's AuthenticationModel.check_credentials"""
+        client = self.client_fn()
+        # Throttle before spending any CPU on hashing
+        self.limiter.check(username, client)
+        user = model.credentials['usernames'].get(username)
+        if user is None:
+            self.limiter.record_failure(username, client)
+            self.log(username, 'failure', client)
+            return False
+        try:
+            if not self.pool.verify(password, user['password']):
+                self.limiter.record_failure(username, client)
+                self.log(username, 'failure', client)
+                model._record_failed_login_attempts(username)
+                return False
+        except (TypeError, ValueError) as e:
+            print(f'{e} please hash all plain text passwords')
+            return None
+        self.limiter.record_success(username)
+        self.log(username, 'success', client)
+        if needs_rehash(user['password'], self.rounds, self.scheme):
+            try:
+                self.rehash(username, user, password)
+            except Exception as e:  # Not worth failing a good login over - upgrade on the next one
+                logger.warning("Rehashing the password of %s failed: %s", username, e)
+        return True
+
+    def log(self, username, status, client):
+        """Add the password check to the activity log, if one is attached"""
+        if self.activity is not None:
+            self.activity.record(username, 'login', status, client)
+
+    def hash(self, password):
+        """Hash a new password under the current policy, on the pool"""
+        return self.pool.hash(password, self.rounds, self.scheme)
+
+    def rehash(self, username, user, password):
+        """Replace a user's stored hash with one made under the current policy"""
+        user['password'] = self.hash(password)
+        self.store.upsert_user(username, user)
+        self.rehashed += 1
@@ -1,5 +1,5 @@
 # generate_passwords.py
-import streamlit_authenticator as stauth
+from hashing import hash_list
 
 def generate_password_hashes():
     """Generate hashed passwords for your users"""
@@ -7,8 +7,8 @@ def generate_password_hashes():
     # List of plain text passwords
     passwords = ['admin123', 'password456', 'securepass789']
     
-    # Generate hashes using the new API
-    hashed_passwords = stauth.Hasher.hash_list(passwords)
+    # Generate hashes in parallel (bcrypt releases the GIL)
+    hashed_passwords = hash_list(passwords)
     # hashed_passwords = stauth.Hasher(passwords).generate()
     
     # Print the results
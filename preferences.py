@@ -0,0 +1,187 @@
+# preferences.py - Per-user settings with a read cache and write-behind persistence
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from change_bus import get_change_bus
+
+PREFERENCES_DB = os.environ.get('PREFERENCES_DB', 'preferences.db')
+
+# Every setting on the settings page and its default
+DEFAULTS = {
+    'theme': 'Light',
+    'language': 'English',
+    'timezone': 'UTC',
+    'date_format': 'MM/DD/YYYY',
+    'dashboard_layout': 'Compact',
+    'email_notifications': True,
+    'push_notifications': False,
+    'weekly_digest': True,
+    'email_frequency': 'Immediate',
+    'notify_login': True,
+    'notify_reports': True,
+    'notify_security': True,
+    'notify_goals': False,
+    'two_factor': False,
+    'login_alerts': True,
+    'session_timeout': None,  # minutes, None means the configured login.session_timeout_minutes
+    'remember_device': False,
+    'min_password_length': 8,
+    'require_special': True,
+    'require_numbers': True,
+    'api_access': False,
+    'debug_mode': False,
+    'data_retention': '30 days',
+    'export_format': 'CSV',
+}
+
+
+class PreferenceStore:
+    """Per-user preferences in their own SQLite file, cached in memory and written behind
+
+    `get()` is a dict lookup once a user has been read. `save()` updates the
+    cache and returns immediately; a background thread writes every pending
+    user in one transaction after `flush_delay` seconds, so a burst of saves
+    costs one commit. Preferences never touch the credential store. With a
+    change bus, each flush tells the other replicas which users changed so
+    they drop those users from their caches.
+    """
+
+    def __init__(self, path=PREFERENCES_DB, flush_delay=1.0, max_cached=10000, bus=None):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.max_cached = max_cached
+        self.bus = bus
+        self.flushes = 0
+        self._cache = OrderedDict()   # username -> read-only merged prefs
+        self._dirty = {}              # username -> prefs waiting to be written
+        self._forgotten = 0           # bumped whenever another process's saves are dropped from the cache
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._worker = None
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS preferences (
+                    username TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+        if bus is not None:
+            bus.subscribe('preferences', self.forget)
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, username):
+        """Return username's preferences (defaults filled in) as a read-only mapping"""
+        if not username:
+            return MappingProxyType(dict(DEFAULTS))
+        with self._lock:
+            prefs = self._cache.get(username)
+            if prefs is not None:
+                self._cache.move_to_end(username)
+                return prefs
+            generation = self._forgotten
+        row = self._connect().execute('SELECT data FROM preferences WHERE username = ?', (username,)).fetchone()
+        prefs = MappingProxyType({**DEFAULTS, **(json.loads(row[0]) if row else {})})
+        with self._lock:
+            if self._forgotten != generation:
+                return prefs  # another process saved meanwhile; what we read may predate it
+            # A save may have landed while we were reading, it wins
+            return self._remember(username, self._cache.get(username) or prefs)
+
+    def save(self, username, prefs):
+        """Update username's preferences now and persist them in the background"""
+        prefs = {key: value for key, value in prefs.items() if key in DEFAULTS}
+        with self._lock:
+            merged = MappingProxyType({**self._cache.get(username, DEFAULTS), **prefs})
+            self._remember(username, merged)
+            self._dirty[username] = dict(merged)
+        self._ensure_worker()
+        self._wakeup.set()
+        return merged
+
+    def flush(self):
+        """Write every pending save now"""
+        with self._lock:
+            pending, self._dirty = self._dirty, {}
+        if not pending:
+            return
+        conn = self._connect()
+        now = time.time()
+        try:
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO preferences VALUES (?, ?, ?)',
+                                 [(username, json.dumps(prefs), now) for username, prefs in pending.items()])
+        except sqlite3.Error:
+            with self._lock:
+                # Keep them for the next attempt unless a newer save replaced them
+                for username, prefs in pending.items():
+                    self._dirty.setdefault(username, prefs)
+            raise
+        self.flushes += 1
+        if self.bus is not None:
+            self.bus.publish('preferences', sorted(pending))
+
+    def forget(self, usernames):
+        """Drop cached preferences of usernames (saved by another process) so the next get() reads them"""
+        with self._lock:
+            self._forgotten += 1
+            for username in usernames:
+                if username not in self._dirty:
+                    self._cache.pop(username, None)
+
+    def _remember(self, username, prefs):
+        self._cache[username] = prefs
+        self._cache.move_to_end(username)
+        while len(self._cache) > self.max_cached:
+            oldest = next(iter(self._cache))
+            if oldest in self._dirty:  # never drop a save that hasn't been written
+                break
+            del self._cache[oldest]
+        return prefs
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='preferences-writer', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let more saves pile on before committing
+            time.sleep(self.flush_delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                self._wakeup.set()
+
+
+_preferences = None
+_preferences_lock = threading.Lock()
+
+
+def get_preferences():
+    """Return the process-wide preference store"""
+    global _preferences
+    with _preferences_lock:
+        if _preferences is None:
+            _preferences = PreferenceStore(bus=get_change_bus())
+        return _preferences
@@ -0,0 +1,142 @@
+# rate_limiter.py - Sliding-window throttling of failed logins
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class TooManyAttemptsError(Exception):
+    """Raised when a username or client is over its failed-login limit"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        minutes = max(1, int(retry_after // 60) + 1)
+        super().__init__(f"Too many failed login attempts. Try again in about {minutes} minute(s).")
+
+
+class MemoryFailureLog:
+    """Per-process failed-login timestamps keyed by username and client"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def add(self, keys, now):
+        with self._lock:
+            for key in keys:
+                self._keys.setdefault(key, deque()).append(now)
+            if len(self._keys) > self.max_keys:
+                self._sweep(now - DAY_SECONDS)
+
+    def recent(self, key, since):
+        """Return the timestamps for key newer than since, oldest first"""
+        with self._lock:
+            times = self._keys.get(key)
+            if not times:
+                return []
+            while times and times[0] < since:
+                times.popleft()
+            return list(times)
+
+    def clear(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def _sweep(self, before):
+        for key in [k for k, times in self._keys.items() if not times or times[-1] < before]:
+            del self._keys[key]
+
+
+class SqliteFailureLog:
+    """Failed-login log in SQLite so every worker process shares the same counters"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS login_failures (key TEXT NOT NULL, ts REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_login_failures_key_ts ON login_failures(key, ts)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_login_failures_ts ON login_failures(ts)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def add(self, keys, now):
+        conn = self._connect()
+        with conn:
+            conn.executemany('INSERT INTO login_failures VALUES (?, ?)',
+                             [(key, now) for key in keys])
+            conn.execute('DELETE FROM login_failures WHERE ts < ?', (now - DAY_SECONDS,))
+
+    def recent(self, key, since):
+        rows = self._connect().execute(
+            'SELECT ts FROM login_failures WHERE key = ? AND ts >= ? ORDER BY ts', (key, since))
+        return [row[0] for row in rows]
+
+    def clear(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM login_failures WHERE key = ?', (key,))
+
+
+class LoginRateLimiter:
+    """Reject login attempts once a username or client has too many recent failures
+
+    `check()` runs before any password hash is computed, so over-limit
+    credential stuffing costs a dict or index lookup rather than a bcrypt
+    verification. Each key stays blocked until its oldest failure in the
+    window ages out.
+    """
+
+    def __init__(self, log, max_per_user=5, max_per_client=20, window=15 * 60):
+        self.log = log
+        self.max_per_user = max_per_user
+        self.max_per_client = max_per_client
+        self.window = window
+        self.rejected = 0
+
+    def check(self, username, client=None):
+        """Raise TooManyAttemptsError if username or client is over its limit"""
+        now = time.time()
+        for key, limit in self._limits(username, client):
+            recent = self.log.recent(key, now - self.window)
+            if len(recent) >= limit:
+                self.rejected += 1
+                raise TooManyAttemptsError(recent[len(recent) - limit] + self.window - now)
+
+    def record_failure(self, username, client=None):
+        self.log.add([key for key, _ in self._limits(username, client)], time.time())
+
+    def record_success(self, username):
+        """A correct password resets the per-username counter (the client counter is kept)"""
+        self.log.clear(f'user:{username}')
+
+    def _limits(self, username, client):
+        limits = [(f'user:{username}', self.max_per_user)]
+        if client:
+            limits.append((f'client:{client}', self.max_per_client))
+        return limits
+
+
+def load_rate_limiter(config):
+    """Build a LoginRateLimiter from the optional `login` config section"""
+    settings = config.get('login') or {}
+    if settings.get('rate_limit_backend', 'memory') == 'sqlite':
+        log = SqliteFailureLog(settings.get('rate_limit_db', os.environ.get('RATE_LIMIT_DB', 'login_attempts.db')))
+    else:
+        log = MemoryFailureLog()
+    return LoginRateLimiter(
+        log,
+        max_per_user=int(settings.get('max_failures_per_user', 5)),
+        max_per_client=int(settings.get('max_failures_per_client', 20)),
+        window=float(settings.get('failure_window_seconds', 15 * 60)),
+    )
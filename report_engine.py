@@ -0,0 +1,236 @@
+# report_engine.py - Filtered analytics reports served from pre-aggregated rollups
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import CATEGORIES, EVENT_TYPES, get_event_pipeline
+
+GRANULARITIES = {'Hourly': 'h', 'Daily': 'D', 'Weekly': 'W', 'Monthly': 'M'}
+# Reports are cut from whole days (or hours), then resampled, so a range that starts or
+# ends mid-week or mid-month only counts the days it covers - only these two levels are rolled up
+SOURCE_LEVEL = {'Hourly': 'Hourly', 'Daily': 'Daily', 'Weekly': 'Daily', 'Monthly': 'Daily'}
+
+DIMENSIONS = ['user_segment', 'traffic_source', 'device_type', 'region']
+ADDITIVE_MEASURES = ['events', 'page_views', 'conversions', 'revenue', 'sessions', 'session_seconds']
+METRICS = ['Users', 'Revenue', 'Conversions', 'Page Views', 'Session Duration']
+
+
+def bucket_start(timestamps, granularity):
+    """Floor timestamps to the start of their hour/day/week (Monday)/month"""
+    timestamps = pd.DatetimeIndex(timestamps)
+    if granularity == 'Weekly':
+        return timestamps.normalize() - pd.to_timedelta(timestamps.dayofweek, unit='D')
+    if granularity == 'Monthly':
+        return timestamps.to_period('M').to_timestamp()
+    return timestamps.floor(GRANULARITIES[granularity])
+
+
+def _cell_codes(events, granularity):
+    """Integer id per (bucket, dimensions) cell for every event, plus the distinct cells"""
+    dim_code = np.zeros(len(events), dtype=np.int64)
+    for col in DIMENSIONS:
+        dim_code = dim_code * len(CATEGORIES[col]) + events[col].cat.codes.to_numpy()
+    buckets = bucket_start(events['timestamp'], granularity)
+    bucket_codes, bucket_index = pd.factorize(buckets, sort=True)
+    n_dims = int(np.prod([len(CATEGORIES[col]) for col in DIMENSIONS]))
+    return bucket_codes.astype(np.int64) * n_dims + dim_code, bucket_index, n_dims
+
+
+def _decode_cells(cells, bucket_index, n_dims):
+    """Turn cell ids back into bucket and dimension columns"""
+    frame = {'bucket': bucket_index[cells // n_dims]}
+    dim_code = cells % n_dims
+    for col in reversed(DIMENSIONS):
+        size = len(CATEGORIES[col])
+        frame[col] = pd.Categorical.from_codes(dim_code % size, CATEGORIES[col])
+        dim_code //= size
+    return pd.DataFrame(frame)[['bucket'] + DIMENSIONS]
+
+
+def user_cells(events, granularity):
+    """The distinct (bucket, dimensions, user_id) rows of the event log
+
+    This is each cell's user set, so distinct users can be counted exactly over
+    any union of cells - summing per-cell counts would count a user once per
+    day, device, etc.
+    """
+    cell, bucket_index, n_dims = _cell_codes(events, granularity)
+    stride = np.int64(events['user_id'].max()) + 1 if len(events) else 1
+    pairs = np.unique(cell * stride + events['user_id'].to_numpy())
+    frame = _decode_cells(pairs // stride, bucket_index, n_dims)
+    frame['user_id'] = (pairs % stride).astype(np.int32)
+    return frame
+
+
+def build_hourly_rollup(events):
+    """Aggregate raw events into the finest (hourly) rollup with one bincount pass per measure"""
+    cell, bucket_index, n_dims = _cell_codes(events, 'Hourly')
+    cells, inverse = np.unique(cell, return_inverse=True)
+    event_type = events['event_type'].cat.codes.to_numpy()
+    timestamps = events['timestamp'].to_numpy().astype('datetime64[s]').astype(np.int64)
+
+    # Sessions count in the cell of their first event; duration is last minus first event
+    session_codes, _ = pd.factorize(events['session_id'].to_numpy())
+    first_pos = np.unique(session_codes, return_index=True)[1]
+    last_seen = np.zeros(len(first_pos), dtype=np.int64)
+    np.maximum.at(last_seen, session_codes, timestamps)
+    duration = last_seen - timestamps[first_pos]
+
+    n = len(cells)
+    rollup = _decode_cells(cells, bucket_index, n_dims)
+    rollup['events'] = np.bincount(inverse, minlength=n)
+    rollup['page_views'] = np.bincount(inverse, weights=event_type == EVENT_TYPES.index('page_view'), minlength=n)
+    rollup['conversions'] = np.bincount(inverse, weights=event_type == EVENT_TYPES.index('purchase'), minlength=n)
+    rollup['revenue'] = np.bincount(inverse, weights=events['revenue'].to_numpy(), minlength=n)
+    rollup['sessions'] = np.bincount(inverse[first_pos], minlength=n)
+    rollup['session_seconds'] = np.bincount(inverse[first_pos], weights=duration, minlength=n)
+    return rollup
+
+
+def roll_up(finer, granularity):
+    """Sum additive measures of a finer rollup into coarser buckets"""
+    coarser = finer.assign(bucket=bucket_start(finer['bucket'], granularity))
+    return coarser.groupby(['bucket'] + DIMENSIONS, observed=True, as_index=False)[ADDITIVE_MEASURES].sum()
+
+
+def metric_column(frame, metric):
+    """Series for one of the METRICS from an aggregated frame"""
+    if metric == 'Users':
+        return frame['users']
+    if metric == 'Revenue':
+        return frame['revenue']
+    if metric == 'Conversions':
+        return frame['conversions']
+    if metric == 'Page Views':
+        return frame['page_views']
+    return (frame['session_seconds'] / frame['sessions'].where(frame['sessions'] > 0)).fillna(0) / 60
+
+
+class ReportEngine:
+    """Answer analytics reports from hourly and daily rollups of the event log
+
+    Rollups are built once per data version. Changing the date range, filters,
+    metric or granularity only filters and sums an already-built rollup: the
+    daily one (hourly for Hourly reports) is cut to the requested days and then
+    resampled into weeks or months. Users are counted from each cell's user set,
+    so they are distinct over the whole bucket, device or range.
+    """
+
+    def __init__(self, pipeline, max_reports=128, latency_window=1000):
+        self.pipeline = pipeline
+        self.max_reports = max_reports
+        self._lock = threading.Lock()
+        self._version = None
+        self._rollups = {}
+        self._reports = OrderedDict()
+        self._latencies = deque(maxlen=latency_window)
+
+    def _cached(self, key, build):
+        version = self.pipeline.version()
+        events = self.pipeline.events()
+        with self._lock:
+            if version != self._version:
+                self._rollups.clear()
+                self._reports.clear()
+                self._version = version
+            cached = self._rollups.get(key)
+        if cached is not None:
+            return cached
+        built = build(events)
+        with self._lock:
+            return self._rollups.setdefault(key, built)
+
+    def rollup(self, granularity):
+        """Return the Hourly or Daily rollup, building it on first use (Daily is summed from Hourly)"""
+        if granularity == 'Hourly':
+            return self._cached(granularity, build_hourly_rollup)
+        return self._cached(granularity, lambda events: roll_up(self.rollup('Hourly'), granularity))
+
+    def user_cells(self, granularity):
+        """Return the per-cell user sets for granularity, building them on first use"""
+        return self._cached((granularity, 'users'), lambda events: user_cells(events, granularity))
+
+    def prepare(self, granularity):
+        """Build everything a report at this granularity reads from"""
+        self.rollup(SOURCE_LEVEL[granularity])
+        self.user_cells(SOURCE_LEVEL[granularity])
+
+    def report(self, start, end, metric, granularity, filters=None):
+        """Return the report dict for the given controls, timing and caching it"""
+        started = time.perf_counter()
+        filters = {col: tuple(sorted(values)) for col, values in (filters or {}).items() if values}
+        key = (self.pipeline.version(), pd.Timestamp(start), pd.Timestamp(end), metric, granularity,
+               tuple(sorted(filters.items())))
+        with self._lock:
+            result = self._reports.get(key)
+            if result is not None:
+                self._reports.move_to_end(key)
+        if result is None:
+            level = SOURCE_LEVEL[granularity]
+            result = self._compute(self.rollup(level), self.user_cells(level), key[1], key[2],
+                                   metric, granularity, filters)
+            with self._lock:
+                self._reports[key] = result
+                while len(self._reports) > self.max_reports:
+                    self._reports.popitem(last=False)
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._latencies.append(elapsed)
+        return dict(result, latency_ms=elapsed)
+
+    @staticmethod
+    def _select(frame, start, end, granularity, filters):
+        """Rows of a daily/hourly frame inside start..end and the filters, rebucketed to granularity"""
+        mask = (frame['bucket'] >= start) & (frame['bucket'] < end + pd.Timedelta(days=1))
+        for col, values in filters.items():
+            mask &= frame[col].isin(values)
+        selected = frame[mask]
+        if granularity != SOURCE_LEVEL[granularity]:
+            selected = selected.assign(bucket=bucket_start(selected['bucket'], granularity))
+        return selected
+
+    def _compute(self, rollup, users, start, end, metric, granularity, filters):
+        selected = self._select(rollup, start, end, granularity, filters)
+        users = self._select(users, start, end, granularity, filters)
+
+        by_bucket = selected.groupby('bucket')[ADDITIVE_MEASURES].sum()
+        by_bucket['users'] = users.groupby('bucket')['user_id'].nunique().reindex(by_bucket.index, fill_value=0)
+        by_device = selected.groupby('device_type', observed=False)[ADDITIVE_MEASURES].sum()
+        by_device['users'] = users.groupby('device_type', observed=False)['user_id'].nunique()
+        totals = selected[ADDITIVE_MEASURES].sum()
+        return {
+            'trend': metric_column(by_bucket, metric).rename(metric),
+            'breakdown': metric_column(by_device, metric).rename(metric),
+            'table': by_bucket.reset_index().rename(columns={
+                'bucket': 'Date', 'users': 'Users', 'sessions': 'Sessions', 'revenue': 'Revenue',
+                'page_views': 'Page Views', 'conversions': 'Conversions'})[
+                    ['Date', 'Users', 'Sessions', 'Revenue', 'Page Views', 'Conversions']],
+            'total_records': int(totals['events']),
+            'total_users': int(users['user_id'].nunique()),
+            'avg_session_minutes': totals['session_seconds'] / totals['sessions'] / 60 if totals['sessions'] else 0.0,
+            'conversion_rate': totals['conversions'] / totals['sessions'] if totals['sessions'] else 0.0,
+        }
+
+    def latency_percentiles(self):
+        """(p50, p95, count) of recent report latencies in ms"""
+        with self._lock:
+            latencies = np.array(self._latencies)
+        if not len(latencies):
+            return 0.0, 0.0, 0
+        return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95)), len(latencies)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_report_engine():
+    """Return the process-wide report engine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ReportEngine(get_event_pipeline())
+        return _engine
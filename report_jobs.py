@@ -0,0 +1,121 @@
+# report_jobs.py - Background analytics report jobs shared across sessions
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from report_engine import get_report_engine
+
+
+class ReportJob:
+    """State of one report computation, polled by the sessions waiting on it"""
+
+    def __init__(self, job_id, params):
+        self.job_id = job_id
+        self.params = params
+        self.state = 'queued'
+        self.progress = 0.0
+        self.message = "Queued..."
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.state in ('done', 'failed')
+
+    def update(self, progress, message):
+        self.progress, self.message = progress, message
+
+
+def report_params(start, end, metric, granularity, filters=None):
+    """Normalise report controls into a hashable, order-independent params dict"""
+    return {
+        'start': pd.Timestamp(start),
+        'end': pd.Timestamp(end),
+        'metric': metric,
+        'granularity': granularity,
+        'filters': {col: tuple(sorted(values)) for col, values in sorted((filters or {}).items()) if values},
+    }
+
+
+class ReportJobRunner:
+    """Run reports on a background pool so reruns neither block on nor discard them
+
+    Jobs are identified by a hash of the data version and report parameters, so
+    identical reports requested by different users (or by the same user twice)
+    are computed once and the finished result is served from cache.
+    """
+
+    def __init__(self, engine, max_workers=2, max_jobs=128):
+        self.engine = engine
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def job_id(self, params):
+        """Stable id for params against the current data version"""
+        key = repr((self.engine.pipeline.version(), sorted(params.items())))
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def submit(self, params):
+        """Queue a report (or join an identical one) and return its job id"""
+        job_id = self.job_id(params)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state != 'failed':
+                self._jobs.move_to_end(job_id)
+                return job_id
+            job = ReportJob(job_id, params)
+            self._jobs[job_id] = job
+            self._evict()
+        self._executor.submit(self._run, job)
+        return job_id
+
+    def get(self, job_id):
+        """Return the ReportJob for job_id, or None if it was evicted"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.state = 'running'
+        try:
+            job.update(0.1, "Loading event data...")
+            self.engine.pipeline.events()
+            job.update(0.4, f"Building {job.params['granularity'].lower()} rollup...")
+            self.engine.prepare(job.params['granularity'])
+            job.update(0.8, "Aggregating report...")
+            job.result = self.engine.report(**job.params)
+            job.update(1.0, "Done")
+            job.state = 'done'
+        except Exception as e:
+            job.error = e
+            job.state = 'failed'
+        finally:
+            job.finished = time.time()
+
+    def _evict(self):
+        # Drop the oldest finished jobs; running ones are kept so nobody loses a result
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_report_runner():
+    """Return the process-wide report job runner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ReportJobRunner(get_report_engine())
+        return _runner
@@ -0,0 +1,292 @@
+# session_registry.py - Live Streamlit sessions and per-user login statistics
+import heapq
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def current_session_id():
+    """Id of the Streamlit session running this script, or None outside a script run"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+class MemorySessionLog:
+    """Per-process session table with O(1) counts
+
+    Each session is one small tuple; expiry deadlines sit in a heap so
+    expiring idle sessions only touches the ones that actually expired.
+    Stale heap entries left behind by heartbeats are compacted away once
+    they outnumber live sessions, keeping memory proportional to sessions.
+    """
+
+    def __init__(self, max_sessions=100000):
+        self.max_sessions = max_sessions
+        self._sessions = {}       # session_id -> (username, expires_at)
+        self._deadlines = []      # heap of (expires_at, session_id), may hold stale entries
+        self._user_active = {}    # username -> live session count
+        self._user_stats = {}     # username -> (logins, last_login, previous_login)
+        self._lock = threading.Lock()
+
+    def login(self, session_id, username, now, expires_at):
+        with self._lock:
+            self._put(session_id, username, expires_at)
+            logins, last_login, _ = self._user_stats.get(username, (0, None, None))
+            self._user_stats[username] = (logins + 1, now, last_login)
+
+    def touch(self, session_id, username, now, expires_at):
+        """Extend a live session; an expired or evicted one is re-added without counting a login"""
+        with self._lock:
+            self._put(session_id, username, expires_at)
+            self._expire(now)
+
+    def remove(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._release(entry[0])
+
+    def active_sessions(self, now):
+        with self._lock:
+            self._expire(now)
+            return len(self._sessions)
+
+    def active_users(self, now):
+        with self._lock:
+            self._expire(now)
+            return len(self._user_active)
+
+    def user_sessions(self, username, now):
+        with self._lock:
+            self._expire(now)
+            return self._user_active.get(username, 0)
+
+    def user_stats(self, username):
+        logins, last_login, previous_login = self._user_stats.get(username, (0, None, None))
+        return {'logins': logins, 'last_login': last_login, 'previous_login': previous_login}
+
+    def _put(self, session_id, username, expires_at):
+        previous = self._sessions.get(session_id)
+        if previous is None or previous[0] != username:
+            if previous is not None:
+                self._release(previous[0])
+            self._user_active[username] = self._user_active.get(username, 0) + 1
+        self._sessions[session_id] = (username, expires_at)
+        heapq.heappush(self._deadlines, (expires_at, session_id))
+        if len(self._sessions) > self.max_sessions:
+            self._evict_soonest()
+        if len(self._deadlines) > 2 * len(self._sessions) + 64:
+            self._deadlines = [(entry[1], sid) for sid, entry in self._sessions.items()]
+            heapq.heapify(self._deadlines)
+
+    def _release(self, username):
+        count = self._user_active[username] - 1
+        if count:
+            self._user_active[username] = count
+        else:
+            del self._user_active[username]
+
+    def _expire(self, now):
+        while self._deadlines and self._deadlines[0][0] < now:
+            self._pop_deadline()
+
+    def _evict_soonest(self):
+        while len(self._sessions) > self.max_sessions and self._deadlines:
+            self._pop_deadline()
+
+    def _pop_deadline(self):
+        expires_at, session_id = heapq.heappop(self._deadlines)
+        entry = self._sessions.get(session_id)
+        # Skip heap entries superseded by a later heartbeat
+        if entry is not None and entry[1] == expires_at:
+            del self._sessions[session_id]
+            self._release(entry[0])
+
+
+class SqliteSessionLog:
+    """Session table in SQLite so every worker process sees the same live sessions
+
+    The live-session and distinct-user counts are kept in one-row tables by
+    triggers, so reading them is a primary-key lookup no matter how many
+    sessions exist. A user is counted when their first session is added and
+    uncounted when their last one goes, checked through the username index.
+    """
+
+    def __init__(self, path, sweep_interval=5.0):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions(username)')
+            conn.execute('CREATE TABLE IF NOT EXISTS session_count (id INTEGER PRIMARY KEY, active INTEGER NOT NULL)')
+            conn.execute('INSERT OR IGNORE INTO session_count VALUES (1, 0)')
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS sessions_insert AFTER INSERT ON sessions
+                BEGIN UPDATE session_count SET active = active + 1 WHERE id = 1; END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS sessions_delete AFTER DELETE ON sessions
+                BEGIN UPDATE session_count SET active = active - 1 WHERE id = 1; END
+            """)
+            conn.execute('CREATE TABLE IF NOT EXISTS user_count (id INTEGER PRIMARY KEY, active INTEGER NOT NULL)')
+            conn.execute('INSERT OR IGNORE INTO user_count SELECT 1, COUNT(DISTINCT username) FROM sessions')
+            # A user is counted while they have at least one session row
+            first = 'NOT EXISTS (SELECT 1 FROM sessions WHERE username = new.username AND session_id != new.session_id)'
+            last = 'NOT EXISTS (SELECT 1 FROM sessions WHERE username = old.username)'
+            renamed = 'old.username != new.username'
+            for name, event, condition, delta in (
+                    ('sessions_user_insert', 'INSERT', first, '+ 1'),
+                    ('sessions_user_delete', 'DELETE', last, '- 1'),
+                    ('sessions_user_renamed_to', 'UPDATE OF username', f'{renamed} AND {first}', '+ 1'),
+                    ('sessions_user_renamed_from', 'UPDATE OF username', f'{renamed} AND {last}', '- 1')):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON sessions WHEN {condition}
+                    BEGIN UPDATE user_count SET active = active {delta} WHERE id = 1; END
+                """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    username TEXT PRIMARY KEY,
+                    logins INTEGER NOT NULL,
+                    last_login REAL,
+                    previous_login REAL
+                )
+            """)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def login(self, session_id, username, now, expires_at):
+        conn = self._connect()
+        with conn:
+            self._put(conn, session_id, username, expires_at)
+            conn.execute("""
+                INSERT INTO user_sessions VALUES (?, 1, ?, NULL)
+                ON CONFLICT(username) DO UPDATE SET
+                    logins = logins + 1, previous_login = last_login, last_login = excluded.last_login
+            """, (username, now))
+
+    def touch(self, session_id, username, now, expires_at):
+        conn = self._connect()
+        with conn:
+            self._put(conn, session_id, username, expires_at)
+        self._sweep(now)
+
+    def remove(self, session_id):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+
+    def active_sessions(self, now):
+        self._sweep(now)
+        return self._connect().execute('SELECT active FROM session_count WHERE id = 1').fetchone()[0]
+
+    def active_users(self, now):
+        self._sweep(now)
+        return self._connect().execute('SELECT active FROM user_count WHERE id = 1').fetchone()[0]
+
+    def user_sessions(self, username, now):
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM sessions WHERE username = ? AND expires_at >= ?', (username, now)).fetchone()[0]
+
+    def user_stats(self, username):
+        row = self._connect().execute(
+            'SELECT logins, last_login, previous_login FROM user_sessions WHERE username = ?',
+            (username,)).fetchone()
+        logins, last_login, previous_login = row or (0, None, None)
+        return {'logins': logins, 'last_login': last_login, 'previous_login': previous_login}
+
+    @staticmethod
+    def _put(conn, session_id, username, expires_at):
+        # UPDATE first so a heartbeat doesn't fire the delete/insert count triggers
+        updated = conn.execute('UPDATE sessions SET username = ?, expires_at = ? WHERE session_id = ?',
+                               (username, expires_at, session_id)).rowcount
+        if not updated:
+            conn.execute('INSERT INTO sessions VALUES (?, ?, ?)', (session_id, username, expires_at))
+
+    def _sweep(self, now):
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM sessions WHERE expires_at < ?', (now,))
+
+
+class SessionRegistry:
+    """Track which Streamlit sessions are logged in, and as whom
+
+    Sessions are added on login, extended by a heartbeat on each rerun, and
+    dropped on logout or once idle for longer than their session timeout
+    (closed browser tabs never log out, so idle expiry is what removes them).
+    Heartbeats are cheap but throttled to one write per `heartbeat_interval`.
+    """
+
+    def __init__(self, log, default_timeout=DEFAULT_TIMEOUT, heartbeat_interval=15.0):
+        self.log = log
+        self.default_timeout = default_timeout
+        self.heartbeat_interval = heartbeat_interval
+
+    def login(self, session_id, username, timeout=None):
+        """Record a login for username in session_id"""
+        now = time.time()
+        self.log.login(session_id, username, now, now + (timeout or self.default_timeout))
+
+    def heartbeat(self, session_id, username, timeout=None, last_beat=0.0):
+        """Extend session_id's idle deadline; returns the time of the last write"""
+        now = time.time()
+        if now - last_beat < self.heartbeat_interval:
+            return last_beat
+        self.log.touch(session_id, username, now, now + (timeout or self.default_timeout))
+        return now
+
+    def logout(self, session_id):
+        self.log.remove(session_id)
+
+    def active_sessions(self):
+        """Number of live sessions across all users"""
+        return self.log.active_sessions(time.time())
+
+    def active_users(self):
+        """Number of distinct users with a live session"""
+        return self.log.active_users(time.time())
+
+    def user_sessions(self, username):
+        """Number of live sessions for username"""
+        return self.log.user_sessions(username, time.time())
+
+    def user_stats(self, username):
+        """{'logins', 'last_login', 'previous_login'} for username (timestamps or None)"""
+        return self.log.user_stats(username)
+
+
+def load_session_registry(config):
+    """Build a SessionRegistry from the optional `login` config section"""
+    settings = config.get('login') or {}
+    if settings.get('session_backend', 'memory') == 'sqlite':
+        log = SqliteSessionLog(settings.get('session_db', os.environ.get('SESSION_DB', 'sessions.db')))
+    else:
+        log = MemorySessionLog()
+    return SessionRegistry(log, default_timeout=float(settings.get('session_timeout_minutes', 60)) * 60)
@@ -1,8 +1,9 @@
 # setup.py - Run this first to set up your authentication system
-import streamlit_authenticator as stauth
 import yaml
 import os
 
+from hashing import hash_list
+
 def generate_hashed_passwords():
     """Generate hashed passwords for initial users"""
     print("🔐 Generating hashed passwords...")
@@ -18,8 +19,8 @@ def generate_hashed_passwords():
     passwords = list(users_passwords.values())
     usernames = list(users_passwords.keys())
     
-    # Generate hashed passwords in batch using the new API
-    hashed_passwords_list = stauth.Hasher.hash_list(passwords)
+    # Generate hashed passwords in parallel (bcrypt releases the GIL)
+    hashed_passwords_list = hash_list(passwords)
     
     # Create dictionary mapping usernames to hashed passwords
     hashed_passwords = {}
@@ -0,0 +1,104 @@
+import ipaddress
+from types import SimpleNamespace
+
+import auth_registry
+from auth_registry import AuthRegistry, client_address
+from config_cache import ConfigCache
+from credential_store import YamlCredentialStore, atomic_write_yaml
+from hashing import hash_password
+
+PROXIES = [ipaddress.ip_network('10.0.0.0/8')]
+
+
+def test_forwarded_header_is_ignored_without_a_trusted_proxy():
+    assert client_address('203.0.113.7', '198.51.100.1', PROXIES) == '203.0.113.7'
+    assert client_address('203.0.113.7', '198.51.100.1', []) == '203.0.113.7'
+
+
+def test_right_most_untrusted_hop_is_the_client():
+    # The client forged the first entry; the proxy appended the address it really saw
+    assert client_address('10.0.0.2', '1.2.3.4, 203.0.113.7', PROXIES) == '203.0.113.7'
+    assert client_address('10.0.0.2', '1.2.3.4, 203.0.113.7, 10.0.0.5', PROXIES) == '203.0.113.7'
+
+
+def test_rotating_the_header_does_not_change_the_client():
+    clients = {client_address('10.0.0.2', f'192.0.2.{i}, 203.0.113.7', PROXIES) for i in range(10)}
+    assert clients == {'203.0.113.7'}
+
+
+def test_only_proxies_in_the_chain_falls_back_to_the_first_hop():
+    assert client_address('10.0.0.2', '10.0.0.9', PROXIES) == '10.0.0.9'
+    assert client_address('10.0.0.2', None, PROXIES) == '10.0.0.2'
+
+
+def make_registry(tmp_path, users):
+    path = str(tmp_path / 'config.yaml')
+    atomic_write_yaml(path, {'credentials': {'usernames': users},
+                             'cookie': {'name': 'auth', 'key': 'secret', 'expiry_days': 30}})
+    registry = AuthRegistry(ConfigCache(YamlCredentialStore(path)))
+    registry.verifier = SimpleNamespace()  # the login pipeline isn't under test
+    return registry
+
+
+def test_a_write_during_refresh_is_picked_up_by_the_next_one(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path, {'ada': {'email': 'ada@example.com', 'name': 'Ada', 'password': 'plain'}})
+    bob = {'email': 'bob@example.com', 'name': 'Bob', 'password': hash_password('secret', 4)}
+    writes = [bob]
+
+    def hash_while_bob_registers(password, rounds, scheme):
+        # Another session's write lands, and is loaded, while this refresh is still working
+        if writes:
+            registry.cache.store.upsert_user('bob', writes.pop())
+            registry.cache.reload()
+        return hash_password(password, 4)
+    monkeypatch.setattr(auth_registry, 'hash_password', hash_while_bob_registers)
+
+    registry.refresh()
+    registry.refresh()
+
+    assert registry.user('bob') == bob
+    assert registry.version == registry.cache.version
+
+
+def test_a_user_write_only_replaces_that_record(tmp_path):
+    registry = make_registry(tmp_path, {'ada': {'email': 'ada@example.com', 'name': 'Ada',
+                                                'password': hash_password('secret', 4)}})
+    registry.refresh()
+    usernames, ada = registry.credentials['usernames'], registry.user('ada')
+
+    registry.save_user('bob', {'email': 'bob@example.com', 'name': 'Bob', 'password': hash_password('x', 4)})
+    ada['name'] = 'Ada L.'
+    registry.save_user('ada')
+    registry.refresh()
+
+    assert registry.credentials['usernames'] is usernames  # not swapped for a rebuilt dict
+    assert registry.user('ada') is ada
+    assert registry.index.find_by_email('BOB@example.com') == 'bob'
+
+
+def test_a_settings_change_still_reloads_everything(tmp_path):
+    registry = make_registry(tmp_path, {'ada': {'email': 'ada@example.com', 'name': 'Ada',
+                                                'password': hash_password('secret', 4)}})
+    registry.refresh()
+    ada = registry.user('ada')
+
+    registry.cache.store.save_section('cookie', {'name': 'auth', 'key': 'rotated', 'expiry_days': 30})
+    registry.refresh()
+
+    assert registry.cookie['key'] == 'rotated'
+    assert registry.user('ada') is ada  # unchanged records keep their identity
+
+
+def test_duplicate_emails_are_reported_as_conflicts(tmp_path):
+    registry = make_registry(tmp_path, {'ada': {'email': 'ada@example.com', 'name': 'Ada', 'password': 'plain'},
+                                        'eve': {'email': 'ADA@example.com', 'name': 'Eve', 'password': 'plain'}})
+    registry.refresh()
+    assert registry.index.conflicts == {'eve': 'ada@example.com'}
+
+    registry.cache.store.upsert_user('zed', {'email': 'ada@example.com', 'name': 'Zed', 'password': 'plain'})
+    registry.refresh()
+    assert registry.index.conflicts == {'eve': 'ada@example.com', 'zed': 'ada@example.com'}
+
+    registry.save_user('eve', dict(registry.user('eve'), email='eve@example.com'))
+    registry.refresh()
+    assert registry.index.conflicts == {'zed': 'ada@example.com'}
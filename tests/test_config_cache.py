@@ -0,0 +1,78 @@
+from config_cache import ConfigCache
+from credential_store import SqliteCredentialStore, YamlCredentialStore, atomic_write_yaml
+
+ADA = {'email': 'ada@example.com', 'name': 'Ada', 'password': 'hash-1'}
+BOB = {'email': 'bob@example.com', 'name': 'Bob', 'password': 'hash-2'}
+
+
+def make_cache(tmp_path):
+    path = str(tmp_path / 'config.yaml')
+    atomic_write_yaml(path, {'credentials': {'usernames': {}},
+                             'cookie': {'name': 'auth', 'key': 'secret', 'expiry_days': 30}})
+    cache = ConfigCache(YamlCredentialStore(path))
+    cache.snapshot()
+    return cache
+
+
+def test_watched_cache_serves_a_write_on_the_next_lookup(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.watch('poll', 3600)
+
+    cache.store.save_section('cookie', {'name': 'auth', 'key': 'secret', 'expiry_days': 45})
+
+    assert cache.snapshot()['cookie']['expiry_days'] == 45
+
+
+def test_user_writes_are_patched_in_without_rereading_the_store(tmp_path):
+    path = str(tmp_path / 'credentials.db')
+    store = SqliteCredentialStore(path)
+    store.save_config({'credentials': {'usernames': {'ada': ADA}},
+                       'cookie': {'name': 'auth', 'key': 'secret', 'expiry_days': 30}})
+    cache = ConfigCache(store)
+    version = cache.current()[0]
+    loads = []
+    store.load_config = lambda: loads.append(1)  # any full re-read would fail the test
+
+    store.upsert_user('bob', BOB)
+    # Another process writing the same database is found through the change log too
+    SqliteCredentialStore(path).upsert_user('cy', dict(BOB, email='cy@example.com'))
+
+    users = cache.snapshot()['credentials']['usernames']
+    assert sorted(users) == ['ada', 'bob', 'cy'] and users['bob']['email'] == BOB['email']
+    assert cache.changed_users(version, cache.version) == {'bob', 'cy'}
+    assert loads == []
+
+
+def test_rereading_a_patched_file_does_not_add_a_version(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store.upsert_user('bob', BOB)
+    version = cache.current()[0]
+    assert cache.snapshot()['credentials']['usernames']['bob']['name'] == 'Bob'
+
+    cache.reload()  # what the watcher does once it sees the rewritten file
+
+    assert cache.version == version
+
+
+def test_settings_changes_are_not_reported_as_user_changes(tmp_path):
+    cache = make_cache(tmp_path)
+    version = cache.current()[0]
+
+    cache.store.save_section('cookie', {'name': 'auth', 'key': 'other', 'expiry_days': 30})
+
+    assert cache.changed_users(version, cache.current()[0]) is None
+
+
+def test_content_id_is_the_same_in_every_process_for_the_same_content(tmp_path):
+    first = make_cache(tmp_path)
+    first.store.upsert_user('bob', BOB)
+    first.snapshot()  # patched in from the write
+    second = ConfigCache(YamlCredentialStore(first.store.path))
+    second.snapshot()  # a fresh process reading the same file
+
+    first.reload()  # the watcher re-reads the rewritten file
+    assert first.content_id == second.content_id
+
+    first.store.upsert_user('cy', dict(BOB, email='cy@example.com'))
+    first.snapshot()
+    assert first.content_id != second.content_id
@@ -0,0 +1,45 @@
+import time
+
+import jwt
+
+from cookie_tokens import SqliteRevocations, VerifiedTokenCache, decode_token
+
+KEY = 'test_cookie_key_that_is_long_enough_for_hs256'
+
+
+def make_token(username, issued_at, expiry_days=30):
+    return jwt.encode({'username': username, 'exp_date': issued_at + expiry_days * 86400, 'iat': issued_at},
+                      KEY, algorithm='HS256')
+
+
+def check(cache, token, expiry_days=30):
+    return cache.verify(token, KEY, expiry_days, lambda: decode_token(token, KEY))
+
+
+def test_lowering_expiry_days_does_not_revive_cookies_from_before_a_password_change():
+    users = {'alice': {'password': 'x'}}
+    cache = VerifiedTokenCache(users.get)
+    old = make_token('alice', time.time() - 20 * 86400)
+    users['alice']['tokens_valid_after'] = time.time() - 86400  # password changed yesterday
+
+    assert check(cache, old, expiry_days=30) is False
+    assert check(cache, old, expiry_days=1) is False
+    assert check(cache, make_token('alice', time.time()))
+
+
+def test_logout_revocation_is_shared_through_the_revocation_table(tmp_path):
+    users = {'alice': {'password': 'x'}}
+    token = make_token('alice', time.time())
+    cache = VerifiedTokenCache(users.get, SqliteRevocations(str(tmp_path / 'sessions.db')))
+    assert check(cache, token)
+
+    cache.revoke(token, KEY)
+    assert check(cache, token) is False
+    assert users == {'alice': {'password': 'x'}}  # nothing written to the credentials
+    # A restarted process or another replica only has the table
+    assert check(VerifiedTokenCache(users.get, SqliteRevocations(str(tmp_path / 'sessions.db'))), token) is False
+
+
+def test_cookie_from_a_replica_with_a_fast_clock_is_accepted():
+    token = make_token('alice', time.time() + 60)
+    assert check(VerifiedTokenCache({'alice': {'password': 'x'}}.get), token)
@@ -0,0 +1,28 @@
+import pytest
+
+from credential_store import SqliteCredentialStore, YamlCredentialStore, atomic_write_yaml
+
+ALICE = {'email': 'alice@example.com', 'name': 'Alice', 'password': 'hash-1'}
+
+
+def make_store(kind, tmp_path, users):
+    if kind == 'yaml':
+        path = str(tmp_path / 'config.yaml')
+        atomic_write_yaml(path, {'credentials': {'usernames': users}})
+        return YamlCredentialStore(path)
+    store = SqliteCredentialStore(str(tmp_path / 'credentials.db'))
+    store.save_config({'credentials': {'usernames': users}})
+    return store
+
+
+@pytest.mark.parametrize('kind', ['yaml', 'sqlite'])
+def test_upsert_replaces_a_differently_cased_record(kind, tmp_path):
+    store = make_store(kind, tmp_path, {'Alice': ALICE, 'bob': dict(ALICE, email='bob@example.com')})
+
+    store.upsert_user('alice', dict(ALICE, password='hash-2'))
+    store.upsert_users({'BOB': dict(ALICE, email='bob@example.com', password='hash-3')})
+
+    users = store.load_config()['credentials']['usernames']
+    assert sorted(users) == ['alice', 'bob']
+    assert users['alice']['password'] == 'hash-2'
+    assert users['bob']['password'] == 'hash-3'
@@ -0,0 +1,32 @@
+import logging
+
+import health
+from health import HealthSampler
+
+
+def test_failed_samples_are_counted_and_logged_once(monkeypatch, caplog):
+    sampler = HealthSampler(interval=3600)
+    sampler._last = sampler._cpu_counters()
+    monkeypatch.setattr(health.shutil, 'disk_usage', lambda path: 1 / 0)
+
+    with caplog.at_level(logging.WARNING, logger='health'):
+        for _ in range(3):
+            try:
+                sampler.sample()
+            except Exception as e:
+                sampler._failed('Health sample', e)
+
+    assert sampler.stats()['errors'] == 3
+    assert sampler.stats()['last_error'] == 'Health sample failed: ZeroDivisionError: division by zero'
+    assert len(caplog.records) == 1
+
+
+def test_session_count_failure_keeps_the_sample(monkeypatch):
+    sampler = HealthSampler(interval=3600)
+    sampler._last = sampler._cpu_counters()
+    monkeypatch.setattr(health, 'streamlit_sessions', lambda: 1 / 0)
+
+    sampler.sample()
+
+    assert sampler.latest()['sessions'] is None
+    assert sampler.stats()['errors'] == 1
@@ -0,0 +1,54 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from hashing import hash_password
+from login_service import LoginVerifier, ServerBusyError, VerificationPool
+from rate_limiter import LoginRateLimiter, MemoryFailureLog
+
+
+def test_slow_check_raises_server_busy_and_frees_its_slot():
+    pool = VerificationPool(max_concurrency=1, max_queue=1, timeout=0.1)
+    release = threading.Event()
+    blocked = lambda: release.wait(5)  # noqa: E731 - stands in for a hash that never finishes
+
+    with pytest.raises(ServerBusyError):
+        pool.run(blocked)
+    # Queued behind the running one: it times out too and is cancelled rather than left to run
+    with pytest.raises(ServerBusyError):
+        pool.run(blocked)
+    assert pool.timed_out == 2
+
+    release.set()
+    assert pool.run(lambda: 'ok') == 'ok'
+    assert pool.completed == 1
+
+
+def test_full_queue_is_rejected_without_waiting():
+    pool = VerificationPool(max_concurrency=1, max_queue=0, timeout=5)
+    started, release = threading.Event(), threading.Event()
+    worker = threading.Thread(target=lambda: pool.run(lambda: started.set() or release.wait(5)))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(ServerBusyError):
+            pool.run(lambda: 'ok')
+        assert pool.rejected == 1
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_failed_rehash_still_logs_in():
+    class BrokenStore:
+        def upsert_user(self, username, user):
+            raise RuntimeError("disk full")
+
+    pool = VerificationPool(max_concurrency=1, max_queue=1, timeout=5)
+    user = {'password': hash_password('secret', rounds=4)}
+    model = SimpleNamespace(credentials={'usernames': {'alice': user}})
+    verifier = LoginVerifier(BrokenStore(), 'bcrypt', 5, pool, LoginRateLimiter(MemoryFailureLog()))
+
+    assert verifier.check_credentials(model, 'alice', 'secret') is True
+    assert verifier.rehashed == 0
@@ -0,0 +1,14 @@
+import json
+
+from preferences import PreferenceStore
+from views.profile import user_data_json
+
+
+def test_data_export_after_saving_settings(tmp_path):
+    prefs = PreferenceStore(str(tmp_path / 'preferences.db'), flush_delay=0)
+    prefs.save('ada', {'theme': 'dark', 'session_timeout': 30})
+
+    exported = json.loads(user_data_json({'username': 'ada'}, [], prefs.get('ada')))
+
+    assert exported['settings']['theme'] == 'dark'
+    assert exported['settings']['session_timeout'] == 30
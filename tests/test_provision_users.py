@@ -0,0 +1,26 @@
+from credential_store import YamlCredentialStore, atomic_write_yaml
+from hashing import needs_rehash
+from provision_users import provision
+
+
+def test_provision_defaults_to_the_configured_policy(tmp_path):
+    path = str(tmp_path / 'config.yaml')
+    atomic_write_yaml(path, {'credentials': {'usernames': {}}, 'password_hashing': {'rounds': 4}})
+    store = YamlCredentialStore(path)
+    users = [{'username': 'ada', 'name': 'Ada', 'email': 'ada@example.com', 'password': 'secret'}]
+
+    assert provision(users, store, workers=1, executor='thread') == 1
+    hashed = store.get_user('ada')['password']
+    assert hashed.startswith('$2b$04$')
+    assert not needs_rehash(hashed, 4, 'bcrypt')
+
+
+def test_provisioned_usernames_are_stored_lower_cased(tmp_path):
+    path = str(tmp_path / 'config.yaml')
+    atomic_write_yaml(path, {'credentials': {'usernames': {}}, 'password_hashing': {'rounds': 4}})
+    store = YamlCredentialStore(path)
+    users = [{'username': 'Ada ', 'name': 'Ada', 'email': 'ada@example.com', 'password': 'secret'}]
+
+    provision(users, store, workers=1, executor='thread')
+
+    assert list(store.load_config()['credentials']['usernames']) == ['ada']
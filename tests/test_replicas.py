@@ -0,0 +1,61 @@
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+from auth_registry import AuthRegistry
+from change_bus import ChangeBus
+from config_cache import ConfigCache
+from credential_store import YamlCredentialStore, atomic_write_yaml
+from hashing import hash_password
+
+REPLICAS = 3
+CONVERGENCE_BOUND = 2.0  # seconds; the bus and the watcher each take ~0.1 s
+
+
+def replica(config_path, bus_path, username, timeout, results):
+    """Serve reruns until username appears, then report when it did"""
+    cache = ConfigCache(YamlCredentialStore(config_path), ChangeBus(bus_path, poll_interval=0.02))
+    cache.watch('poll', 0.5)
+    registry = AuthRegistry(cache)
+    registry.verifier = SimpleNamespace()  # the login pipeline isn't under test
+    registry.refresh()
+    results.put(('ready', registry.user(username)))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        registry.refresh()
+        if registry.user(username) is not None:
+            results.put(('seen', time.time()))
+            return
+        time.sleep(0.005)  # stands in for reruns
+    results.put(('seen', None))
+
+
+def test_a_registration_reaches_every_replica_within_the_bound(tmp_path):
+    config_path, bus_path = str(tmp_path / 'config.yaml'), str(tmp_path / 'bus.db')
+    atomic_write_yaml(config_path, {'credentials': {'usernames': {}},
+                                    'cookie': {'name': 'auth', 'key': 'secret', 'expiry_days': 30}})
+    writer = ConfigCache(YamlCredentialStore(config_path), ChangeBus(bus_path))
+    writer.snapshot()
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    processes = [ctx.Process(target=replica, args=(config_path, bus_path, 'newbie', 30, results), daemon=True)
+                 for _ in range(REPLICAS)]
+    for process in processes:
+        process.start()
+    try:
+        ready = [results.get(timeout=60) for _ in processes]
+        assert ready == [('ready', None)] * REPLICAS
+
+        started = time.time()
+        writer.store.upsert_user('newbie', {'email': 'newbie@example.com', 'name': 'Newbie',
+                                            'password': hash_password('secret', 4)})
+        seen = [results.get(timeout=60)[1] for _ in processes]
+
+        assert None not in seen
+        assert max(seen) - started < CONVERGENCE_BOUND
+    finally:
+        for process in processes:
+            process.join(10)
+            if process.is_alive():
+                process.terminate()
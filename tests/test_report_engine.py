@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pipeline import generate_events, normalize_events
+from report_engine import ReportEngine
+
+
+class StaticPipeline:
+    """Stands in for EventPipeline with a fixed event log"""
+
+    def __init__(self, events):
+        self._events = events
+
+    def version(self):
+        return 1
+
+    def events(self):
+        return self._events
+
+
+def in_range(events, start, end):
+    stamps = events['timestamp']
+    return events[(stamps >= pd.Timestamp(start)) & (stamps < pd.Timestamp(end) + pd.Timedelta(days=1))]
+
+
+@pytest.fixture(scope='module')
+def events():
+    return generate_events(20000, days=90, end='2024-08-31')
+
+
+@pytest.mark.parametrize('granularity, start, end', [
+    ('Monthly', '2024-08-15', '2024-08-31'),   # starts mid-month
+    ('Weekly', '2024-08-01', '2024-08-31'),    # starts and ends mid-week
+    ('Daily', '2024-08-01', '2024-08-31'),
+])
+def test_partial_buckets_are_clipped_to_the_range(events, granularity, start, end):
+    report = ReportEngine(StaticPipeline(events)).report(start, end, 'Revenue', granularity)
+    expected = in_range(events, start, end)
+    assert report['table']['Revenue'].sum() == pytest.approx(expected['revenue'].sum(), rel=1e-4)
+    assert report['total_records'] == len(expected)
+
+
+def test_users_are_distinct_across_cells(events):
+    report = ReportEngine(StaticPipeline(events)).report('2024-08-01', '2024-08-31', 'Users', 'Monthly')
+    expected = in_range(events, '2024-08-01', '2024-08-31')
+    assert report['total_users'] == expected['user_id'].nunique()
+    assert report['table']['Users'].tolist() == [expected['user_id'].nunique()]
+    by_device = expected.groupby('device_type', observed=False)['user_id'].nunique()
+    assert report['breakdown'].to_dict() == by_device.to_dict()
+
+
+def test_same_user_on_many_days_counts_once():
+    days = pd.date_range('2024-08-01', periods=10, freq='D') + pd.Timedelta(hours=12)
+    events = normalize_events(pd.DataFrame({
+        'timestamp': np.concatenate([days, days]),
+        'user_id': [1] * 10 + [2] * 10,
+        'session_id': np.arange(20),
+        'event_type': 'page_view',
+        'user_segment': 'New Users',
+        'traffic_source': 'Direct',
+        'device_type': ['Desktop', 'Mobile'] * 10,
+        'region': 'Europe',
+        'revenue': 0.0,
+    }))
+    engine = ReportEngine(StaticPipeline(events))
+
+    weekly = engine.report('2024-08-01', '2024-08-10', 'Users', 'Weekly')
+    assert weekly['total_users'] == 2
+    assert weekly['table']['Users'].tolist() == [2, 2]
+    assert weekly['breakdown'].to_dict() == {'Desktop': 2, 'Mobile': 2, 'Tablet': 0}
+
+    daily = engine.report('2024-08-01', '2024-08-10', 'Users', 'Daily')
+    assert daily['table']['Users'].tolist() == [2] * 10
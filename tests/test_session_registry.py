@@ -0,0 +1,32 @@
+import random
+
+from session_registry import MemorySessionLog, SqliteSessionLog
+
+
+def test_sqlite_user_count_tracks_logins_logouts_and_expiry(tmp_path):
+    sqlite = SqliteSessionLog(str(tmp_path / 'sessions.db'), sweep_interval=0)
+    memory = MemorySessionLog()
+    rng = random.Random(7)
+    for now in range(1, 500):
+        session_id, username = f's{rng.randrange(40)}', f'u{rng.randrange(10)}'
+        action, expires_at = rng.random(), now + rng.randrange(1, 50)
+        for log in (sqlite, memory):
+            if action < 0.4:
+                log.login(session_id, username, now, expires_at)
+            elif action < 0.8:
+                log.touch(session_id, username, now, expires_at)
+            else:
+                log.remove(session_id)
+        assert sqlite.active_users(now) == memory.active_users(now)
+        assert sqlite.active_sessions(now) == memory.active_sessions(now)
+
+
+def test_sqlite_user_count_is_initialised_from_existing_sessions(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    log = SqliteSessionLog(path)
+    log.login('a', 'ada', 0, 100)
+    log.login('b', 'ada', 0, 100)
+    log.login('c', 'bob', 0, 100)
+    log._connect().execute('DROP TABLE user_count')
+
+    assert SqliteSessionLog(path).active_users(0) == 2
@@ -0,0 +1 @@
+# views - Page modules imported by app.py only when their page is routed to
@@ -0,0 +1,186 @@
+# views/admin.py - Administrator panel
+import time
+
+import pandas as pd
+import streamlit as st
+
+from activity_log import get_activity_log
+from config_cache import thaw
+from health import SAMPLE_INTERVAL, get_health_sampler
+from instrumentation import get_perf_registry, instrumented
+from views.common import (config_cache, config_rejected_warning, export_button, get_auth_registry, save_section,
+                          store)
+
+USER_SORT_OPTIONS = {"Username": "username", "Name": "name", "Email": "email"}
+
+
+def user_list_chunks():
+    """User list export rows, one store page at a time"""
+    for batch in store.iter_users():
+        yield pd.DataFrame({
+            'Username': [username for username, _ in batch],
+            'Name': [details['name'] for _, details in batch],
+            'Email': [details['email'] for _, details in batch],
+            'Status': '🟢 Active'
+        })
+
+
+def _first_user_page():
+    st.session_state['admin_user_page'] = 1
+
+
+@st.fragment
+@instrumented('User directory', fragment=True)
+def user_directory():
+    """Searchable user table that only loads the current page from the credential store"""
+    col1, col2, col3, col4 = st.columns([3, 1.5, 1, 1])
+    with col1:
+        query = st.text_input("🔍 Search users", placeholder="Username, name or email prefix",
+                              key="admin_user_search", on_change=_first_user_page)
+    with col2:
+        sort = st.selectbox("Sort by", list(USER_SORT_OPTIONS), key="admin_user_sort",
+                            on_change=_first_user_page)
+    with col3:
+        page_size = st.selectbox("Per page", [25, 50, 100], key="admin_user_page_size",
+                                 on_change=_first_user_page)
+    with col4:
+        descending = st.toggle("Descending", key="admin_user_desc", on_change=_first_user_page)
+    
+    matching = store.count_users(query)
+    pages = max(1, -(-matching // page_size))
+    if st.session_state.get('admin_user_page', 1) > pages:  # users were deleted meanwhile
+        st.session_state['admin_user_page'] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages,
+                           key="admin_user_page") if pages > 1 else 1
+    offset = (page - 1) * page_size
+    
+    users = store.search_users(query, USER_SORT_OPTIONS[sort], descending, offset, page_size)
+    st.dataframe(pd.DataFrame({
+        'Username': [username for username, _ in users],
+        'Name': [details['name'] for _, details in users],
+        'Email': [details['email'] for _, details in users],
+        'Status': ['🟢 Active'] * len(users)  # In real app, this would be dynamic
+    }), hide_index=True)
+    if matching:
+        st.caption(f"Showing {offset + 1:,}–{offset + len(users):,} of {matching:,} users")
+    else:
+        st.caption("No users match this search")
+
+
+def _sparkline(label, field, unit, sampler, digits=0):
+    """Metric showing the latest sample of field with its history as a sparkline"""
+    history = [value for value in sampler.history(field) if value is not None]
+    value = f"{history[-1]:,.{digits}f}{unit}" if history else "n/a"
+    st.metric(label, value, chart_data=history[-120:] or None, chart_type="area", border=True)
+
+
+@st.fragment(run_every=SAMPLE_INTERVAL)
+@instrumented('System stats', fragment=True)
+def system_stats():
+    """Counters and health sparklines, refreshed on their own as new samples arrive"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Users", store.count_users())
+    with col2:
+        st.metric("Active Sessions", get_auth_registry().sessions.active_sessions(),
+                  help=f"{get_auth_registry().sessions.active_users()} distinct users")
+    with col3:
+        st.metric("Failed Logins (24h)", get_activity_log().count('login', 'failure', since=time.time() - 86400))
+        
+    # System health
+    st.write("**System Health:**")
+    system_health()
+
+
+def system_health():
+    """Sparklines from the background health sampler (nothing is measured on this rerun)"""
+    sampler = get_health_sampler()
+    health_stats = sampler.stats()
+    if health_stats['errors']:
+        st.warning(f"⚠️ {health_stats['errors']} health sampling failures, latest: {health_stats['last_error']}")
+    if sampler.latest() is None:
+        st.info(f"⏳ Collecting the first sample - health is sampled every {sampler.interval:g} s")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        _sparkline("Host CPU", 'host_cpu', "%", sampler)
+        _sparkline("Process CPU", 'process_cpu', "%", sampler, digits=1)
+    with col2:
+        _sparkline("Memory (host)", 'memory', "%", sampler)
+        _sparkline("Process RSS", 'rss_mb', " MiB", sampler)
+    with col3:
+        _sparkline("Disk Usage", 'disk', "%", sampler)
+        _sparkline("Streamlit Sessions", 'sessions', "", sampler)
+    _sparkline("Page Render p95", 'render_p95', " ms", sampler)
+    
+    page_p95 = sampler.latest()['page_p95']
+    if page_p95:
+        st.dataframe(pd.DataFrame({'Page': list(page_p95), 'Render p95 (ms)': list(page_p95.values())}),
+                     hide_index=True)
+    st.caption(f"{health_stats['samples']} samples every {health_stats['interval']:g} s · "
+               f"sampler overhead {health_stats['overhead']:.3%} of one core · "
+               f"{health_stats['errors']} failures")
+    
+    with st.expander("📈 Rerun metrics (Prometheus)"):
+        st.code(get_perf_registry().prometheus_text(), language="text")
+
+
+@instrumented('Admin', page=True)
+def admin_panel():
+    """Enhanced admin panel for user management"""
+    if st.session_state.get('username') == 'admin':
+        st.header("👑 Administrator Panel")
+        
+        admin_tab1, admin_tab2, admin_tab3 = st.tabs(["👥 User Management", "📊 System Stats", "🔧 System Config"])
+        
+        with admin_tab1:
+            st.write("**User Overview:**")
+            user_directory()
+            
+            # User actions
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("➕ Add New User"):
+                    st.info("Manual user addition functionality")
+                    
+            with col2:
+                export_button("📊 Export User List", ('user_list', config_cache.content_id),
+                              user_list_chunks, "user_list")
+                    
+        with admin_tab2:
+            st.write("**System Statistics:**")
+            system_stats()
+            
+        with admin_tab3:
+            st.write("**System Configuration:**")
+            
+            cookie = thaw(config_cache.snapshot()['cookie'])  # Private copy since we'll modify it
+            
+            # Cookie settings
+            with st.expander("🍪 Cookie Settings"):
+                st.write(f"Cookie Name: {cookie['name']}")
+                st.write(f"Expiry Days: {cookie['expiry_days']}")
+                
+                new_expiry = st.number_input("Update Cookie Expiry (days)", 
+                                           value=cookie['expiry_days'],
+                                           min_value=1, max_value=365)
+                
+                if st.button("Update Cookie Settings"):
+                    cookie['expiry_days'] = new_expiry
+                    if save_section('cookie', cookie):
+                        st.success("Cookie settings updated!")
+                        st.rerun()
+
+            conflicts = get_auth_registry().index.conflicts
+            if conflicts:
+                listed = ", ".join(f"{user} ({email})" for user, email in sorted(conflicts.items()))
+                st.warning(f"⚠️ {len(conflicts)} accounts share an email with an earlier account and can't "
+                           f"be found by it: {listed}")
+
+            # Config cache effectiveness
+            cache_stats = config_cache.stats()
+            config_rejected_warning()
+            st.caption(f"Config cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                       f"({cache_stats['hit_rate']:.0%} hit rate), version {cache_stats['version']}, "
+                       f"{cache_stats['rejected']} rejected, reload: {cache_stats['watch']}")
@@ -0,0 +1,139 @@
+# views/analytics.py - Advanced analytics page backed by background report jobs
+import time
+
+import pandas as pd
+import streamlit as st
+
+from data_pipeline import DEVICE_TYPES, REGIONS, TRAFFIC_SOURCES, USER_SEGMENTS, get_event_pipeline
+from instrumentation import instrumented
+from report_engine import METRICS
+from report_jobs import get_report_runner, report_params
+from views.common import export_button
+
+
+def current_report_params():
+    """Report parameters from the analytics widgets, or defaults if the page hasn't been opened"""
+    first_day, last_day = get_event_pipeline().date_bounds()
+    date_range = st.session_state.get('analytics_date_range')
+    if not date_range or len(date_range) != 2:
+        date_range = [max(first_day, last_day - pd.Timedelta(days=30)), last_day]
+    return report_params(
+        date_range[0], date_range[1],
+        st.session_state.get('analytics_metric', METRICS[0]),
+        st.session_state.get('analytics_granularity', 'Daily'),
+        {'user_segment': st.session_state.get('analytics_user_segment'),
+         'traffic_source': st.session_state.get('analytics_traffic_source'),
+         'device_type': st.session_state.get('analytics_device_type'),
+         'region': st.session_state.get('analytics_region')}
+    )
+
+
+def enqueue_report():
+    """Submit the current report parameters to the background runner for this session"""
+    st.session_state['report_job_id'] = get_report_runner().submit(current_report_params())
+
+
+@instrumented('Analytics', page=True)
+def analytics_page():
+    """Enhanced analytics page content"""
+    st.header("📈 Advanced Analytics")
+    
+    runner = get_report_runner()
+    first_day, last_day = runner.engine.pipeline.date_bounds()
+    
+    # Analytics controls
+    st.subheader("🎛️ Analytics Configuration")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.date_input(
+            "📅 Date Range", 
+            value=[max(first_day, last_day - pd.Timedelta(days=30)), last_day],
+            min_value=first_day,
+            max_value=last_day,
+            key="analytics_date_range"
+        )
+    with col2:
+        st.selectbox("📊 Metric Type", METRICS, key="analytics_metric")
+    with col3:
+        st.selectbox("⏱️ Time Granularity", 
+                     ["Hourly", "Daily", "Weekly", "Monthly"], index=1, key="analytics_granularity")
+    
+    # Advanced filters
+    with st.expander("🔍 Advanced Filters"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.multiselect("User Segment", USER_SEGMENTS, key="analytics_user_segment")
+            st.multiselect("Traffic Source", TRAFFIC_SOURCES, key="analytics_traffic_source")
+        with col2:
+            st.multiselect("Device Type", DEVICE_TYPES, key="analytics_device_type")
+            st.multiselect("Geographic Region", REGIONS, key="analytics_region")
+    
+    # Generate report button
+    if st.button("📊 Generate Advanced Analytics Report", type="primary"):
+        if len(st.session_state['analytics_date_range']) != 2:
+            st.warning("Please select both a start and an end date")
+            return
+        enqueue_report()
+    
+    job = runner.get(st.session_state.get('report_job_id'))
+    if job is None:
+        return
+    
+    # Wait for the background job; a rerun interrupts only this wait, not the job
+    if not job.done:
+        with st.spinner("🔄 Processing analytics data..."):
+            progress = st.progress(job.progress, text=job.message)
+            while not job.done:
+                time.sleep(0.2)
+                progress.progress(job.progress, text=job.message)
+        progress.empty()
+    
+    if job.state == 'failed':
+        st.error(f"❌ Report generation failed: {job.error}")
+        return
+    
+    report = job.result
+    st.success("✅ Analytics report generated successfully!")
+    p50, p95, count = runner.engine.latency_percentiles()
+    st.caption(f"⏱️ Built in {report['latency_ms']:.0f} ms · "
+               f"p50 {p50:.0f} ms / p95 {p95:.0f} ms over the last {count} reports")
+    
+    # Analytics results
+    st.markdown("---")
+    st.subheader("📊 Analytics Results")
+    
+    # Key insights
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Total Records", f"{report['total_records']:,}")
+    with col2:
+        st.metric("Average Session", f"{report['avg_session_minutes']:.1f} min")
+    with col3:
+        st.metric("Conversion Rate", f"{report['conversion_rate']:.1%}")
+    
+    # Detailed charts
+    tab1, tab2, tab3 = st.tabs(["📈 Trends", "🥧 Breakdown", "📋 Raw Data"])
+    
+    with tab1:
+        st.line_chart(report['trend'])
+        
+    with tab2:
+        st.bar_chart(report['breakdown'])
+        
+    with tab3:
+        # Aggregated data table
+        sample_data = report['table']
+        st.dataframe(sample_data)
+        
+        # Download buttons - files are generated in chunks on click and cached on disk
+        col1, col2 = st.columns(2)
+        with col1:
+            export_button("📥 Download Table", ('report_table', job.job_id),
+                          lambda: iter([sample_data]), "analytics_data")
+        with col2:
+            params = job.params
+            export_button("📥 Download Matching Events", ('report_events', job.job_id),
+                          lambda: runner.engine.pipeline.iter_events(params['start'], params['end'], params['filters']),
+                          "analytics_events")
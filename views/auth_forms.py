@@ -0,0 +1,150 @@
+# views/auth_forms.py - Registration and account recovery forms on the login screen
+import streamlit as st
+
+from credential_index import DuplicateAccountError
+from login_service import ServerBusyError
+from views.common import get_auth_registry, get_authenticator, log_activity, save_user
+
+
+def user_registration_page():
+    """User registration functionality - alias for safe_register_user"""
+    safe_register_user()
+
+
+def forgot_password_page():
+    """Forgot password functionality - alias for safe_forgot_password"""
+    safe_forgot_password()
+
+
+def forgot_username_page():
+    """Forgot username functionality - alias for safe_forgot_username"""
+    safe_forgot_username()
+
+
+def safe_register_user():
+    """Safe user registration that handles different versions"""
+    st.subheader("🆕 Register New User")
+    
+    try:
+        # Try new version method first
+        result = get_authenticator().register_user(pre_authorization=False)
+        
+        if result and len(result) >= 3:
+            email, username, name = result[:3]
+            
+            if email:
+                st.success('✅ User registered successfully!')
+                st.info(f'📧 Email: {email}')
+                st.info(f'👤 Username: {username}')
+                st.info(f'📝 Name: {name}')
+                
+                # Save the new user record
+                if save_user(username):
+                    log_activity('register', username)
+                st.balloons()
+                
+    except Exception as e:
+        if "register_user" in str(e):
+            st.error("❌ Registration not supported in this version of streamlit-authenticator")
+            
+            # Fallback: Manual registration form
+            st.write("**Manual Registration Form:**")
+            with st.form("manual_register"):
+                new_username = st.text_input("Username")
+                new_name = st.text_input("Full Name")
+                new_email = st.text_input("Email")
+                new_password = st.text_input("Password", type="password")
+                confirm_password = st.text_input("Confirm Password", type="password")
+                
+                if st.form_submit_button("Register"):
+                    # Usernames are stored lower-cased, like the authenticator's own registration
+                    new_username = new_username.strip().lower()
+                    new_email = new_email.strip()
+                    index = get_auth_registry().index
+                    if not new_username or not new_email:
+                        st.error("Username and email are required!")
+                    elif index.find_username(new_username):
+                        st.error("Username already taken!")
+                    elif index.find_by_email(new_email):
+                        st.error("Email already taken!")
+                    elif new_password != confirm_password:
+                        st.error("Passwords do not match!")
+                    elif len(new_password) < 6:
+                        st.error("Password must be at least 6 characters!")
+                    else:
+                        # Hash under the configured password_hashing policy, on the verification pool
+                        registry = get_auth_registry()
+                        try:
+                            new_user = {
+                                'name': new_name,
+                                'email': new_email,
+                                'password': registry.verifier.hash(new_password)
+                            }
+                            # Re-checked atomically in case another session took them meanwhile
+                            registry.add_user(new_username, new_user)
+                        except ServerBusyError:
+                            st.warning("⏳ **Server busy** - please retry in a few seconds.")
+                        except DuplicateAccountError as duplicate:
+                            st.error(f"{duplicate}!")
+                        else:
+                            if save_user(new_username, new_user):
+                                log_activity('register', new_username)
+                                st.success("Registration successful!")
+        else:
+            st.error(f"❌ Registration error: {e}")
+
+
+def safe_forgot_password():
+    """Safe forgot password that handles different versions"""
+    st.subheader("🔑 Reset Password")
+    
+    try:
+        result = get_authenticator().forgot_password()
+        
+        if result and len(result) >= 3:
+            username, email, new_password = result[:3]
+            
+            if username:
+                st.success('✅ Password reset successful!')
+                st.info(f'👤 Username: {username}')
+                st.info(f'📧 Email: {email}')
+                
+                with st.expander("🔐 Your New Temporary Password", expanded=True):
+                    st.code(new_password)
+                    st.warning("⚠️ Change this password after logging in!")
+                
+                if save_user(username, get_auth_registry().revoke_tokens(username)):
+                    log_activity('password_reset', username)
+                
+    except Exception as e:
+        if "forgot_password" in str(e):
+            st.error("❌ Password reset not supported in this version")
+            st.info("💡 Please contact your administrator for password reset")
+        else:
+            st.error(f"❌ Password reset error: {e}")
+
+
+def safe_forgot_username():
+    """Safe forgot username that handles different versions"""
+    st.subheader("❓ Recover Username")
+    
+    try:
+        result = get_authenticator().forgot_username()
+        
+        if result and len(result) >= 2:
+            username, email = result[:2]
+            
+            if username:
+                st.success('✅ Username recovery successful!')
+                st.info(f"📧 Email: {email}")
+                
+                with st.expander("👤 Your Username", expanded=True):
+                    st.code(username)
+                log_activity('username_reminder', username)
+                    
+    except Exception as e:
+        if "forgot_username" in str(e):
+            st.error("❌ Username recovery not supported in this version")
+            st.info("💡 Please contact your administrator for username recovery")
+        else:
+            st.error(f"❌ Username recovery error: {e}")
@@ -0,0 +1,120 @@
+# views/common.py - State and helpers shared by the login screen and every page
+import time
+
+import streamlit as st
+
+from activity_log import get_activity_log
+from auth_registry import AuthRegistry, current_client
+from config_cache import get_config_cache
+from credential_store import UnreadableConfigError, get_store
+from preferences import get_preferences
+from session_registry import current_session_id
+
+store = get_store()
+config_cache = get_config_cache()
+
+
+@st.cache_resource
+def get_auth_registry():
+    """Process-wide credentials registry shared by all sessions"""
+    return AuthRegistry(config_cache)
+
+
+def get_authenticator():
+    """This session's authenticator (built once per session and cookie change)"""
+    return get_auth_registry().get_authenticator()
+
+
+def config_rejected_warning(error=None):
+    """Warn that an edit to the configuration was rejected, if one was"""
+    error = config_cache.error or error
+    if error:
+        st.warning(f"⚠️ The last edit to the configuration was rejected, still serving "
+                   f"version {config_cache.version}: {error}")
+
+
+def _write_config(write, *args):
+    """Run a store write; if the file on disk doesn't parse, show why instead of raising"""
+    try:
+        write(*args)
+        return True
+    except UnreadableConfigError as e:
+        st.error("❌ Your change wasn't saved: the configuration file has to be fixed first.")
+        config_rejected_warning(' '.join(str(e).split()))
+        return False
+
+
+def save_user(username, details=None):
+    """Persist a single user record - details, else the live one; False if it couldn't be"""
+    return _write_config(get_auth_registry().save_user, username, details)
+
+
+def save_section(key, value):
+    """Replace one top-level config section such as 'cookie'; False if it couldn't be"""
+    return _write_config(store.save_section, key, value)
+
+
+def default_session_timeout():
+    """Configured idle timeout in minutes"""
+    return int(get_auth_registry().sessions.default_timeout // 60)
+
+
+def user_prefs():
+    """Saved preferences of the logged-in user (defaults otherwise) - a cached dict lookup"""
+    username = st.session_state.get('username') if st.session_state.get('authentication_status') else None
+    prefs = get_preferences().get(username)
+    if prefs['session_timeout'] is None:
+        return dict(prefs, session_timeout=default_session_timeout())
+    return prefs
+
+
+def log_activity(action, username=None, status='success', detail=None):
+    """Record an account event for username (default: the logged-in user) in the activity log"""
+    get_activity_log().record(username or st.session_state.get('username'), action, status,
+                              current_client(), detail)
+
+
+def track_session():
+    """Register logins/logouts of this browser session and keep it alive while it reruns"""
+    session_id = current_session_id()
+    if session_id is None:
+        return
+    sessions = get_auth_registry().sessions
+    username = st.session_state.get('username') if st.session_state.get('authentication_status') else None
+    tracked = st.session_state.get('_session_user')
+    timeout = user_prefs()['session_timeout'] * 60
+    if username != tracked:
+        if tracked:
+            sessions.logout(session_id)
+            if username is None:
+                log_activity('logout', tracked)
+        if username:
+            sessions.login(session_id, username, timeout)
+        st.session_state['_session_user'] = username
+        st.session_state['_session_beat'] = time.time()
+    elif username:
+        st.session_state['_session_beat'] = sessions.heartbeat(
+            session_id, username, timeout, st.session_state.get('_session_beat', 0.0))
+
+
+def export_button(label, key, chunks_fn, file_stem):
+    """Download button for a chunked export in the user's default format, generated on click"""
+    from exporter import FORMATS, get_exporter, resolve_format  # pulls in pyarrow
+
+    fmt = resolve_format(user_prefs()['export_format'])
+    extension, mime = FORMATS[fmt]
+
+    def read_export():
+        # Streamlit's media file manager keeps download data in memory whatever it is given
+        # (bytes or a file object), so serving the download costs the file's size in RAM
+        # for as long as the button's file is registered; only building it is chunked
+        with open(get_exporter().export(key, chunks_fn, fmt), 'rb') as file:
+            return file.read()
+
+    st.download_button(
+        label=f"{label} ({fmt})",
+        data=read_export,
+        file_name=f"{file_stem}.{extension}",
+        mime=mime,
+        key=f"export_{file_stem}"
+    )
@@ -0,0 +1,94 @@
+# views/dashboard.py - Dashboard page
+import pandas as pd
+import streamlit as st
+
+from activity_log import get_activity_log
+from data_pipeline import get_event_pipeline
+from instrumentation import instrumented
+
+
+def _pct_change(current, previous):
+    """Format the change from previous to current as a metric delta"""
+    if not previous:
+        return None
+    return f"{(current - previous) / previous:.0%}"
+
+
+@st.fragment
+@instrumented('Dashboard overview', fragment=True)
+def dashboard_overview():
+    """Window picker, metrics row and trend charts"""
+    # Date window
+    pipeline = get_event_pipeline()
+    window_days = st.selectbox("📅 Window", [7, 30, 90], index=1, format_func=lambda d: f"Last {d} days",
+                               key="dashboard_window")
+    start, end = pipeline.window(window_days)
+    summary = pipeline.summary(start, end)
+    previous = pipeline.summary(start - pd.Timedelta(days=window_days), start - pd.Timedelta(days=1))
+    if pipeline.is_demo:
+        st.caption(f"ℹ️ Showing demo data - no event log found at `{pipeline.path}`")
+    
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Active Users", f"{summary['users']:,}", _pct_change(summary['users'], previous['users']),
+                  help="Unique active users in the selected window")
+    with col2:
+        st.metric("Revenue", f"${summary['revenue']:,.0f}", _pct_change(summary['revenue'], previous['revenue']),
+                  help="Revenue in the selected window")
+    with col3:
+        st.metric("Conversion Rate", f"{summary['conversion_rate']:.1%}",
+                  _pct_change(summary['conversion_rate'], previous['conversion_rate']),
+                  help="Sessions with a purchase")
+    with col4:
+        st.metric("Page Views", f"{summary['page_views']:,}",
+                  _pct_change(summary['page_views'], previous['page_views']),
+                  help="Total page views in the selected window")
+    
+    # Charts section
+    st.markdown("---")
+    st.subheader("📈 Performance Trends")
+    
+    data = pipeline.daily_metrics(start, end)
+    
+    # Chart columns
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**User Activity**")
+        st.line_chart(data.set_index('Date')[['Users', 'Sessions']])
+        
+    with col2:
+        st.write("**Revenue Trend**")
+        st.area_chart(data.set_index('Date')['Revenue'])
+
+
+@instrumented('Dashboard', page=True)
+def dashboard_page():
+    """Dashboard page content"""
+    st.header("📊 Dashboard")
+    
+    # Welcome message
+    user_name = st.session_state.get('name', 'User')
+    st.write(f"Welcome back, **{user_name}**! Here's your dashboard overview.")
+    
+    # Metrics and charts rerun on their own when the window changes
+    dashboard_overview()
+    
+    # Recent activity table
+    st.markdown("---")
+    st.subheader("📋 Recent Activity")
+    
+    events = get_activity_log().recent(st.session_state.get('username'), 10)
+    if not events:
+        st.caption("No activity recorded yet")
+        return
+    activity_data = pd.DataFrame({
+        'Time': [pd.Timestamp.fromtimestamp(event['time']).floor('s') for event in events],
+        'Action': [event['action'].replace('_', ' ').title() for event in events],
+        'Status': [event['status'].title() for event in events],
+        'IP Address': [event['client'] or 'Unknown' for event in events]
+    })
+    
+    st.dataframe(activity_data, hide_index=True)
@@ -0,0 +1,142 @@
+# views/profile.py - User profile and account management page
+import json
+import time
+
+import pandas as pd
+import streamlit as st
+
+from activity_log import get_activity_log
+from instrumentation import instrumented
+from views.common import get_auth_registry, get_authenticator, log_activity, save_user, user_prefs
+
+
+def user_data_json(profile, activity, settings):
+    """The "Download My Data" export; settings may be a read-only preferences mapping"""
+    return json.dumps({"profile": profile, "activity": activity, "settings": dict(settings)}, indent=2)
+
+
+def _format_login_time(timestamp):
+    if timestamp is None:
+        return "First login"
+    if time.strftime('%Y-%m-%d') == time.strftime('%Y-%m-%d', time.localtime(timestamp)):
+        return time.strftime('Today %H:%M', time.localtime(timestamp))
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))
+
+
+@instrumented('Profile', page=True)
+def profile_page():
+    """Enhanced user profile page"""
+    st.header("👤 User Profile")
+    
+    # Current user information display
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        # Get user name safely, with fallback
+        user_name = st.session_state.get('name', 'User')
+        initials = user_name[:2].upper() if user_name else 'U'
+        
+        st.image("https://via.placeholder.com/200x200/4CAF50/white?text=" + initials, 
+                caption="Profile Picture")
+        
+        if st.button("📷 Change Photo"):
+            st.info("📸 Photo upload functionality would be implemented here")
+            
+        # User stats
+        st.markdown("---")
+        st.write("**Account Statistics:**")
+        st.write("🗓️ Member since: January 2024")
+        username = st.session_state.get('username')
+        session_stats = get_auth_registry().sessions.user_stats(username)
+        st.write(f"🔑 Last login: {_format_login_time(session_stats['previous_login'])}")
+        st.write(f"📊 Sessions: {session_stats['logins']:,} "
+                 f"({get_auth_registry().sessions.user_sessions(username)} active now)")
+        
+    with col2:
+        st.subheader("Account Information")
+        
+        # Display current info
+        info_data = {
+            "Field": ["Full Name", "Username", "Email", "Account Type", "Status"],
+            "Value": [
+                st.session_state.get('name', 'Not provided'),
+                st.session_state.get('username', 'Not provided'),
+                st.session_state.get('email', 'Not provided'),
+                "Standard User",
+                "✅ Active"
+            ]
+        }
+        
+        info_df = pd.DataFrame(info_data)
+        st.dataframe(info_df, hide_index=True)
+        
+    # Account management section
+    st.markdown("---")
+    st.subheader("🔧 Account Management")
+    
+    tab1, tab2, tab3 = st.tabs(["🔑 Change Password", "✏️ Update Details", "⚙️ Account Actions"])
+    
+    with tab1:
+        st.write("**Change Your Password:**")
+        try:
+            authenticator = get_authenticator()
+            if authenticator.reset_password(st.session_state['username']):
+                st.success('🎉 Password changed successfully!')
+                # Sign out other browsers that kept a cookie, then re-issue this one
+                details = get_auth_registry().revoke_tokens(st.session_state['username'])
+                saved = save_user(st.session_state['username'], details)
+                authenticator.cookie_controller.set_cookie()
+                if saved:
+                    log_activity('password_change')
+        except Exception as e:
+            if str(e) != "":
+                st.error(f"❌ Error changing password: {e}")
+            
+    with tab2:
+        st.write("**Update Profile Information:**")
+        try:
+            if get_authenticator().update_user_details(st.session_state['username']):
+                st.success('🎉 Profile updated successfully!')
+                if save_user(st.session_state['username']):
+                    log_activity('profile_update')
+        except Exception as e:
+            if str(e) != "":
+                st.error(f"❌ Error updating profile: {e}")
+            
+    with tab3:
+        st.write("**Account Actions:**")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            username = st.session_state.get('username', 'user')
+            profile = {
+                "name": st.session_state.get('name', 'Not provided'),
+                "username": username,
+                "email": st.session_state.get('email', 'Not provided')
+            }
+            settings = user_prefs()
+
+            def user_data():
+                # The activity history is only read when the button is clicked
+                return user_data_json(profile, get_activity_log().user_events(username), settings)
+
+            st.download_button(
+                label="📥 Download My Data",
+                data=user_data,
+                file_name=f"user_data_{username}.json",
+                mime="application/json",
+                help="Download all your account data"
+            )
+                
+        with col2:
+            with st.popover("⚠️ Danger Zone"):
+                st.write("**Delete Account**")
+                st.warning("This action cannot be undone!")
+                
+                confirm_text = st.text_input("Type 'DELETE' to confirm:")
+                if st.button("🗑️ Delete Account", type="secondary"):
+                    if confirm_text == "DELETE":
+                        st.error("Account deletion would be processed here")
+                    else:
+                        st.warning("Please type 'DELETE' to confirm")
@@ -0,0 +1,127 @@
+# views/settings.py - Per-user settings page
+import streamlit as st
+
+from instrumentation import instrumented
+from preferences import DEFAULTS as PREFERENCE_DEFAULTS, get_preferences
+from views.common import default_session_timeout, user_prefs
+
+
+def _seed_settings():
+    """Fill the settings widgets from the saved preferences unless they hold unsaved edits"""
+    for name, value in user_prefs().items():
+        st.session_state.setdefault(f'pref_{name}', value)
+
+
+def _save_settings():
+    prefs = {name: st.session_state[f'pref_{name}'] for name in PREFERENCE_DEFAULTS
+             if f'pref_{name}' in st.session_state}
+    get_preferences().save(st.session_state.get('username'), prefs)
+    st.session_state['_session_beat'] = 0.0  # apply a new session timeout on this rerun
+    st.session_state['_settings_notice'] = 'saved'
+
+
+def _reset_settings():
+    for name, value in dict(PREFERENCE_DEFAULTS, session_timeout=default_session_timeout()).items():
+        st.session_state[f'pref_{name}'] = value
+    st.session_state['_settings_notice'] = 'reset'
+
+
+@instrumented('Settings', page=True)
+def settings_page():
+    """Enhanced settings page content"""
+    st.header("⚙️ Application Settings")
+    
+    # Settings tabs - widgets edit a draft seeded from the saved preferences
+    _seed_settings()
+    settings_form()
+
+
+@st.fragment
+@instrumented('Settings form', fragment=True)
+def settings_form():
+    """Settings tabs and buttons; editing a widget only reruns this fragment"""
+    tab1, tab2, tab3, tab4 = st.tabs(["🎨 Appearance", "🔔 Notifications", "🔒 Security", "🔧 Advanced"])
+    
+    with tab1:
+        st.subheader("Appearance Preferences")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.selectbox("🎨 Theme", ["Light", "Dark", "Auto"], help="Choose your preferred theme", key="pref_theme")
+            st.selectbox("🌐 Language", ["English", "Spanish", "French", "German"], key="pref_language")
+            
+        with col2:
+            st.selectbox("🕐 Timezone", ["UTC", "PST", "EST", "GMT", "CET"], key="pref_timezone")
+            st.selectbox("📅 Date Format", ["MM/DD/YYYY", "DD/MM/YYYY", "YYYY-MM-DD"], key="pref_date_format")
+        
+        st.radio("📊 Dashboard Layout", ["Compact", "Standard", "Detailed"], key="pref_dashboard_layout")
+        
+    with tab2:
+        st.subheader("Notification Settings")
+        
+        st.checkbox("📧 Email notifications", key="pref_email_notifications")
+        st.checkbox("📱 Push notifications", key="pref_push_notifications")
+        st.checkbox("📰 Weekly digest", key="pref_weekly_digest")
+        
+        st.write("**Email Frequency:**")
+        st.radio("Select email frequency", ["Immediate", "Daily Summary", "Weekly Summary"], horizontal=True,
+                 key="pref_email_frequency")
+        
+        st.write("**Notification Types:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.checkbox("🔔 Login alerts", key="pref_notify_login")
+            st.checkbox("📊 Report completion", key="pref_notify_reports")
+        with col2:
+            st.checkbox("⚠️ Security alerts", key="pref_notify_security")
+            st.checkbox("🎯 Goal achievements", key="pref_notify_goals")
+            
+    with tab3:
+        st.subheader("Security Settings")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.checkbox("🔐 Two-factor authentication", help="Enable 2FA for enhanced security", key="pref_two_factor")
+            st.checkbox("🚨 Login alerts", key="pref_login_alerts")
+            
+        with col2:
+            st.slider("⏱️ Session timeout (minutes)", 15, 480, key="pref_session_timeout")
+            st.checkbox("💻 Remember this device", key="pref_remember_device")
+        
+        st.write("**Password Requirements:**")
+        st.slider("Minimum password length", 6, 20, key="pref_min_password_length")
+        st.checkbox("Require special characters", key="pref_require_special")
+        st.checkbox("Require numbers", key="pref_require_numbers")
+        
+    with tab4:
+        st.subheader("Advanced Settings")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.checkbox("🔗 Enable API access", key="pref_api_access")
+            st.checkbox("🐛 Debug mode", key="pref_debug_mode",
+                        help="Profile every rerun of this session and show the report at the bottom")
+            
+        with col2:
+            st.selectbox("📦 Data retention period", ["30 days", "90 days", "1 year", "Forever"],
+                         key="pref_data_retention")
+            st.selectbox("📤 Default export format", ["CSV", "Parquet", "JSON", "Excel", "PDF"],
+                         key="pref_export_format")
+    
+    # Save settings button
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 3])
+    
+    with col1:
+        if st.button("💾 Save Settings", type="primary"):
+            _save_settings()
+            st.rerun()  # whole app, so a new session timeout or debug mode applies now
+            
+    with col2:
+        st.button("↩️ Reset Defaults", on_click=_reset_settings)
+    
+    notice = st.session_state.pop('_settings_notice', None)
+    if notice == 'saved':
+        st.success("✅ Settings saved successfully!")
+    elif notice == 'reset':
+        st.info("ℹ️ Settings reset to default values - save to keep them")